@@ -12,8 +12,14 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
 from .api import SmartHubAPI
+from .history import async_remove_history
+from .locations import async_remove_locations
+from .services import async_setup_services
+from .snapshot import async_remove_snapshot
 from .sensor import  SmartHubDataUpdateCoordinator
 from .const import DOMAIN
 
@@ -26,6 +32,14 @@ _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the SmartHub services."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up SmartHub from a config entry."""
@@ -49,15 +63,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         host=config["host"],
     )
 
-    # Test the connection
-    try:
-        await api.get_token()
-        _LOGGER.info("Successfully connected to SmartHub API")
-    except Exception as e:
-        _LOGGER.error("Failed to connect to SmartHub API: %s", e)
-        await api.close()
-        raise ConfigEntryError(f"Cannot connect to SmartHub: {e}") from e
-
     # Create update coordinator, and store in the config entry
     coordinator = SmartHubDataUpdateCoordinator(
         hass=hass,
@@ -65,7 +70,26 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         update_interval=timedelta(minutes=config.get("poll_interval")),
         config_entry=entry,
     )
-    await coordinator.async_config_entry_first_refresh()
+
+    if await coordinator.async_restore_snapshot():
+        # Entities start from the last snapshot - SmartHub is only reached in the background
+        entry.async_create_background_task(hass, coordinator.async_refresh(), f"{DOMAIN} refresh {entry.entry_id}")
+    else:
+        # Test the connection
+        try:
+            await api.get_token()
+            _LOGGER.info("Successfully connected to SmartHub API")
+        except Exception as e:
+            _LOGGER.error("Failed to connect to SmartHub API: %s", e)
+            await api.close()
+            raise ConfigEntryError(f"Cannot connect to SmartHub: {e}") from e
+
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            # Setup is retried with a new API - release this one's reference to the shared host session
+            await api.close()
+            raise
     entry.runtime_data = coordinator
 
     # Set up platforms
@@ -80,7 +104,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        # Clean up API connection
+        # Release the API's reference to the shared host session - the session
+        # is closed once no other config entry for the same host is using it.
+        api = None
         data = hass.data.get(DOMAIN,{}).get(entry.entry_id)
 
         if hasattr(entry, "runtime_data") and hasattr(entry.runtime_data, "api"):
@@ -104,3 +130,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     return unload_ok
 
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored data of a deleted config entry."""
+    await async_remove_locations(hass, entry.entry_id)
+    await async_remove_snapshot(hass, entry.entry_id)
+    await async_remove_history(hass, entry.entry_id)
@@ -2,21 +2,30 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import functools
+from array import array
+import json
 import logging
+import time
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
-from typing import Any, Dict, Optional, List
+from typing import Any, Callable, Dict, Optional, List, Tuple
 from enum import StrEnum
+from dataclasses import dataclass
 
 import aiohttp
-from aiohttp import ClientTimeout, ClientError
+from aiohttp import ClientResponse, ClientTimeout
 import pyotp
 
 from .const import (
     DEFAULT_TIMEOUT,
-    MAX_RETRIES,
-    RETRY_DELAY,
-    SESSION_TIMEOUT,
+    TOKEN_LIFETIME,
+    TOKEN_EXPIRY_MARGIN,
+    OFFLOAD_PAYLOAD_SIZE,
+    OFFLOAD_PARSE_POINTS,
+    USAGE_CACHE_TTL,
+    USER_DATA_CACHE_TTL,
     ELECTRIC_SERVICE,
     GAS_SERVICE,
     WATER_SERVICE,
@@ -25,13 +34,22 @@ from .const import (
     FALLBACK_GAS_SERVICES,
     METER_NAME,
 )
+from .breaker import CircuitBreaker
+from .cache import ResponseCache
+from .limiter import AdaptiveLimiter, LocationCap
 from .exceptions import (
     SmartHubAuthenticationError,
     SmartHubConnectionError,
     SmartHubDataError,
     SmartHubError as SmartHubAPIError,
+    SmartHubRetryableError,
 )
-from .utils import sanitize_host, parse_epoch_set_timezone
+from .poll import PollScheduler
+from .responses import PollResponse, UsageEntry
+from .retry import RETRY_STATUSES, RetryPolicy, async_within_budget, parse_retry_after
+from .session import SharedSession, acquire_session, async_release_session
+from .usage import ServiceUsage, UsageSeries
+from .utils import sanitize_host, parse_token_expiry, json_loads
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -79,25 +97,115 @@ class Aggregation(StrEnum):
             return "month"
         return "unknown"
 
-class SmartHubLocation():
+    def bucket_start(self, reading_time: datetime) -> datetime:
+        """Return the start of the bucket containing reading_time."""
+        bucket = reading_time.replace(minute=0, second=0, microsecond=0)
+        if self in (Aggregation.DAILY, Aggregation.MONTHLY):
+            bucket = bucket.replace(hour=0)
+        if self == Aggregation.MONTHLY:
+            bucket = bucket.replace(day=1)
+        return bucket
+
+@dataclass(frozen=True, slots=True)
+class SmartHubLocation:
     """Smarthub Location object - contains location_id, location_description, etc"""
 
-    def __init__(
-        self,
-        id: str,
-        service: str,
-        description: str,
-        provider: str,
-    )  -> None:
-        """Initialize the SmartHubLocation."""
-        self.id = id
-        self.service = service
-        self.description = description
-        self.provider = provider
+    id: str
+    service: str
+    description: str
+    provider: str
 
     def __str__(self):
         return f"[SmartHubLocation: '{self.id}' '{self.service}' '{self.description}']"
 
+class TokenCache():
+    """Authorization token cache - knows when the cached token expires and counts hits/misses."""
+
+    def __init__(self, margin: int = TOKEN_EXPIRY_MARGIN) -> None:
+        """Initialize an empty TokenCache."""
+        self.token: Optional[str] = None
+        self.expires_at: Optional[float] = None
+        self.margin = margin
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def valid(self) -> bool:
+        """Return True if a token is cached and not about to expire."""
+        return (
+            self.token is not None
+            and self.expires_at is not None
+            and time.time() < self.expires_at - self.margin
+        )
+
+    def get(self) -> Optional[str]:
+        """Return the cached token if it is still valid, recording a hit or miss."""
+        if self.valid:
+            self.hits += 1
+            return self.token
+        self.misses += 1
+        return None
+
+    def set(self, token: Optional[str]) -> None:
+        """Cache a token - the expiry is read from the token, or TOKEN_LIFETIME is assumed."""
+        self.token = token
+        if token is None:
+            self.expires_at = None
+            return
+        self.expires_at = parse_token_expiry(token) or time.time() + TOKEN_LIFETIME
+
+    def invalidate(self) -> None:
+        """Drop the cached token."""
+        self.set(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache statistics."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "valid": self.valid,
+            "expires_at": self.expires_at,
+        }
+
+def _in_event_loop() -> bool:
+    """Return True if called from a thread running an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+class PayloadStats():
+    """Time spent decoding and parsing responses - blocking the event loop, or offloaded to the executor."""
+
+    def __init__(self) -> None:
+        """Initialize empty PayloadStats."""
+        self.inline = 0
+        self.inline_time = 0.0
+        self.inline_max = 0.0
+        self.offloaded = 0
+        self.offloaded_time = 0.0
+
+    def record(self, duration: float, offloaded: bool) -> None:
+        """Record one decode or parse taking duration seconds."""
+        if offloaded:
+            self.offloaded += 1
+            self.offloaded_time += duration
+        else:
+            self.inline += 1
+            self.inline_time += duration
+            self.inline_max = max(self.inline_max, duration)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the payload statistics - inline time is time the event loop was blocked."""
+        return {
+            "inline": self.inline,
+            "inline_time": round(self.inline_time, 6),
+            "inline_max": round(self.inline_max, 6),
+            "offloaded": self.offloaded,
+            "offloaded_time": round(self.offloaded_time, 6),
+        }
+
 class SmartHubAPI:
     """Class to interact with the SmartHub API."""
 
@@ -118,214 +226,303 @@ class SmartHubAPI:
         self.timezone = timezone
         self.mfa_totp = mfa_totp
         self.host = sanitize_host(host)
+        self.base_url = f"https://{self.host}"
         self.timeout = timeout
-        self.token: Optional[str] = None
+        self.token_cache = TokenCache()
         self.primary_username: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
-        self._session_created_at: Optional[datetime] = None
-
-    def parse_usage_series(self, usage_data: List[Dict], parseType: ParseType = ParseType.FORWARD) -> List[Dict]:
-        parsed_data = []
-        _LOGGER.debug(f"First 10 entries of usage data: {usage_data[:10]}")
-        for usage in usage_data:
-            # convert microseconds to timestmap -> read data as if it was in provider TZ
-            event_time = parse_epoch_set_timezone(usage.get("x") / 1000.0, ZoneInfo(self.timezone))
+        self._shared_session: Optional[SharedSession] = None
+        # Single-flight authentication - only one login runs at a time
+        self._auth_lock = asyncio.Lock()
+        # Shared re-polling of PENDING utility-usage requests
+        self.poll_scheduler = PollScheduler()
+        # Responses above these sizes are decoded/parsed off the event loop
+        self.offload_payload_size = OFFLOAD_PAYLOAD_SIZE
+        self.offload_parse_points = OFFLOAD_PARSE_POINTS
+        self.payload_stats = PayloadStats()
+        # Energy requests in flight, keyed by host and normalized poll payload
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.coalesced_requests = 0
+        # Parsed utility-usage and user-data responses
+        self.response_cache = ResponseCache()
+        # Backoff of failed requests, bounded by the budget of the running refresh
+        self.retry_policy = RetryPolicy()
+
+    @property
+    def token(self) -> Optional[str]:
+        """Return the current authorization token."""
+        return self.token_cache.token
+
+    @token.setter
+    def token(self, token: Optional[str]) -> None:
+        """Replace the current authorization token."""
+        self.token_cache.set(token)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return runtime metrics for the API client."""
+        return {
+            "token_cache": self.token_cache.stats(),
+            "session": self._shared_session.stats() if self._shared_session else None,
+            "poll_scheduler": {
+                "pending": self.poll_scheduler.pending,
+                "delay": self.poll_scheduler.delay,
+            },
+            "payloads": self.payload_stats.stats(),
+            "response_cache": self.response_cache.stats(),
+            "inflight": {
+                "active": len(self._inflight),
+                "coalesced": self.coalesced_requests,
+            },
+            "retries": self.retry_policy.stats(),
+            "circuit_breaker": self._shared_session.breaker.stats() if self._shared_session else None,
+            "limiter": self._shared_session.limiter.stats() if self._shared_session else None,
+        }
+
+    def _client_timeout(self) -> ClientTimeout:
+        """Return the timeout of a request, capped by the deadline of the running refresh."""
+        return ClientTimeout(total=self.retry_policy.timeout(self.timeout))
+
+    @staticmethod
+    def _check_retryable(response: ClientResponse, description: str) -> None:
+        """Raise SmartHubRetryableError if the response status is worth retrying."""
+        if response.status in RETRY_STATUSES:
+            raise SmartHubRetryableError(
+                f"{description} failed with HTTP status: {response.status}",
+                response.status,
+                parse_retry_after(response.headers.get("Retry-After")),
+            )
+
+    async def _async_offload(self, offload: bool, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run CPU-bound decode/parse work, recording its cost in payload_stats.
+
+        Small payloads are handled inline - a thread hop would cost more than
+        the work. Large ones run in the default executor so the event loop
+        (and every other integration on it) keeps running meanwhile.
+        """
+        def _timed() -> Tuple[Any, float]:
+            start = time.perf_counter()
+            result = func(*args)
+            return result, time.perf_counter() - start
+
+        if offload:
+            result, duration = await asyncio.get_running_loop().run_in_executor(None, _timed)
+        else:
+            result, duration = _timed()
+        self.payload_stats.record(duration, offload)
+        return result
+
+    def _parse_usage_resolved(self, response: PollResponse, aggregation: Aggregation, service: str) -> Dict[str, Any]:
+        """Parse usage data including every series, rather than deferring series until they are read."""
+        parsed = self.parse_poll_response(response, aggregation, service)
+        for service_usage in parsed.values():
+            service_usage.resolve()
+        return parsed
+
+
+    def parse_usage_series(self, usage_data: List[Dict], parseType: ParseType = ParseType.FORWARD) -> UsageSeries:
+        """Parse a usage series into hourly readings for a single channel."""
+        return self.parse_usage_channels(usage_data, (parseType,))[parseType]
+
+    def parse_usage_channels(self, usage_data: List[Dict], parseTypes: Tuple[ParseType, ...]) -> Dict[ParseType, UsageSeries]:
+        """
+        Parse a usage series into hourly readings for several channels in a single walk.
+
+        The `x` (epoch milliseconds) and `y` (usage) values are copied into typed
+        arrays, then bucketed by hour in one pass. The bucketing only depends on
+        `x`, so every requested channel (FORWARD, NET, RETURN) shares it.
+
+        Returns:
+            A dict of ParseType to the UsageSeries of hourly readings for that channel.
+        """
+        _LOGGER.debug("First 10 entries of usage data: %s", usage_data[:10])
+        timestamps = array("d", [usage.get("x") for usage in usage_data])
+        values = array("d", [usage.get("y") for usage in usage_data])
+
+        # Bucket start (raw epoch milliseconds) for each hourly reading, and the
+        # index of the reading each data point is added to.
+        raw_timestamps = array("q")
+        bucket_of = array("l", [0]) * len(timestamps)
+        last_hour = -1
+        for index, timestamp in enumerate(timestamps):
+            # SmartHub epochs are local wall-clock times - read them as if in UTC
+            minute = int(timestamp // 60000) % 60
+            hour = int(timestamp // 3600000) % 24
+
             # HA stats import wants timestamps only at standard intervals -
             # https://github.com/home-assistant/core/blob/4fef19c7bc7c1f7be827f6c489ad1df232e44906/homeassistant/components/recorder/statistics.py#L2634
-             # If the first entry isn't aligned with the top of the hour - treat it as if it was
-            if event_time.minute != 0 and len(parsed_data) == 0:
-              _LOGGER.warning("Initial usage data is not aligned with top of the hour, inserting a 0 entry at 0 minutes: event_time:%s, %s", event_time, usage.get("x"))
-              zero_time = event_time.replace(minute=0)
-              parsed_data.append({
-                "reading_time" : zero_time,
-                "consumption" : 0,
-                "raw_timestamp": int(zero_time.replace(tzinfo=timezone.utc).timestamp()*1000), # convert zero_time to UTC, and multiply by 1000
-              })
-
-            # If the previous parsed time is in a different hour, and we still don't have a 00 minute - insert a 0 entry
-            if len(parsed_data) > 0 and parsed_data[-1]["reading_time"].hour != event_time.hour and event_time.minute != 0:
-              _LOGGER.warning("Usage data is not aligned with top of the hour, inserting a 0 entry at 0 minutes: event_time:%s, %s", event_time, usage.get("x"))
-              zero_time = event_time.replace(minute=0)
-              parsed_data.append({
-                "reading_time" : zero_time,
-                "consumption" : 0,
-                "raw_timestamp": int(zero_time.replace(tzinfo=timezone.utc).timestamp()*1000), # convert zero_time to UTC, and multiply by 1000
-              })
-
-            # When doing a normal energy monitoring - never report negative numbers
-            # When doing a NET usage, only report negative numbers, but invert them to be positive
-            usage_energy = usage.get("y")
-            if parseType == ParseType.NET:
-              if usage_energy > 0:
-                usage_energy = 0
-              else:
-                usage_energy = abs(usage_energy)
-            else: # both FORWARD and RETURN use postive values
-              usage_energy = max(0,usage_energy)
-
-
-            if event_time.minute != 0:
-              _LOGGER.debug("consolidating sub hour data: %s, %s + %s", event_time, parsed_data[-1]['consumption'], usage.get("y"))
-              parsed_data[-1]['consumption'] += usage_energy
-              continue
-
-            parsed_data.append({
-              "reading_time" : event_time,
-              "consumption" : usage_energy,
-              "raw_timestamp": usage.get("x"),
-            })
-
-        return parsed_data
-
-    def parse_usage(self, data: Dict[str, Any], aggregation:Aggregation) -> Optional[Dict[str, Any]]:
+            # If the first entry (or the first entry of a new hour) isn't aligned with the top of the hour - treat it as if it was
+            if minute != 0 and (not raw_timestamps or hour != last_hour):
+                _LOGGER.warning("Usage data is not aligned with top of the hour, inserting a 0 entry at 0 minutes: %s", usage_data[index].get("x"))
+                raw_timestamps.append(int(timestamp - minute*60000))
+            elif minute == 0:
+                raw_timestamps.append(int(timestamp))
+
+            bucket_of[index] = len(raw_timestamps) - 1
+            last_hour = hour
+
+        tz = ZoneInfo(self.timezone)
+        parsed: Dict[ParseType, UsageSeries] = {}
+        for parseType in parseTypes:
+            consumption = array("d", [0.0]) * len(raw_timestamps)
+            for index, usage_energy in enumerate(values):
+                # When doing a normal energy monitoring - never report negative numbers
+                # When doing a NET usage, only report negative numbers, but invert them to be positive
+                if parseType == ParseType.NET:
+                    usage_energy = 0.0 if usage_energy > 0 else -usage_energy
+                elif usage_energy < 0: # both FORWARD and RETURN use postive values
+                    usage_energy = 0.0
+                consumption[bucket_of[index]] += usage_energy
+
+            parsed[parseType] = UsageSeries(tz, raw_timestamps, consumption)
+
+        return parsed
+
+    def parse_usage(self, data: Dict[str, Any], aggregation:Aggregation, service: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Parse the JSON data and extract the last data point for usage.
 
         Args:
             data: The JSON data as a Python dictionary.
+            aggregation: The aggregation the data was requested with.
+            service: Only parse this service (the industry that was requested) - all supported services if None.
 
         Returns:
-            A dictionary containing the "USAGE" with a list of parsed data and metadata, or an empty dictionary if not found.
+            A dictionary of service to ServiceUsage, containing the "USAGE" series and metadata.
+            Usage series are parsed the first time they are read.
 
         Raises:
             SmartHubDataError: If there's an error parsing the data.
         """
-        try:
-            parsed_response = {}
-
-            if not isinstance(data, dict):
-                raise SmartHubDataError("Invalid data format: expected dictionary")
-
-            # Initialize all supported services to empty set
-            for service in SUPPORTED_SERVICES:
-              parsed_response[service]={}
-              parsed_response[service]["hasHourly"] = data.get("data", {}).get("hasHourly", False)
-              parsed_response[service]["hasDaily"] = data.get("data", {}).get("hasDaily", False)
-
-            # Locate the "ELECTRIC" data
-            electric_data = data.get("data", {}).get(ELECTRIC_SERVICE, [])
-            if len(electric_data) == 0:
-              _LOGGER.warning(f"No ELECTRIC data found in response for {aggregation.value}")
-              _LOGGER.debug(data)
-
-            for entry in electric_data:
-                # Find the entry with type "USAGE"
-                if entry.get("type","") == "USAGE":
-                    _LOGGER.debug(f"ELECTRICAL Usage for {aggregation.value}: %s", entry)
-
-                    parsed_response[ELECTRIC_SERVICE]["hasHourly"] |= entry.get("hasHourly", False)
-                    parsed_response[ELECTRIC_SERVICE]["hasDaily"] |= entry.get("hasDaily", False)
-
-                    meters = entry.get("meters", [])
-                    forward_series = ""
-                    net_series = ""
-                    return_series = ""
-                    if len(meters) > 2:
-                      _LOGGER.warning(f"More then 2 meters in usage data for {aggregation.value}: %s", meters)
-                    for meter in meters:
-                      # assume forward is default if not present
-                      flow_direction = meter.get("flowDirection", ParseType.FORWARD)
-                      match flow_direction:
-                        case ParseType.FORWARD | ParseType.TOTAL:
-                          forward_series = meter["seriesId"]
-                        case ParseType.NET:
-                          net_series = meter["seriesId"]
-                        case ParseType.RETURN:
-                          return_series = meter["seriesId"]
-                        case _:
-                          _LOGGER.warning(f"Unknown flow direction in meter for {aggregation.value}: %s", meter)
-
-                    series = entry.get("series", [])
-                    if len(series) == 0:
-                        _LOGGER.warning(f"No ENERGY series for {aggregation.value}: %s", series)
-
-                    for serie in series:
-                        if serie.get("name", "") == return_series:
-                            usage_data = serie.get("data", [])
-                            parsed_response[ELECTRIC_SERVICE]["USAGE_RETURN"] = self.parse_usage_series(usage_data, ParseType.RETURN)
-                            _LOGGER.debug(f"Parsed %d items for USAGE_RETURN history for {aggregation.value}", len(parsed_response[ELECTRIC_SERVICE]["USAGE_RETURN"]))
-
-                        # If there is a NetMeter, use that for both Return and Usage (as it combines both).
-                        # NOTE - there must always be a FORWARD or NET meter - or the "USAGE" is not being returned.
-                        if serie.get("name", "") == (net_series if net_series != "" else forward_series):
-                            parsed_response[ELECTRIC_SERVICE][METER_NAME] = serie.get("name")
-
-                            # Extract the last data point in the "data" array
-                            usage_data = serie.get("data", [])
-                            parsed_response[ELECTRIC_SERVICE]["USAGE"] = self.parse_usage_series(usage_data)
-                            _LOGGER.debug(f"Parsed %d items for USAGE history for {aggregation.value}", len(parsed_response[ELECTRIC_SERVICE]["USAGE"]))
-
-                            if net_series != "":
-                              parsed_response[ELECTRIC_SERVICE]["USAGE_RETURN"] = self.parse_usage_series(usage_data, ParseType.NET)
-                              _LOGGER.debug(f"Parsed %d items for USAGE_RETURN history for {aggregation.value}", len(parsed_response[ELECTRIC_SERVICE]["USAGE_RETURN"]))
-                else:
-                    _LOGGER.debug(f"Unknown Electrical Usage for {aggregation.value}: %s", entry)
-
-            gasData = data.get("data", {}).get("GAS", [])
-            if len(gasData) == 0:
-              _LOGGER.warning(f"No GAS data found in response for {aggregation.value}")
-              _LOGGER.debug(data)
-
-            for entry in gasData:
-                if entry.get("type","") == "USAGE":
-                    _LOGGER.debug(f"GAS Usage for {aggregation.value}: %s", entry)
-
-                    parsed_response[GAS_SERVICE]["hasHourly"] |= entry.get("hasHourly", False)
-                    parsed_response[GAS_SERVICE]["hasDaily"] |= entry.get("hasDaily", False)
-
-                    series = entry.get("series", [])
-                    if len(series) > 1:
-                        _LOGGER.warning(f"Multiple GAS series for {aggregation.value}: %s", series)
-                    if len(series) == 0:
-                        _LOGGER.warning(f"No GAS series for {aggregation.value}: %s", series)
-
-                    for serie in series:
-                            parsed_response[GAS_SERVICE][METER_NAME] = serie.get("name")
-
-                            # Extract the last data point in the "data" array
-                            usage_data = serie.get("data", [])
-                            parsed_response[GAS_SERVICE]["USAGE"] = self.parse_usage_series(usage_data)
-                            _LOGGER.debug(f"Parsed %d items for GAS USAGE history for {aggregation.value}", len(parsed_response[GAS_SERVICE]["USAGE"]))
-
-                else:
-                    _LOGGER.debug(f"Unknown Gas Usage for {aggregation.value}: %s", entry)
-
-            waterData = data.get("data", {}).get("WATER", [])
-            if len(waterData) == 0:
-              _LOGGER.warning(f"No WATER data found in response for {aggregation.value}")
-              _LOGGER.debug(data)
-
-            for entry in waterData:
-                if entry.get("type","") == "USAGE":
-                    _LOGGER.debug(f"WATER Usage for {aggregation.value}: %s", entry)
-
-                    parsed_response[WATER_SERVICE]["hasHourly"] |= entry.get("hasHourly", False)
-                    parsed_response[WATER_SERVICE]["hasDaily"] |= entry.get("hasDaily", False)
-
-                    series = entry.get("series", [])
-                    if len(series) > 1:
-                        _LOGGER.warning(f"Multiple WATER series for {aggregation.value}: %s", series)
-                    if len(series) == 0:
-                        _LOGGER.warning(f"No WATER series for {aggregation.value}: %s", series)
+        if not isinstance(data, dict):
+            _LOGGER.error("Error parsing usage data: %s", data)
+            raise SmartHubDataError("Error parsing usage data: Invalid data format: expected dictionary")
 
-                    for serie in series:
-                        parsed_response[WATER_SERVICE][METER_NAME] = serie.get("name", "unknown meter name")
+        services = (service,) if service is not None else SUPPORTED_SERVICES
+        try:
+            response = PollResponse.from_json(data, services)
+        except Exception as e:
+            _LOGGER.error("Error parsing usage data: %s", data)
+            raise SmartHubDataError(f"Error parsing usage data: {e}") from e
+        return self.parse_poll_response(response, aggregation, service)
 
-                        # Extract the last data point in the "data" array
-                        usage_data = serie.get("data", [])
-                        parsed_response[WATER_SERVICE]["USAGE"] = self.parse_usage_series(usage_data)
-                        _LOGGER.debug("Parsed %d items for WATER USAGE history", len(parsed_response[WATER_SERVICE]["USAGE"]))
+    def parse_poll_response(self, response: PollResponse, aggregation: Aggregation, service: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parse a decoded poll response - see parse_usage.
 
-                else:
-                    _LOGGER.debug("Unknown Water Usage: %s", entry)
+        Raises:
+            SmartHubDataError: If there's an error parsing the data.
+        """
+        try:
+            entry_parsers = {
+                ELECTRIC_SERVICE: self._parse_electric_entry,
+                GAS_SERVICE: self._parse_series_entry,
+                WATER_SERVICE: self._parse_series_entry,
+            }
 
+            parsed_response = {}
+            for service_name in (service,) if service is not None else SUPPORTED_SERVICES:
+              parsed = parsed_response[service_name] = ServiceUsage(
+                hasHourly=response.has_hourly,
+                hasDaily=response.has_daily,
+              )
+
+              entries = response.services.get(service_name)
+              if not entries:
+                # Only worth a warning if this service was asked for
+                if service is not None:
+                  _LOGGER.warning("No %s data found in response for %s", service_name, aggregation.value)
+                continue
+
+              for entry in entries:
+                if entry.type != "USAGE":
+                  _LOGGER.debug("Unknown %s Usage for %s: %s", service_name, aggregation.value, entry.raw)
+                  continue
+
+                _LOGGER.debug("%s Usage for %s: %s", service_name, aggregation.value, entry.raw)
+                parsed["hasHourly"] |= entry.has_hourly
+                parsed["hasDaily"] |= entry.has_daily
+                entry_parsers[service_name](service_name, parsed, entry, aggregation)
 
             return parsed_response
 
         except Exception as e:
-            _LOGGER.error("Error parsing usage data: %s", data)
+            _LOGGER.error("Error parsing usage data: %s", response)
             raise SmartHubDataError(f"Error parsing usage data: {e}") from e
 
+    def _deferred_channels(self, usage_data: List[Dict], parseTypes: Tuple[ParseType, ...]) -> Callable[[], Dict[ParseType, UsageSeries]]:
+        """Return a function parsing the channels of a usage series once, on first call."""
+        @functools.cache
+        def parse() -> Dict[ParseType, UsageSeries]:
+            start = time.perf_counter()
+            try:
+                return self.parse_usage_channels(usage_data, parseTypes)
+            except Exception as e:
+                raise SmartHubDataError(f"Error parsing usage series: {e}") from e
+            finally:
+                # Parsing on first read blocks the loop, unless it happens in the executor
+                if _in_event_loop():
+                    self.payload_stats.record(time.perf_counter() - start, offloaded=False)
+        return parse
+
+    def _parse_electric_entry(self, service: str, parsed: ServiceUsage, entry: UsageEntry, aggregation: Aggregation) -> None:
+        """Parse an ELECTRIC usage entry - its meters decide which series hold usage and return."""
+        forward_series = ""
+        net_series = ""
+        return_series = ""
+        if len(entry.meters) > 2:
+          _LOGGER.warning("More then 2 meters in usage data for %s: %s", aggregation.value, entry.meters)
+        for meter in entry.meters:
+          match meter.flow_direction:
+            case ParseType.FORWARD | ParseType.TOTAL:
+              forward_series = meter.series_id
+            case ParseType.NET:
+              net_series = meter.series_id
+            case ParseType.RETURN:
+              return_series = meter.series_id
+            case _:
+              _LOGGER.warning("Unknown flow direction in meter for %s: %s", aggregation.value, meter)
+
+        if len(entry.series) == 0:
+            _LOGGER.warning("No ENERGY series for %s: %s", aggregation.value, entry.series)
+
+        for serie in entry.series:
+            name = serie.name or ""
+            if name == return_series:
+                channels = self._deferred_channels(serie.data, (ParseType.RETURN,))
+                parsed.defer("USAGE_RETURN", lambda channels=channels: channels()[ParseType.RETURN])
+
+            # If there is a NetMeter, use that for both Return and Usage (as it combines both).
+            # NOTE - there must always be a FORWARD or NET meter - or the "USAGE" is not being returned.
+            if name == (net_series if net_series != "" else forward_series):
+                parsed[METER_NAME] = serie.name
+
+                if net_series != "":
+                  # Usage and return both come from the net series - parse it once
+                  channels = self._deferred_channels(serie.data, (ParseType.FORWARD, ParseType.NET))
+                  parsed.defer("USAGE", lambda channels=channels: channels()[ParseType.FORWARD])
+                  parsed.defer("USAGE_RETURN", lambda channels=channels: channels()[ParseType.NET])
+                else:
+                  channels = self._deferred_channels(serie.data, (ParseType.FORWARD,))
+                  parsed.defer("USAGE", lambda channels=channels: channels()[ParseType.FORWARD])
+                _LOGGER.debug("Found %d points of %s USAGE history for %s", len(serie.data), service, aggregation.value)
+
+    def _parse_series_entry(self, service: str, parsed: ServiceUsage, entry: UsageEntry, aggregation: Aggregation) -> None:
+        """Parse a GAS or WATER usage entry - a single usage series."""
+        if len(entry.series) > 1:
+            _LOGGER.warning("Multiple %s series for %s: %s", service, aggregation.value, entry.series)
+        if len(entry.series) == 0:
+            _LOGGER.warning("No %s series for %s: %s", service, aggregation.value, entry.series)
+
+        for serie in entry.series:
+            if serie.name is None and service == WATER_SERVICE:
+                parsed[METER_NAME] = "unknown meter name"
+            else:
+                parsed[METER_NAME] = serie.name
+
+            channels = self._deferred_channels(serie.data, (ParseType.FORWARD,))
+            parsed.defer("USAGE", lambda channels=channels: channels()[ParseType.FORWARD])
+            _LOGGER.debug("Found %d points of %s USAGE history for %s", len(serie.data), service, aggregation.value)
+
     def parse_locations(self, location_json) -> List[SmartHubLocation]:
         # Response format is structured as a list of dictionaries -
         # each dictionary has the following keys
@@ -381,137 +578,121 @@ class SmartHubAPI:
           serviceLocationToUserDataServiceLocationSummaries = entry.get("serviceLocationToUserDataServiceLocationSummaries", {})
           providerOrServiceDescription = entry.get("providerToDescription",{})
 
-          # Loop through the locations looking for the service description `ELECTRIC_SERVICE` which maps the service key - usually ELEC, but sometimes 1ELEC
-          electricServiceKeys = {
-                service for service, desc in serviceToServiceDescription.items()
-                if isinstance(desc, str) and ELECTRIC_SERVICE.casefold() in desc.casefold()
-          }
+          # Map each service key to the industries it provides. Look for the service description `ELECTRIC_SERVICE`
+          # which maps the service key - usually ELEC, but sometimes 1ELEC
+          serviceKeyIndustries: Dict[str, List[str]] = {}
+          for service, desc in serviceToServiceDescription.items():
+            if isinstance(desc, str) and ELECTRIC_SERVICE.casefold() in desc.casefold():
+              serviceKeyIndustries.setdefault(service, []).append(ELECTRIC_SERVICE)
 
           # Some smarthub systems don't return 'Electric Service' as a distinct entity. hsvutil.smarthub.coop returns
           # 'serviceToServiceDescription': {'WATER|NGAS|ELEC|SEWER|TRASH': 'City Utilities'},
-          for fallback in FALLBACK_ELECTRIC_SERVICES:
-            if fallback in services:
-              electricServiceKeys.add(fallback)
-
-          for electricService in electricServiceKeys:
-              electricalProviders = serviceToProviders.get(electricService,["unknown"])
-              electricalProvider = electricalProviders[0] if electricalProviders else "unknown"
-              for locationID, serviceDescriptions in serviceLocationToUserDataServiceLocationSummaries.items():
-                for serviceDescription in serviceDescriptions:
-                  # for now only support electric service type
-                  if any(service in [electricService] for service in serviceDescription.get("services",[])):
-                    # Try to find a good description
-                    description = serviceDescription.get("description", "")
-
-                    locations.append(
-                      SmartHubLocation(
-                        id=locationID,
-                        service=ELECTRIC_SERVICE,
-                        description=description,
-                        provider=providerOrServiceDescription.get(electricalProvider,electricalProvider),
-                      )
-                    )
-
-          gasServiceKeys = set()
-          for fallback in FALLBACK_GAS_SERVICES:
-            if fallback in services:
-              gasServiceKeys.add(fallback)
-
-          for gasService in gasServiceKeys:
-              gasProviders = serviceToProviders.get(gasService,["unknown"])
-              gasProvider = gasProviders[0] if gasProviders else "unknown"
-              for locationID, serviceDescriptions in serviceLocationToUserDataServiceLocationSummaries.items():
-                for serviceDescription in serviceDescriptions:
-                  # for now only support electric service type
-                  if any(service in [gasService] for service in serviceDescription.get("services",[])):
-                    # Try to find a good description
-                    description = serviceDescription.get("description", "")
-
-                    locations.append(
-                      SmartHubLocation(
-                        id=locationID, # used by the API to fetch the usage data
-                        service=GAS_SERVICE,
-                        description=description,
-                        provider=providerOrServiceDescription.get(gasProvider,gasProvider),
-                      )
-                    )
-
-          waterServiceKeys = {"WATER"}
-
-          for waterService in waterServiceKeys:
-              waterProviders = serviceToProviders.get(waterService,["unknown"])
-              waterProvider = waterProviders[0] if waterProviders else "unknown"
-              for locationID, serviceDescriptions in serviceLocationToUserDataServiceLocationSummaries.items():
-                for serviceDescription in serviceDescriptions:
-                  # for now only support electric service type
-                  if any(service in [waterService] for service in serviceDescription.get("services",[])):
-                    # Try to find a good description
-                    description = serviceDescription.get("description", "")
-
-                    locations.append(
-                      SmartHubLocation(
-                        id=locationID, # used by the API to fetch the usage data
-                        service=WATER_SERVICE,
-                        description=description,
-                        provider=providerOrServiceDescription.get(waterProvider,waterProvider),
-                      )
+          for industry, fallbacks in ((ELECTRIC_SERVICE, FALLBACK_ELECTRIC_SERVICES), (GAS_SERVICE, FALLBACK_GAS_SERVICES)):
+            for fallback in fallbacks:
+              if fallback in services and industry not in serviceKeyIndustries.get(fallback, []):
+                serviceKeyIndustries.setdefault(fallback, []).append(industry)
+          serviceKeyIndustries.setdefault("WATER", []).append(WATER_SERVICE)
+
+          # Resolve the provider of each service key once
+          serviceKeyProvider = {}
+          for service in serviceKeyIndustries:
+            providers = serviceToProviders.get(service,["unknown"])
+            provider = providers[0] if providers else "unknown"
+            serviceKeyProvider[service] = providerOrServiceDescription.get(provider,provider)
+
+          # One pass over the location summaries - locations are still listed electric, then gas, then water
+          entryLocations: Dict[str, List[SmartHubLocation]] = {industry: [] for industry in SUPPORTED_SERVICES}
+          for locationID, serviceDescriptions in serviceLocationToUserDataServiceLocationSummaries.items():
+            for serviceDescription in serviceDescriptions:
+              for service in dict.fromkeys(serviceDescription.get("services",[])):
+                for industry in serviceKeyIndustries.get(service, ()):
+                  entryLocations[industry].append(
+                    SmartHubLocation(
+                      id=locationID, # used by the API to fetch the usage data
+                      service=industry,
+                      description=serviceDescription.get("description", ""),
+                      provider=serviceKeyProvider[service],
                     )
+                  )
 
+          for industry in SUPPORTED_SERVICES:
+            locations.extend(entryLocations[industry])
 
         for l in locations:
-            _LOGGER.warning(f"Location id:{l.id} service:{l.service} description:{l.description} provider:{l.provider}")
+            _LOGGER.debug("Location id:%s service:%s description:%s provider:%s", l.id, l.service, l.description, l.provider)
+        _LOGGER.debug("Parsed %d service locations", len(locations))
 
         return locations
 
+    def _get_shared_session(self) -> SharedSession:
+        if self._shared_session is None:
+            self._shared_session = acquire_session(self.host)
+        return self._shared_session
+
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create an aiohttp session."""
-        now = datetime.now()
-
-        # Check if session needs refresh due to age
-        if (self._session_created_at and
-            (now - self._session_created_at).total_seconds() > SESSION_TIMEOUT):
-            _LOGGER.debug("Session timeout reached, refreshing session")
-            if self._session and not self._session.closed:
-                await self._session.close()
-            self._session = None
-            self._session_created_at = None
-
-        if self._session is None or self._session.closed:
-            timeout = ClientTimeout(total=self.timeout)
-            self._session = aiohttp.ClientSession(
-                timeout=timeout,
-                connector=aiohttp.TCPConnector(ssl=True, limit=10),
-            )
-            self._session_created_at = now
-            _LOGGER.debug("Created new aiohttp session")
-        return self._session
+        """Get the aiohttp session shared by every client of this host."""
+        return await self._get_shared_session().async_get_session()
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """The circuit breaker shared by every client of this host."""
+        return self._get_shared_session().breaker
+
+    @property
+    def limiter(self) -> AdaptiveLimiter:
+        """The concurrency limiter shared by every client of this host."""
+        return self._get_shared_session().limiter
+
+    def location_cap(self, limit: int) -> LocationCap:
+        """The cap on locations fetched at the same time, shared by every client of this host - this client asks for limit."""
+        cap = self._get_shared_session().location_cap
+        cap.set_limit(self, limit)
+        return cap
+
+    async def _async_probe(self) -> None:
+        """Send a cheap request, raising if the host still isn't answering."""
+        session = await self._get_session()
+        async with session.head(self.base_url, timeout=self._client_timeout()) as response:
+            if response.status >= 500:
+                raise SmartHubConnectionError(f"Probe failed with HTTP status: {response.status}")
+
+    async def _async_request(self, request: Callable[[], Any], description: str) -> Any:
+        """Send a request through the host's circuit breaker and concurrency limiter, retried by the retry policy."""
+        limited = functools.partial(self.limiter.async_call, request)
+        return await self.retry_policy.async_call(
+            functools.partial(self.breaker.async_call, limited, self._async_probe), description
+        )
 
     async def close(self) -> None:
-        """Close the aiohttp session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
-            self._session = None
+        """Release this client's reference to the shared aiohttp session."""
+        if self._shared_session is not None:
+            shared, self._shared_session = self._shared_session, None
+            shared.location_cap.discard(self)
+            await async_release_session(shared)
 
-    async def _refresh_authentication(self) -> None:
+    async def _refresh_authentication(self, stale_token: Optional[str] = None) -> None:
         """
-        Refresh authentication by clearing session and getting new token.
+        Refresh authentication by getting a new token.
 
-        This method ensures we start with a clean session state when
-        authentication issues occur.
+        Concurrent callers are coalesced: exactly one login runs, and every
+        waiter resumes with the token it produced. The shared session is left
+        open so requests in flight on other tasks are not torn down.
+
+        Args:
+            stale_token: The token the caller found missing or rejected. If the
+                cached token has changed since, another task already refreshed it.
         """
-        _LOGGER.debug("Refreshing authentication and session")
+        async with self._auth_lock:
+            if self.token_cache.valid and self.token != stale_token:
+                _LOGGER.debug("Authentication already refreshed by another request")
+                return
 
-        # Close existing session to clear any stale state
-        if self._session and not self._session.closed:
-            await self._session.close()
-            self._session = None
-            self._session_created_at = None
+            _LOGGER.debug("Refreshing authentication")
 
-        # Clear the old token
-        self.token = None
+            # Clear the old token
+            self.token_cache.invalidate()
 
-        # Get a fresh token with a new session
-        await self.get_token()
+            await self.get_token()
 
     async def get_token(self) -> str:
         """
@@ -522,9 +703,9 @@ class SmartHubAPI:
 
         Raises:
             SmartHubAuthenticationError: If authentication fails.
-            SmartHubConnectionError: If there's a connection error.
+            SmartHubConnectionError: If there's a connection error, after retries.
         """
-        auth_url = f"https://{self.host}/services/oauth/auth/v2"
+        auth_url = f"{self.base_url}/services/oauth/auth/v2"
         headers = {
             "Authority": self.host,
             "Content-Type": "application/x-www-form-urlencoded",
@@ -541,24 +722,25 @@ class SmartHubAPI:
           current_otp = totp.now()
           payload["twoFactorCode"] = current_otp
 
-        _LOGGER.debug("Sending authentication request to: %s", auth_url)
+        async def _authenticate() -> str:
+            _LOGGER.debug("Sending authentication request to: %s", auth_url)
 
-        try:
             session = await self._get_session()
-            async with session.post(auth_url, headers=headers, data=payload) as response:
-                _ = await response.text()
+            async with session.post(auth_url, headers=headers, data=payload, timeout=self._client_timeout()) as response:
+                body = await response.read()
                 _LOGGER.debug("Auth response status: %s", response.status)
 
                 if response.status == 401:
                     raise SmartHubAuthenticationError("Invalid credentials")
-                elif response.status != 200:
+                self._check_retryable(response, "Authentication")
+                if response.status != 200:
                     raise SmartHubConnectionError(
                         f"Authentication failed with HTTP status: {response.status}"
                     )
 
                 try:
-                    response_json = await response.json()
-                except Exception as e:
+                    response_json = json_loads(body)
+                except ValueError as e:
                     raise SmartHubDataError(f"Invalid JSON response: {e}") from e
 
                 self.token = response_json.get("authorizationToken")
@@ -570,82 +752,99 @@ class SmartHubAPI:
                 _LOGGER.debug("Successfully retrieved authentication token")
                 return self.token
 
-        except ClientError as e:
-            raise SmartHubConnectionError(f"Connection error during authentication: {e}") from e
+        return await self._async_request(_authenticate, "authentication")
 
-    async def get_service_locations(self) -> List[SmartHubLocation]:
+    async def get_service_locations(self, refresh: bool = False) -> List[SmartHubLocation]:
         """
         Retrieve details about the service locaitons
 
+        With refresh, a cached response isn't used - the fresh one replaces it.
+
         Returns:
             List of SmartHubLocation
 
         Raises:
             SmartHubAPIError: If the request fails after retries.
         """
-        user_data_url = f"https://{self.host}/services/secured/user-data"
-        payload = {
-          "userId" : self.primary_username,
-        }
+        user_data_url = f"{self.base_url}/services/secured/user-data"
 
-        if not self.token:
-            await self._refresh_authentication()
+        cache_key = ("user-data", self.host, self.email, self.account_id)
+        cached = None if refresh else self.response_cache.get(cache_key)
+        if cached is not None:
+            _LOGGER.debug("Using cached service locations")
+            return list(cached)
 
-        headers = {
-            "Authority": self.host,
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json",
-            "X-Nisc-Smarthub-Username": self.email,
-            "User-Agent": "HomeAssistant SmartHub Integration",
-        }
+        token_refreshed = False
 
-        try:
-            session = await self._get_session()
-            async with session.get(user_data_url, headers=headers, params=payload) as response:
-                _ = await response.text()
-                _LOGGER.debug("User Data response status: %s", response.status)
+        async def _get_user_data() -> List[SmartHubLocation]:
+            nonlocal token_refreshed
+            while True:
+                # Reuse the cached token - only log in again when it is missing, expired or rejected.
+                # Like the poll, the login runs in this request's limiter slot - never wait for the auth lock outside one
+                if not token_refreshed and self.token_cache.get() is None:
+                    await self._refresh_authentication()
+                    token_refreshed = True
 
-                if response.status == 401:
-                    raise SmartHubAuthenticationError("Invalid credentials")
-                elif response.status != 200:
-                    raise SmartHubConnectionError(
-                        f"User_data request failed with HTTP status: {response.status}"
-                    )
+                payload = {
+                  "userId" : self.primary_username,
+                }
 
-                try:
-                    response_json = await response.json()
-                except Exception as e:
-                    raise SmartHubDataError(f"Invalid JSON response: {e}") from e
+                request_token = self.token
+                headers = {
+                    "Authority": self.host,
+                    "Authorization": f"Bearer {request_token}",
+                    "Content-Type": "application/json",
+                    "X-Nisc-Smarthub-Username": self.email,
+                    "User-Agent": "HomeAssistant SmartHub Integration",
+                }
 
-                return self.parse_locations(response_json)
+                session = await self._get_session()
+                async with session.get(user_data_url, headers=headers, params=payload, timeout=self._client_timeout()) as response:
+                    body = await response.read()
+                    _LOGGER.debug("User Data response status: %s", response.status)
 
-        except ClientError as e:
-            raise SmartHubConnectionError(f"Connection error during User_data request: {e}") from e
+                    if response.status == 401:
+                        if not token_refreshed:
+                            _LOGGER.info("Cached token rejected, refreshing authentication...")
+                            await self._refresh_authentication(request_token)
+                            token_refreshed = True
+                            continue
+                        raise SmartHubAuthenticationError("Invalid credentials")
+                    self._check_retryable(response, "User_data request")
+                    if response.status != 200:
+                        raise SmartHubConnectionError(
+                            f"User_data request failed with HTTP status: {response.status}"
+                        )
 
-    async def get_energy_data(self, location, aggregation:Aggregation, start_datetime=None) -> Optional[Dict[str, Any]]:
-        """
-        Retrieve energy usage data asynchronously with retry logic.
+                    try:
+                        response_json = json_loads(body)
+                    except ValueError as e:
+                        raise SmartHubDataError(f"Invalid JSON response: {e}") from e
 
-        Returns:
-            Parsed energy usage data or None if no data available.
+                    locations = self.parse_locations(response_json)
+                    self.response_cache.set(cache_key, tuple(locations), USER_DATA_CACHE_TTL)
+                    return locations
 
-        Raises:
-            SmartHubAPIError: If the request fails after retries.
-        """
-        poll_url = f"https://{self.host}/services/secured/utility-usage/poll"
+        return await self._async_request(_get_user_data, "User_data request")
 
+    def _energy_request(self, location, aggregation:Aggregation, start_datetime=None, end_datetime=None) -> Dict[str, Any]:
+        """Build the utility-usage poll payload for a location, aggregation and window."""
         # Calculate startDateTime and endDateTime
-        now = datetime.now()
-        # Get data since specified start (or last 30 days) as of midnight yesterday
-        end_datetime = now.replace(minute=0, second=0, microsecond=0)
+        if end_datetime is None:
+          # Get data since specified start (or last 30 days) up to the current hour
+          end_datetime = datetime.now().replace(minute=0, second=0, microsecond=0)
         if start_datetime is None:
           # fetch data from last period
           start_datetime = end_datetime - timedelta(days=30)
 
+        # Align the start with the aggregation buckets (in the provider timezone), so
+        # callers asking for slightly different starts send - and cache - the same request
+        start_datetime = aggregation.bucket_start(start_datetime.astimezone(ZoneInfo(self.timezone)))
+
         start_timestamp = int(start_datetime.timestamp()) * 1000
         end_timestamp = int(end_datetime.timestamp()) * 1000
 
-        data = {
+        return {
             "timeFrame": aggregation.value,
             "userId": self.email,
             "screen": "USAGE_EXPLORER",
@@ -657,91 +856,159 @@ class SmartHubAPI:
             "endDateTime": str(end_timestamp),
         }
 
-        _LOGGER.debug("Requesting energy data from: %s startDateTime: %s endDateTime: %s aggregation: %s", poll_url, str(start_timestamp), str(end_timestamp), aggregation.value)
+    def _decode_poll_response(self, body: bytes, services: List[str]) -> PollResponse:
+        """Decode a poll response body into a PollResponse for the requested services."""
+        return PollResponse.from_json(json_loads(body), services)
+
+    async def _post_poll(self, data: Dict[str, Any]) -> PollResponse:
+        """
+        Send one utility-usage poll request, through the circuit breaker and retry policy.
+
+        Returns:
+            The decoded poll response - its status may still be PENDING.
+
+        Raises:
+            SmartHubAuthenticationError: If the token is rejected after a refresh.
+            SmartHubConnectionError: If the request fails after retries.
+        """
+        poll_url = f"{self.base_url}/services/secured/utility-usage/poll"
 
         # Track if we've already tried refreshing the token
         token_refreshed = False
 
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                # If token is unset - refresh auth
-                if not self.token:
+        async def _poll() -> PollResponse:
+            nonlocal token_refreshed
+            while True:
+                # If the cached token is unset or expired - refresh auth
+                if self.token_cache.get() is None:
                     await self._refresh_authentication()
                     token_refreshed = True
 
+                request_token = self.token
                 headers = {
                     "Authority": self.host,
-                    "Authorization": f"Bearer {self.token}",
+                    "Authorization": f"Bearer {request_token}",
                     "Content-Type": "application/json",
                     "X-Nisc-Smarthub-Username": self.email,
                     "User-Agent": "HomeAssistant SmartHub Integration",
                 }
 
                 session = await self._get_session()
-                async with session.post(poll_url, headers=headers, json=data) as response:
-                    _LOGGER.debug("Attempt %d: Response status: %s", attempt, response.status)
+                async with session.post(poll_url, headers=headers, json=data, timeout=self._client_timeout()) as response:
+                    _LOGGER.debug("Poll response status: %s", response.status)
 
                     if response.status == 401:
                         if not token_refreshed:
                             # Token expired, refresh and retry
                             _LOGGER.info("Token expired, refreshing authentication...")
-                            await self._refresh_authentication()
+                            await self._refresh_authentication(request_token)
                             token_refreshed = True
                             continue
                         else:
                             # Already tried refreshing, this is a persistent auth issue
                             raise SmartHubAuthenticationError("Authentication failed after token refresh")
-                    elif response.status != 200:
+                    self._check_retryable(response, "Utility-usage poll")
+                    if response.status != 200:
                         error_text = await response.text()
                         _LOGGER.warning("HTTP error %d: %s", response.status, error_text)
                         raise SmartHubConnectionError(
                             f"HTTP error {response.status}: {error_text}"
                         )
 
+                    body = await response.read()
                     try:
-                        response_json = await response.json()
-                        # _LOGGER.debug(response_json) # Specific parts of usage are logged separately - uncomment for full response
-                    except Exception as e:
+                        return await self._async_offload(
+                            len(body) >= self.offload_payload_size, self._decode_poll_response, body, data["industries"]
+                        )
+                    except (ValueError, KeyError, TypeError, AttributeError) as e:
                         raise SmartHubDataError(f"Invalid JSON response: {e}") from e
 
-                    # Check if the status is still pending
-                    status = response_json.get("status")
-                    if status == "PENDING":
-                        _LOGGER.debug("Attempt %d: Status is PENDING, retrying...", attempt)
-                        if attempt < MAX_RETRIES:
-                            await asyncio.sleep(RETRY_DELAY + attempt*RETRY_DELAY)
-                            continue
-                        else:
-                            _LOGGER.warning("Maximum retries reached, data still PENDING")
-                            return None
-                    elif status == "COMPLETE":
-                        _LOGGER.debug("Successfully retrieved energy data")
-                        return self.parse_usage(response_json, aggregation)
-                    else:
-                        _LOGGER.warning("Unexpected status in response: %s", status)
-                        _LOGGER.debug(response_json)
-                        # prevent failure - return empty dataset
-                        return {
-                          ELECTRIC_SERVICE : {"USAGE":[]},
-                          GAS_SERVICE : {"USAGE":[]},
-                          WATER_SERVICE : {"USAGE":[]},
-                        }
-
-            except SmartHubAuthenticationError:
-                # Re-raise auth errors immediately
-                raise
-            except ClientError as e:
-                if attempt < MAX_RETRIES:
-                    _LOGGER.warning(
-                        "Attempt %d failed with connection error: %s, retrying...",
-                        attempt, e
-                    )
-                    await asyncio.sleep(RETRY_DELAY)
-                    continue
-                else:
-                    raise SmartHubConnectionError(
-                        f"Connection failed after {MAX_RETRIES} attempts: {e}"
-                    ) from e
+        return await self._async_request(_poll, "utility-usage poll")
+
+    async def get_energy_data(self, location, aggregation:Aggregation, start_datetime=None, end_datetime=None, cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve energy usage data asynchronously with retry logic.
+
+        The window runs from start_datetime (default 30 days ago) up to
+        end_datetime (default the current hour).
+
+        While the server is still preparing the data (status PENDING), the
+        request waits on the shared PollScheduler instead of sleeping in place.
 
-        raise SmartHubAPIError(f"Failed to retrieve data after {MAX_RETRIES} attempts")
+        Concurrent calls for the same poll payload are coalesced - they share
+        one upstream request (including its PENDING re-polls) and one parse.
+        With cache False, the response isn't kept for later calls - for data
+        that is only read once.
 
+        Returns:
+            Parsed energy usage data or None if no data available.
+
+        Raises:
+            SmartHubAPIError: If the request fails after retries.
+        """
+        data = self._energy_request(location, aggregation, start_datetime, end_datetime)
+
+        # A cached response for the same window end is reused if it starts no later
+        start = int(data["startDateTime"])
+        cache_key = ("utility-usage", self.host, self.email, self.account_id, location.id, location.service, aggregation.value, data["endDateTime"])
+        cached = self.response_cache.get(cache_key, lambda entry: entry[0] <= start)
+        if cached is not None:
+            cached_start, parsed = cached
+            _LOGGER.debug("Using cached %s energy data for %s", aggregation.value, location)
+            if cached_start == start:
+                return parsed
+            start_datetime = datetime.fromtimestamp(start / 1000, tz=timezone.utc)
+            return {service: usage.since(start_datetime) for service, usage in parsed.items()}
+
+        key = (self.host, json.dumps(data, sort_keys=True))
+        request = self._inflight.get(key)
+        if request is not None:
+            self.coalesced_requests += 1
+            _LOGGER.debug("Joining in-flight %s energy request for %s", aggregation.value, location)
+        else:
+            # Outside the caller's context, so the callers joining later aren't charged against its refresh budget
+            request = self._inflight[key] = asyncio.get_running_loop().create_task(
+                self._fetch_energy_data(location, aggregation, data, cache_key if cache else None),
+                context=contextvars.Context(),
+            )
+            request.add_done_callback(functools.partial(self._request_done, key))
+
+        # Shielded so one caller giving up doesn't cancel the request for the others
+        return await async_within_budget(asyncio.shield(request), f"{aggregation.value} energy data")
+
+    def _request_done(self, key: Tuple[str, str], request: asyncio.Future) -> None:
+        """Forget a finished in-flight request."""
+        if self._inflight.get(key) is request:
+            del self._inflight[key]
+        if not request.cancelled():
+            request.exception() # retrieved by the waiting callers - avoid "never retrieved" warnings
+
+    async def _fetch_energy_data(self, location, aggregation: Aggregation, data: Dict[str, Any], cache_key: Optional[Tuple]) -> Optional[Dict[str, Any]]:
+        """Send a utility-usage poll and wait for and parse its data, caching COMPLETE responses under cache_key - see get_energy_data."""
+        _LOGGER.debug("Requesting energy data startDateTime: %s endDateTime: %s aggregation: %s", data["startDateTime"], data["endDateTime"], aggregation.value)
+
+        response = await self._post_poll(data)
+
+        # Check if the status is still pending
+        if response.pending:
+            _LOGGER.debug("Status is PENDING, waiting on the poll scheduler...")
+            response = await self.poll_scheduler.async_wait(functools.partial(self._post_poll, data))
+            if response is None:
+                return None
+
+        if response.status == "COMPLETE":
+            _LOGGER.debug("Successfully retrieved energy data")
+            if response.usage_points(location.service) >= self.offload_parse_points:
+                parsed = await self._async_offload(True, self._parse_usage_resolved, response, aggregation, location.service)
+            else:
+                parsed = await self._async_offload(False, self.parse_poll_response, response, aggregation, location.service)
+            if cache_key is not None:
+                self.response_cache.set(cache_key, (int(data["startDateTime"]), parsed), USAGE_CACHE_TTL)
+            return parsed
+
+        _LOGGER.warning("Unexpected status in response: %s", response.status)
+        _LOGGER.debug(response)
+        # prevent failure - return empty dataset
+        return {
+          location.service : ServiceUsage(USAGE=UsageSeries(ZoneInfo(self.timezone))),
+        }
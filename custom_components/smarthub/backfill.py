@@ -0,0 +1,159 @@
+"""Background import of the SmartHub statistics history."""
+from __future__ import annotations
+
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.start import async_at_started
+
+from .api import Aggregation, SmartHubLocation
+from .planner import BackfillPlan
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BackfillQueue:
+    """First-time statistics imports, kept off the refresh path.
+
+    A refresh that finds no statistics for an aggregation of a location
+    schedules it here instead of importing the history itself. Once the
+    refresh is done - and Home Assistant has started - one background task
+    imports the scheduled locations one at a time, so the history never
+    competes with the current data the entities need. Before it starts, the
+    requests and payload of every location's BackfillPlan are estimated.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        async_import: Callable[[SmartHubLocation, List[Aggregation]], Awaitable[None]],
+        plan: Optional[Callable[[SmartHubLocation, List[Aggregation]], BackfillPlan]] = None,
+    ) -> None:
+        """Initialize the BackfillQueue."""
+        self.hass = hass
+        self.config_entry = config_entry
+        self._async_import = async_import
+        self._plan = plan
+        # Scheduled aggregations by location id and service, in the order they were scheduled
+        self._pending: Dict[tuple[str, str], tuple[SmartHubLocation, Set[Aggregation]]] = {}
+        self._running: Set[tuple[str, str, Aggregation]] = set()
+        self._task_started = False
+        self._listeners: List[CALLBACK_TYPE] = []
+        self.current: Optional[SmartHubLocation] = None
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+        self.estimated_requests = 0
+        self.estimated_bytes = 0
+
+    @property
+    def running(self) -> bool:
+        """Return True while imports are scheduled or in progress."""
+        return self._task_started
+
+    @property
+    def progress(self) -> float:
+        """Return the percentage of the scheduled imports that are done."""
+        if not self.scheduled:
+            return 100.0
+        return round(100 * (self.completed + self.failed) / self.scheduled, 1)
+
+    def schedule(self, location: SmartHubLocation, aggregation: Aggregation) -> None:
+        """Schedule the history import of an aggregation of a location, unless it is already scheduled."""
+        if (location.id, location.service, aggregation) in self._running:
+            return
+        _, aggregations = self._pending.setdefault((location.id, location.service), (location, set()))
+        if aggregation in aggregations:
+            return
+        _LOGGER.debug("Scheduling the %s history import of location %s", aggregation.label, location)
+        aggregations.add(aggregation)
+        self.scheduled += 1
+        self._async_notify()
+
+    @callback
+    def async_start(self) -> None:
+        """Start importing the scheduled history in the background, once Home Assistant has started."""
+        if not self._pending or self._task_started:
+            return
+        self._task_started = True
+
+        @callback
+        def _async_create_task(_hass: HomeAssistant) -> None:
+            self.config_entry.async_create_background_task(
+                self.hass, self._async_run(), f"smarthub backfill {self.config_entry.entry_id}"
+            )
+
+        self.config_entry.async_on_unload(async_at_started(self.hass, _async_create_task))
+
+    def _estimate(self) -> None:
+        """Estimate the requests and payload of the scheduled imports."""
+        if self._plan is None:
+            return
+        plans = [
+            self._plan(location, sorted(aggregations, key=list(Aggregation).index))
+            for location, aggregations in self._pending.values()
+        ]
+        self.estimated_requests = sum(len(plan.requests) for plan in plans)
+        self.estimated_bytes = sum(plan.estimated_bytes for plan in plans)
+        _LOGGER.info(
+            "Importing the history of %d SmartHub locations: %d requests, about %d kB",
+            len(plans), self.estimated_requests, self.estimated_bytes // 1024,
+        )
+
+    async def _async_run(self) -> None:
+        self._estimate()
+        try:
+            while self._pending:
+                location, aggregations = self._pending.pop(next(iter(self._pending)))
+                keys = {(location.id, location.service, aggregation) for aggregation in aggregations}
+                self._running |= keys
+                self.current = location
+                self._async_notify()
+                try:
+                    await self._async_import(location, sorted(aggregations, key=list(Aggregation).index))
+                except Exception as e: # pylint: disable=broad-except
+                    # Still without statistics, so the next refresh schedules it again
+                    _LOGGER.warning("Failed to import the history of SmartHub location %s: %s", location, e)
+                    self.failed += len(aggregations)
+                else:
+                    _LOGGER.info("Imported the history of SmartHub location %s", location)
+                    self.completed += len(aggregations)
+                finally:
+                    self._running -= keys
+        finally:
+            self.current = None
+            self._task_started = False
+            self._async_notify()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for progress updates, returning a function that stops listening."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backfill statistics."""
+        return {
+            "running": self.running,
+            "progress": self.progress,
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "failed": self.failed,
+            "pending": sum(len(aggregations) for _, aggregations in self._pending.values()),
+            "current": self.current.id if self.current else None,
+            "estimated_requests": self.estimated_requests,
+            "estimated_bytes": self.estimated_bytes,
+        }
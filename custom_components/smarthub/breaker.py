@@ -0,0 +1,155 @@
+"""Circuit breaker for SmartHub hosts."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from aiohttp import ClientError
+
+from .const import BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+from .exceptions import (
+    SmartHubAuthenticationError,
+    SmartHubCircuitOpenError,
+    SmartHubDataError,
+    SmartHubRetryableError,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def is_host_failure(error: BaseException) -> bool:
+    """Return True if an error means the host is down."""
+    if isinstance(error, SmartHubRetryableError):
+        return error.status != 429 # rate limited - the host is up
+    return isinstance(error, (asyncio.TimeoutError, ClientError))
+
+
+def is_host_response(error: BaseException) -> bool:
+    """Return True if an error means the host is up - it answered, just not with usable data."""
+    if isinstance(error, SmartHubRetryableError):
+        return error.status == 429
+    return isinstance(error, (SmartHubAuthenticationError, SmartHubDataError))
+
+
+class CircuitBreaker:
+    """Stops requests to a host that keeps failing.
+
+    After `failure_threshold` consecutive host failures the circuit opens and
+    requests fail straight away with SmartHubCircuitOpenError. Once
+    `reset_timeout` has passed, the next request first runs one cheap probe -
+    shared by every request arriving meanwhile - and the circuit closes again
+    if the host answers.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the CircuitBreaker."""
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at: Optional[float] = None
+        self._probe: Optional[asyncio.Future] = None
+
+    @property
+    def state(self) -> str:
+        """Return the state of the circuit."""
+        if self._opened_at is None:
+            return STATE_CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    def record_success(self) -> None:
+        """Record a response from the host, closing the circuit."""
+        if self._opened_at is not None:
+            _LOGGER.info("SmartHub host %s is back, closing the circuit", self.host)
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Record a host failure, opening the circuit once there are too many in a row."""
+        self.failures += 1
+        if self._opened_at is not None:
+            # A failed probe - keep the circuit open for another reset_timeout
+            self._opened_at = time.monotonic()
+        elif self.failures >= self.failure_threshold:
+            _LOGGER.warning(
+                "SmartHub host %s failed %d times in a row, pausing requests for %ds",
+                self.host, self.failures, self.reset_timeout,
+            )
+            self.opened += 1
+            self._opened_at = time.monotonic()
+
+    async def async_guard(self, probe: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Wait until a request may be sent to the host.
+
+        Args:
+            probe: Coroutine function sending a cheap request, raising if the host is still down.
+
+        Raises:
+            SmartHubCircuitOpenError: If the circuit is open, or the probe failed.
+        """
+        state = self.state
+        if state == STATE_CLOSED:
+            return
+        if state == STATE_OPEN:
+            self.rejected += 1
+            raise SmartHubCircuitOpenError(f"SmartHub host {self.host} is unavailable, requests paused")
+
+        if self._probe is None:
+            self._probe = asyncio.ensure_future(self._async_probe(probe))
+            self._probe.add_done_callback(lambda probe: probe.cancelled() or probe.exception())
+        # Shielded so one caller giving up doesn't cancel the probe for the others
+        await asyncio.shield(self._probe)
+
+    async def _async_probe(self, probe: Callable[[], Awaitable[Any]]) -> None:
+        _LOGGER.debug("Probing SmartHub host %s", self.host)
+        try:
+            await probe()
+        except Exception as e: # pylint: disable=broad-except
+            self.record_failure()
+            raise SmartHubCircuitOpenError(f"SmartHub host {self.host} is still unavailable: {e}") from e
+        else:
+            self.record_success()
+        finally:
+            self._probe = None
+
+    async def async_call(self, request: Callable[[], Awaitable[T]], probe: Callable[[], Awaitable[Any]]) -> T:
+        """Send a request through the circuit, recording whether the host answered."""
+        await self.async_guard(probe)
+        try:
+            result = await request()
+        except Exception as e:
+            # Other errors (a nested request that gave up) say nothing about the host
+            if is_host_failure(e):
+                self.record_failure()
+            elif is_host_response(e):
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return circuit statistics."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
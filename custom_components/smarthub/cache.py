@@ -0,0 +1,68 @@
+"""Response cache for the SmartHub integration."""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .const import RESPONSE_CACHE_SIZE
+
+
+class ResponseCache:
+    """LRU cache of parsed responses, each entry expiring after its own TTL.
+
+    Callers choose the TTL per endpoint when storing a response. Once the
+    cache holds `max_entries` responses the least recently used one is
+    evicted.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE) -> None:
+        """Initialize an empty ResponseCache."""
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, accept: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if there is none or it expired.
+
+        Args:
+            key: The cache key.
+            accept: Optional check of the cached value - a rejected value counts as a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None or (accept is not None and not accept(entry[1])):
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Cache value under key for ttl seconds."""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
@@ -12,8 +12,18 @@ from .const import (
   CONF_POLL_INTERVAL,
   CONF_TIMEZONE,
   CONF_MFA_TOTP,
+  CONF_LOCATION_CONCURRENCY,
+  CONF_VERIFY_ROLLUPS,
+  CONF_HOURLY_HISTORY_DAYS,
+  CONF_DAILY_HISTORY_DAYS,
+  CONF_MONTHLY_HISTORY_DAYS,
+  CONF_STATISTICS_BATCH_SIZE,
   MIN_POLL_INTERVAL,
-  MAX_POLL_INTERVAL
+  MAX_POLL_INTERVAL,
+  MAX_LOCATION_CONCURRENCY,
+  MAX_HISTORY_DAYS,
+  MIN_STATISTICS_BATCH_SIZE,
+  MAX_STATISTICS_BATCH_SIZE,
 )
 from .api import SmartHubAPI
 from .exceptions import SmartHubAuthenticationError, SmartHubConnectionError
@@ -88,6 +98,12 @@ class SmartHubConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                  )
                ),
                vol.Required(CONF_POLL_INTERVAL, default=DEFAULT_POLL_INTERVAL): vol.All(vol.Coerce(int), vol.Range(min=MIN_POLL_INTERVAL, max=MAX_POLL_INTERVAL)),
+               vol.Optional(CONF_LOCATION_CONCURRENCY): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_LOCATION_CONCURRENCY)),
+               vol.Optional(CONF_VERIFY_ROLLUPS): bool,
+               vol.Optional(CONF_HOURLY_HISTORY_DAYS): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_HISTORY_DAYS)),
+               vol.Optional(CONF_DAILY_HISTORY_DAYS): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_HISTORY_DAYS)),
+               vol.Optional(CONF_MONTHLY_HISTORY_DAYS): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_HISTORY_DAYS)),
+               vol.Optional(CONF_STATISTICS_BATCH_SIZE): vol.All(vol.Coerce(int), vol.Range(min=MIN_STATISTICS_BATCH_SIZE, max=MAX_STATISTICS_BATCH_SIZE)),
             }
         )
 
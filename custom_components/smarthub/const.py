@@ -11,18 +11,58 @@ CONF_HOST = "host"
 CONF_POLL_INTERVAL = "poll_interval"
 CONF_TIMEZONE = "timezone"
 CONF_MFA_TOTP = "mfa_totp"
+CONF_LOCATION_CONCURRENCY = "location_concurrency"
+CONF_VERIFY_ROLLUPS = "verify_rollups"
+CONF_HOURLY_HISTORY_DAYS = "hourly_history_days"
+CONF_DAILY_HISTORY_DAYS = "daily_history_days"
+CONF_MONTHLY_HISTORY_DAYS = "monthly_history_days"
+CONF_STATISTICS_BATCH_SIZE = "statistics_batch_size"
 
 # Default values
 DEFAULT_POLL_INTERVAL = 360  # 6 hour in minutes
 MIN_POLL_INTERVAL = 15  # Minimum 15 minutes
 MAX_POLL_INTERVAL = 1440  # Maximum 24 hours
+DEFAULT_LOCATION_CONCURRENCY = 4  # locations fetched at the same time
+MAX_LOCATION_CONCURRENCY = 16
+DEFAULT_HOURLY_HISTORY_DAYS = 30  # first import - hourly data for this many days
+DEFAULT_MONTHLY_HISTORY_DAYS = 365  # first import - monthly data back to this many days
+MAX_HISTORY_DAYS = 3650
+DEFAULT_STATISTICS_BATCH_SIZE = 500  # statistics rows per recorder import job
+MIN_STATISTICS_BATCH_SIZE = 24
+MAX_STATISTICS_BATCH_SIZE = 10000
 
 # API constants
 DEFAULT_TIMEOUT = 30  # seconds
 MAX_RETRIES = 5
 RETRY_DELAY = 5  # seconds
-SESSION_TIMEOUT = 300  # 5 minutes - force session refresh
-HISTORICAL_IMPORT_DAYS = 90 # number of days for initial import
+RETRY_MAX_DELAY = 60  # seconds - cap on the backoff between retries, and on honoured Retry-After delays
+REFRESH_DEADLINE = 600  # seconds - every request of a refresh must finish by then
+REFRESH_RETRY_BUDGET = 10  # retries shared by every request of a refresh
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive host failures before requests to it are paused
+BREAKER_RESET_TIMEOUT = 300  # seconds - pause before probing a failed host again
+POLL_MAX_DELAY = 30  # seconds - cap on the shared delay between PENDING re-polls
+POOL_CONNECTION_LIMIT = 10  # connections per shared host session
+POOL_KEEPALIVE_TIMEOUT = 120  # seconds - keep idle connections open for reuse
+POOL_DNS_CACHE_TTL = 600  # seconds
+LIMITER_INITIAL = 4  # requests in flight to a host before it has proven healthy
+LIMITER_MIN = 1
+LIMITER_MAX = POOL_CONNECTION_LIMIT
+LIMITER_LATENCY_TARGET = 5  # seconds - slower responses don't raise the limit
+LIMITER_BACKOFF = 0.5  # the limit is multiplied by this when the host is overloaded
+TOKEN_LIFETIME = 1800  # seconds - assumed token lifetime when the token carries no expiry
+TOKEN_EXPIRY_MARGIN = 60  # seconds - refresh tokens this long before they expire
+OFFLOAD_PAYLOAD_SIZE = 256 * 1024  # bytes - larger responses are decoded in the executor
+OFFLOAD_PARSE_POINTS = 5000  # usage points - larger series are parsed in the executor
+RESPONSE_CACHE_SIZE = 128  # parsed responses kept per API client
+USAGE_CACHE_TTL = 600  # seconds - utility-usage responses, shorter than the minimum poll interval
+USER_DATA_CACHE_TTL = 3600  # seconds - service locations
+LOCATION_REFRESH_INTERVAL = 86400  # seconds - stored service locations are refetched daily
+HISTORICAL_IMPORT_DAYS = 90 # number of days for initial import - daily data back to this many days
+HISTORY_IMPORT_CONCURRENCY = 3  # history import windows fetched at the same time
+HISTORY_WINDOW_DAYS_HOURLY = 30  # days per history import request, by aggregation
+HISTORY_WINDOW_DAYS_DAILY = 365
+HISTORY_WINDOW_DAYS_MONTHLY = 3650
+RECORDER_MAX_BACKLOG = 10  # recorder queue items - statistics imports wait for the recorder beyond this
 
 # Sensor constants
 ENERGY_SENSOR_KEY = "current_energy_usage"
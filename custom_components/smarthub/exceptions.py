@@ -13,6 +13,20 @@ class SmartHubConnectionError(SmartHubError):
     """Connection error."""
 
 
+class SmartHubRetryableError(SmartHubConnectionError):
+    """HTTP error the request should be retried for - rate limiting or an unavailable server."""
+
+    def __init__(self, message: str, status: int, retry_after: float | None = None) -> None:
+        """Initialize the error with the HTTP status and the Retry-After delay, if any."""
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class SmartHubCircuitOpenError(SmartHubConnectionError):
+    """Requests to the host are paused after repeated failures."""
+
+
 class SmartHubAuthenticationError(SmartHubError):
     """Authentication error."""
 
@@ -21,5 +35,5 @@ class SmartHubDataError(SmartHubError):
     """Data parsing error."""
 
 
-class SmartHubTimeoutError(SmartHubError):
+class SmartHubTimeoutError(SmartHubConnectionError):
     """Request timeout error."""
\ No newline at end of file
@@ -0,0 +1,413 @@
+"""Resumable import of long SmartHub statistics histories."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import aclosing
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import (
+    get_last_statistics,
+    statistics_during_period,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import Aggregation, SmartHubLocation
+from .const import (
+    DOMAIN,
+    HISTORY_IMPORT_CONCURRENCY,
+    HISTORY_WINDOW_DAYS_DAILY,
+    HISTORY_WINDOW_DAYS_HOURLY,
+    HISTORY_WINDOW_DAYS_MONTHLY,
+    METER_NAME,
+)
+from .retry import refresh_budget
+from .statistics import async_import_statistics
+
+if TYPE_CHECKING:
+    from .sensor import SmartHubDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Days of data requested at a time
+WINDOW_DAYS = {
+    Aggregation.HOURLY: HISTORY_WINDOW_DAYS_HOURLY,
+    Aggregation.DAILY: HISTORY_WINDOW_DAYS_DAILY,
+    Aggregation.MONTHLY: HISTORY_WINDOW_DAYS_MONTHLY,
+}
+
+
+def _storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.history.{entry_id}"
+
+
+def split_windows(start: datetime, end: datetime, aggregation: Aggregation) -> Iterator[Tuple[datetime, datetime]]:
+    """Split [start, end) into request windows, with every boundary on an aggregation bucket start."""
+    step = timedelta(days=WINDOW_DAYS[aggregation])
+    window_start = aggregation.bucket_start(start)
+    while window_start < end:
+        window_end = aggregation.bucket_start(window_start + step)
+        if window_end <= window_start or window_end > end:
+            window_end = end
+        yield window_start, window_end
+        window_start = window_end
+
+
+@dataclass
+class ImportJob:
+    """The checkpoint of the import of one statistic - windows before `next` are imported."""
+
+    location: SmartHubLocation
+    aggregation: Aggregation
+    end: datetime
+    next: datetime
+    sum: float = 0.0
+    return_sum: float = 0.0
+
+    @property
+    def windows_left(self) -> int:
+        """Return the number of windows not imported yet."""
+        return sum(1 for _ in split_windows(self.next, self.end, self.aggregation))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the checkpoint as JSON-serializable data."""
+        return {
+            "location": asdict(self.location),
+            "aggregation": self.aggregation.value,
+            "end": self.end.isoformat(),
+            "next": self.next.isoformat(),
+            "sum": self.sum,
+            "return_sum": self.return_sum,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], timezone: ZoneInfo) -> ImportJob:
+        """Build a job from a stored checkpoint."""
+        return cls(
+            location=SmartHubLocation(**data["location"]),
+            aggregation=Aggregation(data["aggregation"]),
+            end=dt_util.parse_datetime(data["end"]).astimezone(timezone),
+            next=dt_util.parse_datetime(data["next"]).astimezone(timezone),
+            sum=data["sum"],
+            return_sum=data["return_sum"],
+        )
+
+
+class HistoryImporter:
+    """Imports arbitrary date ranges of statistics, one window at a time.
+
+    Each statistic's range is split into windows of WINDOW_DAYS. Up to
+    `concurrency` windows are fetched at the same time, but they are imported
+    in order, each continuing the running sum of the one before - so only
+    that many windows of data are held however long the range is, and their
+    statistics are added a batch at a time. After every window the job's
+    checkpoint is stored, and an import interrupted by a restart resumes
+    from there.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        coordinator: SmartHubDataUpdateCoordinator,
+        concurrency: int = HISTORY_IMPORT_CONCURRENCY,
+    ) -> None:
+        """Initialize the HistoryImporter."""
+        self.hass = hass
+        self.config_entry = config_entry
+        self.coordinator = coordinator
+        self.concurrency = concurrency
+        # Unfinished jobs by consumption statistic id, imported in this order
+        self.jobs: Dict[str, ImportJob] = {}
+        self._store: Store[Dict[str, Any]] = Store(hass, STORAGE_VERSION, _storage_key(config_entry.entry_id))
+        self._loaded = False
+        self._task_started = False
+        self._listeners: List[CALLBACK_TYPE] = []
+        self.current: Optional[str] = None
+        self.windows_total = 0
+        self.windows_done = 0
+        self.last_error: Optional[str] = None
+        self._started_at: Optional[float] = None
+
+    @property
+    def timezone(self) -> ZoneInfo:
+        """Return the provider timezone."""
+        return ZoneInfo(self.coordinator.api.timezone)
+
+    @property
+    def running(self) -> bool:
+        """Return True while an import is in progress."""
+        return self._task_started
+
+    @property
+    def progress(self) -> float:
+        """Return the percentage of the windows of the running import that are done."""
+        if not self.windows_total:
+            return 100.0
+        return round(100 * self.windows_done / self.windows_total, 1)
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Return the estimated seconds until the running import is done, from the pace so far."""
+        if self._started_at is None or not self.windows_done:
+            return None
+        elapsed = time.monotonic() - self._started_at
+        return round(elapsed / self.windows_done * (self.windows_total - self.windows_done))
+
+    async def _async_load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        data = await self._store.async_load()
+        if not data:
+            return
+        try:
+            self.jobs = {
+                statistic_id: ImportJob.from_dict(job, self.timezone)
+                for statistic_id, job in data["jobs"].items()
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            _LOGGER.warning("Ignoring invalid stored SmartHub history import: %s", e)
+            self.jobs = {}
+
+    async def _async_save(self) -> None:
+        await self._store.async_save({"jobs": {statistic_id: job.as_dict() for statistic_id, job in self.jobs.items()}})
+
+    async def async_resume(self) -> None:
+        """Resume an import interrupted by a restart, once Home Assistant has started."""
+        if self._loaded:
+            return
+        await self._async_load()
+        if not self.jobs:
+            return
+        _LOGGER.info("Resuming the SmartHub history import of %d statistics", len(self.jobs))
+
+        @callback
+        def _async_start(_hass: HomeAssistant) -> None:
+            self._async_start()
+
+        self.config_entry.async_on_unload(async_at_started(self.hass, _async_start))
+
+    async def async_import(
+        self,
+        start: datetime,
+        end: Optional[datetime],
+        locations: List[SmartHubLocation],
+        aggregations: List[Aggregation],
+    ) -> None:
+        """
+        Import the statistics of locations from start to end (default now) in the background.
+
+        A statistic already being imported is restarted with the new range.
+        When the statistic already has data after end, the import runs up to
+        now instead, so the running sum stays continuous.
+        """
+        await self._async_load()
+        now = Aggregation.HOURLY.bucket_start(dt_util.now(self.timezone))
+        end = min(end, now) if end is not None else now
+        for location in locations:
+            for aggregation in aggregations:
+                consumption_metadata, return_metadata = self.coordinator.statistic_metadata(location, aggregation)
+                statistic_id = consumption_metadata["statistic_id"]
+                job = await self._async_new_job(location, aggregation, start, end, now, statistic_id, return_metadata["statistic_id"])
+                self.jobs.pop(statistic_id, None)
+                self.jobs[statistic_id] = job
+                if self._task_started:
+                    self.windows_total += job.windows_left
+        await self._async_save()
+        self._async_start()
+
+    async def _async_new_job(
+        self,
+        location: SmartHubLocation,
+        aggregation: Aggregation,
+        start: datetime,
+        end: datetime,
+        now: datetime,
+        statistic_id: str,
+        return_statistic_id: str,
+    ) -> ImportJob:
+        recorder = get_instance(self.hass)
+        last_stat = await recorder.async_add_executor_job(
+            get_last_statistics, self.hass, 1, statistic_id, True, set()
+        )
+        if last_stat and last_stat[statistic_id][0]["start"] >= end.timestamp():
+            _LOGGER.info("%s has statistics after %s - importing up to now to keep its sum continuous", statistic_id, end)
+            end = now
+
+        # The sums continue from the statistics just before the range, if there are any
+        start = aggregation.bucket_start(start)
+        before = await recorder.async_add_executor_job(
+            statistics_during_period,
+            self.hass,
+            start - timedelta(days=WINDOW_DAYS[aggregation]),
+            start,
+            {statistic_id, return_statistic_id},
+            aggregation.period,
+            None,
+            {"sum"},
+        )
+
+        def _last_sum(rows: list[Any]) -> float:
+            if rows and rows[-1].get("sum") is not None:
+                return float(rows[-1]["sum"])
+            return 0.0
+
+        return ImportJob(
+            location=location,
+            aggregation=aggregation,
+            end=end,
+            next=start,
+            sum=_last_sum(before.get(statistic_id, [])),
+            return_sum=_last_sum(before.get(return_statistic_id, [])),
+        )
+
+    @callback
+    def _async_start(self) -> None:
+        if not self.jobs or self._task_started:
+            return
+        self._task_started = True
+        self.config_entry.async_create_background_task(
+            self.hass, self._async_run(), f"smarthub history import {self.config_entry.entry_id}"
+        )
+
+    async def _async_run(self) -> None:
+        self.windows_total = sum(job.windows_left for job in self.jobs.values())
+        self.windows_done = 0
+        self.last_error = None
+        self._started_at = time.monotonic()
+        self._async_notify()
+        try:
+            while self.jobs:
+                statistic_id = next(iter(self.jobs))
+                job = self.jobs[statistic_id]
+                self.current = statistic_id
+                _LOGGER.info("Importing %s from %s to %s", statistic_id, job.next, job.end)
+                await self._async_run_job(job)
+                # Only finished once every window is in - the service may have restarted it with a new range
+                if self.jobs.get(statistic_id) is job and job.next >= job.end:
+                    del self.jobs[statistic_id]
+                    await self._async_save()
+                    _LOGGER.info("Imported the history of %s", statistic_id)
+        except Exception as e: # pylint: disable=broad-except
+            # The checkpoints stay stored - the next call of the service, or a restart, resumes the import
+            _LOGGER.error("SmartHub history import of %s stopped: %s", self.current, e)
+            self.last_error = str(e)
+        finally:
+            self.current = None
+            self._task_started = False
+            self._async_notify()
+
+    async def _async_run_job(self, job: ImportJob) -> None:
+        async with aclosing(self._async_fetch_windows(job)) as windows:
+            async for window, data in windows:
+                await self._async_import_window(job, window, data)
+
+    async def _async_fetch_windows(self, job: ImportJob) -> AsyncIterator[Tuple[Tuple[datetime, datetime], Optional[Dict[str, Any]]]]:
+        """Yield the data of the windows of a job in order, fetching up to `concurrency` windows ahead."""
+        fetches: Deque[Tuple[Tuple[datetime, datetime], asyncio.Task]] = deque()
+        try:
+            for window in split_windows(job.next, job.end, job.aggregation):
+                fetches.append((window, self._fetch(job, *window)))
+                if len(fetches) >= self.concurrency:
+                    window, fetch = fetches.popleft()
+                    yield window, await fetch
+            while fetches:
+                window, fetch = fetches.popleft()
+                yield window, await fetch
+        finally:
+            for _, fetch in fetches:
+                fetch.cancel()
+            # Wait for the cancelled fetches to stop, retrieving the errors of those that failed already
+            await asyncio.gather(*(fetch for _, fetch in fetches), return_exceptions=True)
+
+    def _fetch(self, job: ImportJob, start: datetime, end: datetime) -> asyncio.Task:
+        # Each window gets its own deadline and retry budget - the task copies the context now
+        with refresh_budget():
+            # Every window is only read once - caching it would keep the whole range in memory
+            return asyncio.ensure_future(self.coordinator.api.get_energy_data(
+                location=job.location, aggregation=job.aggregation, start_datetime=start, end_datetime=end, cache=False,
+            ))
+
+    async def _async_import_window(self, job: ImportJob, window: Tuple[datetime, datetime], data: Optional[Dict[str, Any]]) -> None:
+        """Add the statistics of the next window of a job, and store its checkpoint."""
+        start, end = window
+        service_data = data.get(job.location.service) if data else None
+        has_data = service_data is not None and (
+            (job.aggregation != Aggregation.HOURLY or service_data.get("hasHourly"))
+            and (job.aggregation != Aggregation.DAILY or service_data.get("hasDaily"))
+        )
+        if has_data and service_data.get("USAGE"):
+            consumption_metadata, return_metadata = self.coordinator.statistic_metadata(job.location, job.aggregation)
+            self.coordinator.apply_meter_name(job.location, job.aggregation, consumption_metadata, return_metadata, service_data.get(METER_NAME))
+
+            _, last_sum = await async_import_statistics(
+                self.hass,
+                consumption_metadata,
+                service_data["USAGE"].since(start).until(end).iter_statistics(job.sum),
+                self.coordinator.statistics_batch_size,
+            )
+            if last_sum is not None:
+                job.sum = last_sum
+            if service_data.get("USAGE_RETURN"):
+                _, last_sum = await async_import_statistics(
+                    self.hass,
+                    return_metadata,
+                    service_data["USAGE_RETURN"].since(start).until(end).iter_statistics(job.return_sum),
+                    self.coordinator.statistics_batch_size,
+                )
+                if last_sum is not None:
+                    job.return_sum = last_sum
+        else:
+            _LOGGER.debug("No %s data for %s from %s to %s", job.aggregation.label, job.location, start, end)
+
+        job.next = end
+        self.windows_done += 1
+        await self._async_save()
+        self._async_notify()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for progress updates, returning a function that stops listening."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return import statistics."""
+        return {
+            "running": self.running,
+            "progress": self.progress,
+            "windows": self.windows_total,
+            "windows_done": self.windows_done,
+            "eta": self.eta,
+            "statistics_pending": len(self.jobs),
+            "current": self.current,
+            "last_error": self.last_error,
+        }
+
+
+async def async_remove_history(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the stored import checkpoints of a config entry."""
+    await Store(hass, STORAGE_VERSION, _storage_key(entry_id)).async_remove()
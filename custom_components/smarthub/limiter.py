@@ -0,0 +1,194 @@
+"""Adaptive concurrency limit for SmartHub hosts."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, TypeVar
+
+from .const import (
+    LIMITER_BACKOFF,
+    LIMITER_INITIAL,
+    LIMITER_LATENCY_TARGET,
+    LIMITER_MAX,
+    LIMITER_MIN,
+)
+from .exceptions import SmartHubRetryableError
+from .retry import async_within_budget
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Set while a task holds a slot - requests it makes meanwhile (a re-login) use that slot
+_holding: ContextVar[bool] = ContextVar("smarthub_limiter_slot", default=False)
+
+
+def is_overload(error: BaseException) -> bool:
+    """Return True if an error means the host is overloaded - rate limiting, an unavailable server or a timeout."""
+    return isinstance(error, (SmartHubRetryableError, asyncio.TimeoutError))
+
+
+class AdaptiveLimiter:
+    """Additive-increase/multiplicative-decrease limit on the requests in flight to a host.
+
+    Each healthy response - faster than `latency_target` and not PENDING -
+    raises the limit by 1/limit, so about one request per round of requests.
+    An overload response cuts it by `backoff`, at most once per round: the
+    failures of requests sent before the last cut don't cut it again.
+    """
+
+    def __init__(
+        self,
+        initial: float = LIMITER_INITIAL,
+        minimum: int = LIMITER_MIN,
+        maximum: int = LIMITER_MAX,
+        latency_target: float = LIMITER_LATENCY_TARGET,
+        backoff: float = LIMITER_BACKOFF,
+    ) -> None:
+        """Initialize the AdaptiveLimiter."""
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self._last_decrease = float("-inf")
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def _acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # No longer than the refresh deadline - a slot that never frees up fails the request instead of hanging it
+            await async_within_budget(waiter, "a request slot")
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self._release() # woken up, but no longer needs the slot
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _increase(self) -> None:
+        if self.limit < self.maximum:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.increases += 1
+            self._wake()
+
+    def _decrease(self, started: float) -> None:
+        if started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self.limit = max(self.minimum, self.limit * self.backoff)
+        self.decreases += 1
+        _LOGGER.debug("SmartHub host overloaded, limiting requests to %d", int(self.limit))
+
+    async def async_call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Send a request once a slot is free, adapting the limit to how the host responded."""
+        if _holding.get():
+            return await request()
+
+        await self._acquire()
+        token = _holding.set(True)
+        started = time.monotonic()
+        try:
+            result = await request()
+        except Exception as e:
+            if is_overload(e):
+                self._decrease(started)
+            raise
+        finally:
+            _holding.reset(token)
+            self._release()
+
+        # PENDING responses mean the server is still busy - don't push it harder
+        if time.monotonic() - started <= self.latency_target and not getattr(result, "pending", False):
+            self._increase()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return limiter statistics."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+
+class LocationCap:
+    """Cap on the locations fetched at the same time from a host, by every client of the host.
+
+    Each client asks for its configured limit, and the cap is the largest
+    limit of the clients still using the host - so reloading an entry with a
+    new limit resizes the cap, and an entry that is gone no longer counts.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the LocationCap."""
+        self.limits: Dict[Any, int] = {}
+        self.in_use = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        """Return the number of locations fetched at the same time."""
+        return max(self.limits.values(), default=1)
+
+    def set_limit(self, client: Any, limit: int) -> None:
+        """Set the limit a client asks for."""
+        if self.limits.get(client) != limit:
+            self.limits[client] = limit
+            self._wake()
+
+    def discard(self, client: Any) -> None:
+        """Forget the limit of a client that no longer uses the host."""
+        self.limits.pop(client, None)
+
+    async def __aenter__(self) -> None:
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release() # woken up, but no longer needs the slot
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._release()
+
+    def _release(self) -> None:
+        self.in_use -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_use < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_use += 1
+                waiter.set_result(None)
@@ -0,0 +1,112 @@
+"""Persistent cache of SmartHub service locations."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import SmartHubAPI, SmartHubLocation
+from .const import DOMAIN, LOCATION_REFRESH_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+def location_hash(locations: List[SmartHubLocation]) -> str:
+    """Return a content hash of a location list, independent of its order."""
+    content = json.dumps(sorted([location.id, location.service, location.description, location.provider] for location in locations))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.locations.{entry_id}"
+
+
+class LocationStore:
+    """Service locations of a config entry, kept in Home Assistant storage.
+
+    The user-data response behind the location list is only refetched every
+    LOCATION_REFRESH_INTERVAL, or on the next poll after an error - past the
+    API's response cache. Every other poll reuses the stored list, and `hash`
+    tells callers when it changed.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, api: SmartHubAPI) -> None:
+        """Initialize the LocationStore."""
+        self.api = api
+        self.locations: Optional[List[SmartHubLocation]] = None
+        self.hash: Optional[str] = None
+        self.fetched_at: Optional[datetime] = None
+        self._invalidated = False
+        self._store: Store[Dict[str, Any]] = Store(hass, STORAGE_VERSION, _storage_key(entry_id))
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the stored locations."""
+        self._loaded = True
+        data = await self._store.async_load()
+        if not data:
+            return
+        try:
+            self.locations = [SmartHubLocation(**location) for location in data["locations"]]
+            self.hash = data["hash"]
+            self.fetched_at = dt_util.parse_datetime(data["fetched_at"])
+        except (KeyError, TypeError) as e:
+            _LOGGER.warning("Ignoring invalid stored SmartHub locations: %s", e)
+            self.locations = self.hash = self.fetched_at = None
+
+    def invalidate(self) -> None:
+        """Refetch the locations on the next call to async_get_locations, bypassing the response cache."""
+        self.fetched_at = None
+        self._invalidated = True
+
+    @property
+    def stale(self) -> bool:
+        """Return True if the locations should be refetched."""
+        return (
+            self.locations is None
+            or self.fetched_at is None
+            or (dt_util.utcnow() - self.fetched_at).total_seconds() >= LOCATION_REFRESH_INTERVAL
+        )
+
+    async def async_get_locations(self) -> List[SmartHubLocation]:
+        """Return the service locations, refetching them from SmartHub if stale."""
+        if not self._loaded:
+            await self.async_load()
+        if not self.stale:
+            return self.locations
+
+        try:
+            locations = await self.api.get_service_locations(refresh=self._invalidated)
+        except Exception as e:
+            if self.locations is None:
+                raise
+            _LOGGER.warning("Failed to refresh SmartHub locations, using the stored list: %s", e)
+            return self.locations
+
+        new_hash = location_hash(locations)
+        if new_hash != self.hash:
+            _LOGGER.info("SmartHub locations changed: %d locations", len(locations))
+        self.locations = locations
+        self.hash = new_hash
+        self.fetched_at = dt_util.utcnow()
+        self._invalidated = False
+        await self._store.async_save({
+            "hash": self.hash,
+            "fetched_at": self.fetched_at.isoformat(),
+            "locations": [asdict(location) for location in locations],
+        })
+        return locations
+
+
+async def async_remove_locations(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the stored locations of a config entry."""
+    await Store(hass, STORAGE_VERSION, _storage_key(entry_id)).async_remove()
@@ -0,0 +1,177 @@
+"""Tiered-resolution planning of first-time statistics imports."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .api import Aggregation, SmartHubAPI, SmartHubLocation
+from .const import METER_NAME
+from .rollup import concat_usage, rollup_usage
+from .usage import UsageSeries
+
+_LOGGER = logging.getLogger(__name__)
+
+# Readings per hour of an HOURLY response - SmartHub often sends 15 minute readings
+READINGS_PER_HOUR = 4
+# Approximate JSON size of one reading, e.g. {"x":1762215300000,"y":1.234},
+BYTES_PER_READING = 32
+
+# Finest first
+RESOLUTIONS = [Aggregation.HOURLY, Aggregation.DAILY, Aggregation.MONTHLY]
+
+# The flag telling whether a response really has data at its resolution
+RESOLUTION_FLAGS = {Aggregation.HOURLY: "hasHourly", Aggregation.DAILY: "hasDaily"}
+
+
+@dataclass(frozen=True)
+class PlannedRequest:
+    """One request of a BackfillPlan - the usage of [start, end) at one resolution."""
+
+    aggregation: Aggregation
+    start: datetime
+    end: datetime
+
+    @property
+    def estimated_readings(self) -> int:
+        """Return the number of readings the response should hold, at most."""
+        if self.aggregation == Aggregation.HOURLY:
+            return math.ceil((self.end - self.start).total_seconds() / 3600) * READINGS_PER_HOUR
+        if self.aggregation == Aggregation.DAILY:
+            return math.ceil((self.end - self.start).total_seconds() / 86400)
+        return (self.end.year - self.start.year) * 12 + self.end.month - self.start.month + 1
+
+
+@dataclass(frozen=True)
+class BackfillPlan:
+    """The requests importing the history of a location, oldest first."""
+
+    requests: Tuple[PlannedRequest, ...]
+
+    @property
+    def estimated_readings(self) -> int:
+        """Return the number of readings of every request, at most."""
+        return sum(request.estimated_readings for request in self.requests)
+
+    @property
+    def estimated_bytes(self) -> int:
+        """Return the approximate size of every response."""
+        return self.estimated_readings * BYTES_PER_READING
+
+
+def plan_backfill(
+    now: datetime,
+    aggregations: List[Aggregation],
+    hourly_days: int,
+    daily_days: int,
+    monthly_days: int,
+) -> BackfillPlan:
+    """
+    Plan the import of the history up to now at decreasing resolution.
+
+    HOURLY data is only requested for the last `hourly_days`, DAILY data
+    before that back to `daily_days`, and MONTHLY data before that back to
+    `monthly_days`. Tier boundaries fall on the start of a day (HOURLY/DAILY)
+    or month (DAILY/MONTHLY), so rolled up readings never overlap. Tiers finer
+    than the finest requested aggregation are left out.
+
+    Args:
+        now: The current time, in the provider timezone.
+    """
+    end = Aggregation.HOURLY.bucket_start(now)
+    hourly_start = Aggregation.DAILY.bucket_start(now - timedelta(days=hourly_days))
+    daily_start = min(hourly_start, Aggregation.MONTHLY.bucket_start(now - timedelta(days=daily_days)))
+    monthly_start = min(daily_start, Aggregation.MONTHLY.bucket_start(now - timedelta(days=monthly_days)))
+    starts = {Aggregation.HOURLY: hourly_start, Aggregation.DAILY: daily_start, Aggregation.MONTHLY: monthly_start}
+
+    finest = min((RESOLUTIONS.index(aggregation) for aggregation in aggregations), default=len(RESOLUTIONS) - 1)
+    requests = []
+    boundary = end
+    for aggregation in RESOLUTIONS[finest:]:
+        start = starts[aggregation]
+        if start < boundary:
+            requests.append(PlannedRequest(aggregation, start, boundary))
+            boundary = start
+    return BackfillPlan(tuple(reversed(requests)))
+
+
+class TieredFetcher:
+    """Serve HOURLY, DAILY and MONTHLY usage for the first import of a location from a BackfillPlan.
+
+    Every request of the plan is made once, on the first `async_get`. A
+    statistic gets the readings of the tier at its own resolution, followed by
+    the finer, more recent tiers rolled up - the DAILY statistic gets the
+    DAILY tier and the HOURLY tier summed into days. When the HOURLY request
+    has no hourly data, DAILY data is requested for its window instead.
+
+    Same interface as RollupFetcher, so it can stand in for it.
+    """
+
+    def __init__(self, api: SmartHubAPI, location: SmartHubLocation, plan: BackfillPlan) -> None:
+        """Initialize the TieredFetcher."""
+        self.api = api
+        self.location = location
+        self.plan = plan
+        self._task: Optional[asyncio.Future] = None
+
+    def discard(self, aggregation: Aggregation) -> None:
+        """Every tier is requested anyway - nothing to stop waiting for."""
+
+    def _has_data(self, aggregation: Aggregation, service_data: Optional[Dict[str, Any]]) -> bool:
+        flag = RESOLUTION_FLAGS.get(aggregation)
+        return bool(service_data) and bool(service_data.get("USAGE")) and (flag is None or bool(service_data.get(flag)))
+
+    async def _async_fetch_tier(self, request: PlannedRequest) -> Tuple[PlannedRequest, Optional[Dict[str, Any]]]:
+        service = self.location.service
+        data = await self.api.get_energy_data(
+            location=self.location, aggregation=request.aggregation, start_datetime=request.start, end_datetime=request.end,
+        )
+        service_data = data.get(service) if data else None
+        if request.aggregation == Aggregation.HOURLY and not self._has_data(Aggregation.HOURLY, service_data):
+            _LOGGER.debug("No hourly data for %s - requesting DAILY data from %s", self.location, request.start)
+            request = PlannedRequest(Aggregation.DAILY, request.start, request.end)
+            data = await self.api.get_energy_data(
+                location=self.location, aggregation=request.aggregation, start_datetime=request.start, end_datetime=request.end,
+            )
+            service_data = data.get(service) if data else None
+        return request, service_data
+
+    async def _async_fetch(self) -> List[Tuple[PlannedRequest, Optional[Dict[str, Any]]]]:
+        return list(await asyncio.gather(*(self._async_fetch_tier(request) for request in self.plan.requests)))
+
+    async def async_get(self, aggregation: Aggregation, start_datetime: datetime) -> Dict[str, Any]:
+        """Return parsed energy data for the aggregation covering the plan - start_datetime is set by the plan instead."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._async_fetch())
+        tiers = await self._task
+
+        service = self.location.service
+        resolution = RESOLUTIONS.index(aggregation)
+        combined: Dict[str, Any] = {"hasHourly": False, "hasDaily": False}
+        usage: Dict[str, List[UsageSeries]] = {"USAGE": [], "USAGE_RETURN": []}
+        for request, service_data in tiers:
+            if RESOLUTIONS.index(request.aggregation) > resolution or not self._has_data(request.aggregation, service_data):
+                continue
+            flag = RESOLUTION_FLAGS.get(request.aggregation)
+            if flag is not None:
+                combined[flag] = True
+            if service_data.get(METER_NAME) is not None:
+                combined[METER_NAME] = service_data[METER_NAME]
+            for key in usage:
+                if key not in service_data:
+                    continue
+                series = service_data[key].since(request.start).until(request.end)
+                if request.aggregation != aggregation:
+                    series = rollup_usage(series, aggregation)
+                usage[key].append(series)
+
+        # A coarser statistic also has the data of the finer tiers
+        if combined["hasHourly"]:
+            combined["hasDaily"] = True
+        for key, series in usage.items():
+            if series:
+                combined[key] = concat_usage(series)
+        return {service: combined}
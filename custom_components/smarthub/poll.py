@@ -0,0 +1,129 @@
+"""Scheduling of PENDING SmartHub utility-usage polls."""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from .const import (
+    MAX_RETRIES,
+    RETRY_DELAY,
+    POLL_MAX_DELAY,
+)
+from .responses import PollResponse
+
+_LOGGER = logging.getLogger(__name__)
+
+PollCallable = Callable[[], Awaitable[PollResponse]]
+
+
+class _PendingPoll:
+    """A poll waiting for the server to finish preparing its data."""
+
+    __slots__ = ("poll", "future", "attempts")
+
+    def __init__(self, poll: PollCallable, future: asyncio.Future) -> None:
+        self.poll = poll
+        self.future = future
+        self.attempts = 1 # the initial request already returned PENDING
+
+
+class PollScheduler:
+    """Re-polls every PENDING request of a client together.
+
+    Instead of each request sleeping in place between its own retries, PENDING
+    requests are handed to the scheduler. A single task re-polls all of them
+    each round, in submission order, and resolves each request as soon as its
+    data is COMPLETE. The delay between rounds is shared and adaptive: it
+    grows while nothing completes and shrinks back when jobs finish, so the
+    total wait is bounded by the slowest server job rather than the sum of
+    every request's backoff. Once every request is resolved the delay starts
+    over, so a later PENDING request doesn't inherit an old backoff.
+    """
+
+    def __init__(
+        self,
+        delay: float = RETRY_DELAY,
+        max_delay: float = POLL_MAX_DELAY,
+        max_attempts: int = MAX_RETRIES,
+    ) -> None:
+        """Initialize the PollScheduler."""
+        self.min_delay = delay
+        self.max_delay = max_delay
+        self.delay = delay
+        self.max_attempts = max_attempts
+        self._pending: List[_PendingPoll] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Return the number of requests waiting on the server."""
+        return len(self._pending)
+
+    async def async_wait(self, poll: PollCallable) -> Optional[PollResponse]:
+        """Re-poll until the response is no longer PENDING.
+
+        Args:
+            poll: Coroutine function issuing the poll request and returning the decoded response.
+
+        Returns:
+            The first non-PENDING response, or None if the data is still
+            PENDING after `max_attempts` polls.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_PendingPoll(poll, future))
+        if self._task is None or self._task.done():
+            # Shared by every waiting request - not run under the refresh budget of the first one
+            self._task = asyncio.create_task(self._async_run(), context=contextvars.Context())
+        return await future
+
+    async def _async_run(self) -> None:
+        try:
+            while self._pending:
+                await asyncio.sleep(self.delay)
+                await self._async_poll_round()
+            self.delay = self.min_delay
+        finally:
+            # Never leave a caller waiting if the scheduler is cancelled
+            for pending in self._pending:
+                if not pending.future.done():
+                    pending.future.cancel()
+            self._pending.clear()
+
+    async def _async_poll_round(self) -> None:
+        batch = list(self._pending)
+        _LOGGER.debug("Re-polling %d PENDING requests", len(batch))
+        completed = 0
+
+        async def _poll(pending: _PendingPoll) -> None:
+            nonlocal completed
+            try:
+                response = await pending.poll()
+            except Exception as e: # pylint: disable=broad-except
+                self._pending.remove(pending)
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+                return
+
+            pending.attempts += 1
+            if response.pending:
+                if pending.attempts < self.max_attempts:
+                    return
+                _LOGGER.warning("Maximum retries reached, data still PENDING")
+                response = None
+            else:
+                completed += 1
+
+            self._pending.remove(pending)
+            if not pending.future.done():
+                pending.future.set_result(response)
+
+        await asyncio.gather(*(_poll(pending) for pending in batch))
+
+        # Shared adaptive backoff - back off while the server is still busy,
+        # speed back up as soon as jobs start completing.
+        if completed:
+            self.delay = max(self.min_delay, self.delay / 2)
+        else:
+            self.delay = min(self.max_delay, self.delay * 1.5)
@@ -0,0 +1,96 @@
+"""Typed SmartHub poll responses."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+# Meters without a flowDirection are forward meters
+DEFAULT_FLOW_DIRECTION = "FORWARD"
+
+
+@dataclass(frozen=True, slots=True)
+class Meter:
+    """A meter of a usage entry and the series holding its readings."""
+
+    series_id: str
+    flow_direction: str
+
+    @classmethod
+    def from_json(cls, meter: Dict[str, Any]) -> Meter:
+        """Build a Meter from its decoded JSON."""
+        return cls(meter["seriesId"], meter.get("flowDirection", DEFAULT_FLOW_DIRECTION))
+
+
+@dataclass(frozen=True, slots=True)
+class Series:
+    """A named usage series - `data` holds the raw {"x", "y"} points."""
+
+    name: Optional[str]
+    data: List[Dict[str, Any]]
+
+    @classmethod
+    def from_json(cls, series: Dict[str, Any]) -> Series:
+        """Build a Series from its decoded JSON."""
+        return cls(series.get("name"), series.get("data") or [])
+
+
+@dataclass(frozen=True, slots=True)
+class UsageEntry:
+    """An entry of a service in a poll response."""
+
+    type: str
+    has_hourly: bool
+    has_daily: bool
+    meters: List[Meter]
+    series: List[Series]
+    raw: Dict[str, Any] = field(repr=False, compare=False)
+
+    @classmethod
+    def from_json(cls, entry: Dict[str, Any]) -> UsageEntry:
+        """Build a UsageEntry from its decoded JSON."""
+        return cls(
+            entry.get("type", ""),
+            entry.get("hasHourly", False),
+            entry.get("hasDaily", False),
+            [Meter.from_json(meter) for meter in entry.get("meters") or []],
+            [Series.from_json(series) for series in entry.get("series") or []],
+            entry,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class PollResponse:
+    """A decoded utility-usage poll response.
+
+    Only the entries of the services it was built for are converted - the
+    rest of the payload is never walked.
+    """
+
+    status: Optional[str]
+    has_hourly: bool = False
+    has_daily: bool = False
+    services: Dict[str, List[UsageEntry]] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, response: Dict[str, Any], services: Iterable[str]) -> PollResponse:
+        """Build a PollResponse from its decoded JSON, keeping the entries of the given services."""
+        data = response.get("data") or {}
+        return cls(
+            response.get("status"),
+            data.get("hasHourly", False),
+            data.get("hasDaily", False),
+            {
+                service: [UsageEntry.from_json(entry) for entry in data[service]]
+                for service in services
+                if data.get(service)
+            },
+        )
+
+    @property
+    def pending(self) -> bool:
+        """Return True while the server is still preparing the data."""
+        return self.status == "PENDING"
+
+    def usage_points(self, service: str) -> int:
+        """Return the number of usage points of a service."""
+        return sum(len(series.data) for entry in self.services.get(service, []) for series in entry.series)
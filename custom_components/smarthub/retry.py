@@ -0,0 +1,217 @@
+"""Retry policy for SmartHub requests."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+from aiohttp import ClientError
+
+from .const import (
+    MAX_RETRIES,
+    REFRESH_DEADLINE,
+    REFRESH_RETRY_BUDGET,
+    RETRY_DELAY,
+    RETRY_MAX_DELAY,
+)
+from .exceptions import SmartHubConnectionError, SmartHubRetryableError, SmartHubTimeoutError
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Server responses worth retrying - rate limiting and an overloaded or restarting server
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the delay in seconds asked for by a Retry-After header, or None if there is no valid one."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryBudget:
+    """The time and retries left for one refresh.
+
+    Every request made during the refresh shares the budget: request timeouts
+    are capped by the time left, and each retry takes one from the budget.
+    """
+
+    def __init__(self, deadline: float = REFRESH_DEADLINE, retries: int = REFRESH_RETRY_BUDGET) -> None:
+        """Initialize the RetryBudget."""
+        self.deadline = time.monotonic() + deadline
+        self.retries = retries
+
+    @property
+    def remaining(self) -> float:
+        """Return the seconds left until the deadline."""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def take(self) -> bool:
+        """Take a retry from the budget, returning False if there is none left."""
+        if self.retries <= 0:
+            return False
+        self.retries -= 1
+        return True
+
+
+_budget: ContextVar[Optional[RetryBudget]] = ContextVar("smarthub_retry_budget", default=None)
+
+
+@contextmanager
+def refresh_budget(deadline: float = REFRESH_DEADLINE, retries: int = REFRESH_RETRY_BUDGET) -> Iterator[RetryBudget]:
+    """Run the requests of a refresh - and the tasks it starts - under one RetryBudget."""
+    budget = RetryBudget(deadline, retries)
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+def current_budget() -> Optional[RetryBudget]:
+    """Return the RetryBudget of the running refresh, if any."""
+    return _budget.get()
+
+
+async def async_within_budget(awaitable: Awaitable[T], description: str) -> T:
+    """
+    Wait for a task shared with other callers, giving up at the deadline of the running refresh.
+
+    Shared tasks run outside any refresh's context, so that one caller's
+    budget isn't charged for the others - each caller bounds its own wait.
+
+    Raises:
+        SmartHubTimeoutError: If the deadline passes first.
+    """
+    budget = _budget.get()
+    if budget is None:
+        return await awaitable
+    try:
+        async with asyncio.timeout(budget.remaining):
+            return await awaitable
+    except TimeoutError as e:
+        raise SmartHubTimeoutError(f"Refresh deadline exceeded waiting for {description}") from e
+
+
+class RetryPolicy:
+    """Retries SmartHub requests with capped exponential backoff and jitter.
+
+    Connection errors, timeouts and RETRY_STATUSES responses are retried up to
+    `max_attempts` times. A Retry-After header sets the delay, otherwise it
+    doubles from `base_delay` up to `max_delay`, with half of it randomized so
+    clients failing together don't retry together. Within a refresh, retries
+    also stop once its RetryBudget runs out of retries or time.
+    """
+
+    def __init__(
+        self,
+        base_delay: float = RETRY_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        max_attempts: int = MAX_RETRIES,
+    ) -> None:
+        """Initialize the RetryPolicy."""
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.retries = 0
+        self.failures = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay before retrying a request that failed `attempt` times."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def timeout(self, timeout: float) -> float:
+        """Return the timeout of a request - capped by the deadline of the running refresh.
+
+        Raises:
+            SmartHubTimeoutError: If the deadline has passed.
+        """
+        budget = _budget.get()
+        if budget is None:
+            return timeout
+        remaining = budget.remaining
+        if remaining <= 0:
+            raise SmartHubTimeoutError("Refresh deadline exceeded")
+        return min(timeout, remaining)
+
+    async def async_call(self, request: Callable[[], Awaitable[T]], description: str) -> T:
+        """
+        Run a request, retrying it while it fails with a retryable error.
+
+        Args:
+            request: Coroutine function making one attempt of the request.
+            description: What the request is, for logs and errors.
+
+        Raises:
+            SmartHubTimeoutError: If the last attempt timed out.
+            SmartHubConnectionError: If the last attempt failed otherwise.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            retry_after = None
+            try:
+                return await request()
+            except asyncio.TimeoutError as e:
+                error: SmartHubConnectionError = SmartHubTimeoutError(f"Timeout during {description}")
+                cause: Exception = e
+            except ClientError as e:
+                error, cause = SmartHubConnectionError(f"Connection error during {description}: {e}"), e
+            except SmartHubRetryableError as e:
+                # A plain connection error once given up, so an enclosing request doesn't retry it again
+                error, cause = SmartHubConnectionError(f"{description} failed: {e}"), e
+                retry_after = e.retry_after
+
+            delay = retry_after if retry_after is not None else self.backoff(attempt)
+            reason = self._give_up(attempt, delay)
+            if reason is not None:
+                self.failures += 1
+                _LOGGER.warning("%s failed (attempt %d), not retrying - %s: %s", description, attempt, reason, cause)
+                raise error from cause
+
+            self.retries += 1
+            _LOGGER.warning("%s failed (attempt %d), retrying in %.1fs: %s", description, attempt, delay, cause)
+            await asyncio.sleep(delay)
+
+    def _give_up(self, attempt: int, delay: float) -> Optional[str]:
+        """Return why a failed request shouldn't be retried, or None to retry it."""
+        if attempt >= self.max_attempts:
+            return f"{attempt} attempts made"
+        if delay > self.max_delay:
+            return f"server asked to wait {delay:.0f}s"
+        budget = _budget.get()
+        if budget is not None:
+            if delay >= budget.remaining:
+                return "refresh deadline reached"
+            if not budget.take():
+                return "refresh retry budget spent"
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return retry statistics."""
+        budget = _budget.get()
+        return {
+            "retries": self.retries,
+            "failures": self.failures,
+            "budget_retries": budget.retries if budget is not None else None,
+            "budget_remaining": round(budget.remaining, 1) if budget is not None else None,
+        }
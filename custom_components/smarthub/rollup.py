@@ -0,0 +1,241 @@
+"""Local DAILY/MONTHLY rollups of SmartHub HOURLY usage."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from typing import Any, Dict, List, Optional, Tuple
+
+from .api import Aggregation, SmartHubAPI, SmartHubLocation
+from .usage import UsageSeries, wall_clock_epoch
+
+_LOGGER = logging.getLogger(__name__)
+
+# Relative difference tolerated between a local rollup and the server value
+ROLLUP_TOLERANCE = 0.01
+
+DAY_MS = 86400000
+
+
+def rollup_usage(usage: UsageSeries, aggregation: Aggregation) -> UsageSeries:
+    """Sum parsed hourly readings into DAILY or MONTHLY readings.
+
+    Readings are bucketed on their raw SmartHub timestamps, which are wall-clock
+    times in the provider timezone, so days and months follow the utility's
+    calendar without building a datetime per reading.
+    """
+    rolled = UsageSeries(usage.timezone)
+    month_starts: Dict[int, int] = {}
+    for raw_timestamp, consumption in zip(usage.raw_timestamps, usage.values):
+        bucket = raw_timestamp - raw_timestamp % DAY_MS
+        if aggregation == Aggregation.MONTHLY:
+            if bucket not in month_starts:
+                day = datetime.fromtimestamp(bucket / 1000, tz=timezone.utc)
+                month_starts[bucket] = wall_clock_epoch(day.replace(day=1))
+            bucket = month_starts[bucket]
+        if rolled.raw_timestamps and rolled.raw_timestamps[-1] == bucket:
+            rolled.values[-1] += consumption
+            continue
+        rolled.append(bucket, consumption)
+    return rolled
+
+
+def rollup_energy_data(data: Dict[str, Any], service: str, aggregation: Aggregation) -> Dict[str, Any]:
+    """Return a copy of parsed HOURLY energy data for a service rolled up to the aggregation."""
+    hourly = data[service]
+    rolled = {**hourly, "hasDaily": True}
+    for key in ("USAGE", "USAGE_RETURN"):
+        if key in hourly:
+            rolled[key] = rollup_usage(hourly[key], aggregation)
+    return {**data, service: rolled}
+
+
+def concat_usage(usage: List[UsageSeries]) -> UsageSeries:
+    """Join series in time order, adding up readings of the same bucket where two series meet."""
+    joined = UsageSeries(usage[0].timezone)
+    for series in usage:
+        for raw_timestamp, consumption in zip(series.raw_timestamps, series.values):
+            if joined.raw_timestamps and joined.raw_timestamps[-1] == raw_timestamp:
+                joined.values[-1] += consumption
+                continue
+            joined.append(raw_timestamp, consumption)
+    return joined
+
+
+def trim_energy_data(data: Dict[str, Any], service: str, start: datetime) -> Dict[str, Any]:
+    """Return a copy of parsed energy data for a service without readings before start."""
+    trimmed = dict(data[service])
+    for key in ("USAGE", "USAGE_RETURN"):
+        if key in trimmed:
+            trimmed[key] = trimmed[key].since(start)
+    return {**data, service: trimmed}
+
+
+def compare_usage(
+    local: UsageSeries,
+    remote: UsageSeries,
+    tolerance: float = ROLLUP_TOLERANCE,
+) -> List[Tuple[datetime, float, float]]:
+    """Compare local rollups with server readings.
+
+    Returns (reading_time, local, remote) for every bucket present in both
+    series whose values differ by more than the relative tolerance.
+    """
+    remote_by_time = dict(zip(remote.raw_timestamps, remote.values))
+    mismatches = []
+    for index, (raw_timestamp, consumption) in enumerate(zip(local.raw_timestamps, local.values)):
+        remote_value = remote_by_time.get(raw_timestamp)
+        if remote_value is None:
+            continue
+        if abs(consumption - remote_value) > tolerance * max(1.0, abs(remote_value)):
+            mismatches.append((local.reading_time(index), consumption, remote_value))
+    return mismatches
+
+
+class RollupFetcher:
+    """Serve HOURLY, DAILY and MONTHLY usage for one location from a single HOURLY fetch.
+
+    Each statistic task registers the window it needs with `async_get`. Once
+    every expected aggregation has registered, one HOURLY request covering the
+    HOURLY and DAILY windows is made. When the response has hourly data, DAILY
+    is rolled up locally, and MONTHLY from the server's DAILY data for the days
+    from the start of the previous month to the HOURLY request followed by the
+    rolled up days - so a month-to-date bucket doesn't cost a month of hourly
+    readings. Without
+    hourly data, DAILY and MONTHLY are fetched from the server.
+    """
+
+    def __init__(
+        self,
+        api: SmartHubAPI,
+        location: SmartHubLocation,
+        aggregations: List[Aggregation],
+        verify: bool = False,
+    ) -> None:
+        """Initialize the RollupFetcher."""
+        self.api = api
+        self.location = location
+        self.verify = verify
+        self._expected = set(aggregations)
+        self._starts: Dict[Aggregation, datetime] = {}
+        self._registered = asyncio.Event()
+        self._hourly_task: Optional[asyncio.Future] = None
+
+    def discard(self, aggregation: Aggregation) -> None:
+        """Stop waiting for an aggregation that will not call async_get."""
+        self._expected.discard(aggregation)
+        self._check_registered()
+
+    def _check_registered(self) -> None:
+        if self._hourly_task is None and self._expected and self._expected <= self._starts.keys():
+            self._hourly_task = asyncio.ensure_future(self._async_fetch_hourly())
+            self._registered.set()
+
+    def _windows(self) -> Dict[Aggregation, datetime]:
+        """Return the bucket-aligned window start needed by each registered aggregation."""
+        tz = ZoneInfo(self.api.timezone)
+        windows = {
+            aggregation: aggregation.bucket_start(start.astimezone(tz))
+            for aggregation, start in self._starts.items()
+        }
+        # Finished months never change, so the MONTHLY rollup only needs to reach
+        # back to the month before the one containing the oldest HOURLY/DAILY
+        # window - that finished month is the statistic the import continues
+        # from, so the month-to-date bucket after it is rewritten every refresh.
+        fine = [windows[a] for a in (Aggregation.HOURLY, Aggregation.DAILY) if a in windows]
+        if Aggregation.MONTHLY in windows and fine:
+            month = Aggregation.MONTHLY.bucket_start(min(fine))
+            previous = Aggregation.MONTHLY.bucket_start(month - timedelta(days=1))
+            windows[Aggregation.MONTHLY] = max(windows[Aggregation.MONTHLY], previous)
+        return windows
+
+    def _hourly_start(self) -> datetime:
+        """Return the start of the first whole day of the HOURLY request - MONTHLY only sets it without finer windows."""
+        windows = self._windows()
+        fine = [windows[a] for a in (Aggregation.HOURLY, Aggregation.DAILY) if a in windows]
+        return Aggregation.DAILY.bucket_start(min(fine or windows.values()))
+
+    async def _async_fetch_hourly(self) -> Optional[Dict[str, Any]]:
+        # Pad by a day so the first bucket is complete whichever way the
+        # server reads the window boundaries - extra readings are trimmed.
+        start = self._hourly_start() - timedelta(days=1)
+        _LOGGER.debug("Fetching HOURLY data from %s for rollups of location %s", start, self.location)
+        return await self.api.get_energy_data(
+            location=self.location, aggregation=Aggregation.HOURLY, start_datetime=start
+        )
+
+    async def async_get(self, aggregation: Aggregation, start_datetime: datetime) -> Optional[Dict[str, Any]]:
+        """Return parsed energy data for the aggregation starting at start_datetime."""
+        self._starts[aggregation] = start_datetime
+        self._check_registered()
+        await self._registered.wait()
+        hourly = await self._hourly_task
+
+        service = self.location.service
+        window = self._windows()[aggregation]
+        has_hourly = bool(hourly) and bool(hourly[service].get("hasHourly")) and "USAGE" in hourly[service]
+
+        if aggregation == Aggregation.HOURLY:
+            return trim_energy_data(hourly, service, window) if has_hourly else hourly
+
+        if not has_hourly:
+            _LOGGER.debug("No hourly data for %s - fetching %s from the server", self.location, aggregation.label)
+            return await self.api.get_energy_data(
+                location=self.location, aggregation=aggregation, start_datetime=start_datetime
+            )
+
+        if aggregation == Aggregation.MONTHLY:
+            rolled = await self._async_rollup_monthly(hourly, window, start_datetime)
+        else:
+            rolled = rollup_energy_data(hourly, service, aggregation)
+        rolled = trim_energy_data(rolled, service, window)
+        if self.verify:
+            await self._async_verify(aggregation, rolled, start_datetime)
+        return rolled
+
+    async def _async_rollup_monthly(self, hourly: Dict[str, Any], window: datetime, start_datetime: datetime) -> Dict[str, Any]:
+        """Return MONTHLY data from window - the server's DAILY data up to the HOURLY request, then the hourly data."""
+        service = self.location.service
+        hourly_start = self._hourly_start()
+        if window >= hourly_start:
+            return rollup_energy_data(hourly, service, Aggregation.MONTHLY)
+
+        earlier = await self.api.get_energy_data(
+            location=self.location, aggregation=Aggregation.DAILY, start_datetime=window, end_datetime=hourly_start
+        )
+        if not earlier or "USAGE" not in earlier[service]:
+            # Without the earlier days the month would come up short - take the server's value
+            _LOGGER.debug("No daily data for %s - fetching %s from the server", self.location, Aggregation.MONTHLY.label)
+            return await self.api.get_energy_data(
+                location=self.location, aggregation=Aggregation.MONTHLY, start_datetime=start_datetime
+            )
+
+        days = dict(rollup_energy_data(hourly, service, Aggregation.DAILY)[service])
+        for key in ("USAGE", "USAGE_RETURN"):
+            if key in days:
+                before = earlier[service].get(key, UsageSeries(days[key].timezone))
+                days[key] = concat_usage([before.since(window).until(hourly_start), days[key].since(hourly_start)])
+        return rollup_energy_data({**hourly, service: days}, service, Aggregation.MONTHLY)
+
+    async def _async_verify(self, aggregation: Aggregation, rolled: Dict[str, Any], start_datetime: datetime) -> None:
+        """Compare a local rollup with the server's values, logging any mismatch."""
+        service = self.location.service
+        remote = await self.api.get_energy_data(
+            location=self.location, aggregation=aggregation, start_datetime=start_datetime
+        )
+        if not remote:
+            _LOGGER.warning("Rollup verification for %s %s: no server data", self.location, aggregation.label)
+            return
+
+        for key in ("USAGE", "USAGE_RETURN"):
+            if key not in rolled[service] or key not in remote[service]:
+                continue
+            mismatches = compare_usage(rolled[service][key], remote[service][key])
+            if mismatches:
+                _LOGGER.warning(
+                    "Rollup verification for %s %s %s: %d mismatches, e.g. %s",
+                    self.location, aggregation.label, key, len(mismatches), mismatches[:3],
+                )
+            else:
+                _LOGGER.debug("Rollup verification for %s %s %s: OK", self.location, aggregation.label, key)
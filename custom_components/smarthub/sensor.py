@@ -5,7 +5,7 @@ import logging
 import asyncio # for concurrent data fetching handling
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -13,17 +13,18 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy, UnitOfVolume
-from homeassistant.core import HomeAssistant
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfEnergy, UnitOfVolume
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
 from homeassistant.util.unit_conversion import EnergyConverter, VolumeConverter
 from homeassistant.components.recorder.statistics import (
-    async_add_external_statistics,
     get_last_statistics,
     statistics_during_period,
 )
@@ -45,8 +46,17 @@ except ImportError:
 
 
 from .api import Aggregation, SmartHubAPI, SmartHubLocation
+from .backfill import BackfillQueue
+from .history import HistoryImporter
+from .locations import LocationStore
+from .planner import BackfillPlan, TieredFetcher, plan_backfill
+from .snapshot import SnapshotStore
+from .statistics import async_import_statistics
+from .rollup import RollupFetcher
+from .retry import refresh_budget
 from .exceptions import (
     SmartHubAuthenticationError,
+    SmartHubCircuitOpenError,
     SmartHubError as SmartHubAPIError,
 )
 from .const import (
@@ -57,6 +67,16 @@ from .const import (
     ATTR_LOCATION_ID,
     LOCATION_KEY,
     HISTORICAL_IMPORT_DAYS,
+    CONF_LOCATION_CONCURRENCY,
+    CONF_VERIFY_ROLLUPS,
+    CONF_HOURLY_HISTORY_DAYS,
+    CONF_DAILY_HISTORY_DAYS,
+    CONF_MONTHLY_HISTORY_DAYS,
+    CONF_STATISTICS_BATCH_SIZE,
+    DEFAULT_LOCATION_CONCURRENCY,
+    DEFAULT_HOURLY_HISTORY_DAYS,
+    DEFAULT_MONTHLY_HISTORY_DAYS,
+    DEFAULT_STATISTICS_BATCH_SIZE,
     METER_NAME,
     ELECTRIC_SERVICE,
     GAS_SERVICE,
@@ -81,22 +101,52 @@ async def async_setup_entry(
     # Ensure that it is the smartHub coordinator
     assert type(coordinator) is SmartHubDataUpdateCoordinator
 
-    last_locations_consumption = coordinator.data.values()
+    entities: Dict[str, SmartHubEnergySensor] = {}
+    locations_hash = coordinator.locations_hash
 
-    # Create sensor entities for each location
-    entities = []
-    for last_consumption in last_locations_consumption:
-      entities.append(
-          SmartHubEnergySensor(
+    @callback
+    def _async_sync_entities() -> None:
+        """Add entities for new locations, and remove those of locations that are gone."""
+        nonlocal locations_hash
+
+        # Create sensor entities for each location
+        new_entities = []
+        for location_id, last_consumption in (coordinator.data or {}).items():
+          if location_id in entities:
+              continue
+          entities[location_id] = SmartHubEnergySensor(
               coordinator=coordinator,
               config_entry=config_entry,
               config=config,
               location=last_consumption.get(LOCATION_KEY),
           )
-      )
+          new_entities.append(entities[location_id])
+
+        if new_entities:
+          async_add_entities(new_entities)
+          _LOGGER.debug(f"{len(new_entities)} SmartHub sensor entities added successfully")
 
-    async_add_entities(entities)
-    _LOGGER.debug(f"{len(entities)} SmartHub sensor entities added successfully")
+        if coordinator.locations_hash == locations_hash:
+          return
+        locations_hash = coordinator.locations_hash
+
+        current = {location.id for location in coordinator.locations}
+        registry = er.async_get(hass)
+        for location_id in [location_id for location_id in entities if location_id not in current]:
+          entity = entities.pop(location_id)
+          _LOGGER.info("SmartHub location %s was removed - removing %s", location_id, entity.entity_id)
+          if entity.entity_id and registry.async_get(entity.entity_id):
+              registry.async_remove(entity.entity_id)
+          else:
+              hass.async_create_task(entity.async_remove())
+
+    _async_sync_entities()
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_sync_entities))
+    account_id = config.get("account_id", "Unknown")
+    async_add_entities([
+        SmartHubProgressSensor(coordinator.backfill, config_entry, "backfill", f"SmartHub History Import - {account_id}"),
+        SmartHubProgressSensor(coordinator.history, config_entry, "history_import", f"SmartHub Range Import - {account_id}"),
+    ])
 
 
 class SmartHubDataUpdateCoordinator(DataUpdateCoordinator):
@@ -118,72 +168,81 @@ class SmartHubDataUpdateCoordinator(DataUpdateCoordinator):
         )
         self.api = api
         self.account_id = config_entry.data.get('account_id','unknown')
+        # Service locations, refetched from SmartHub on a slow schedule
+        self.location_store = LocationStore(hass, config_entry.entry_id, api)
+        # The last entity data, restored on startup before the first refresh
+        self.snapshot_store = SnapshotStore(hass, config_entry.entry_id)
+        # First-time statistics imports, run in the background after a refresh
+        self.backfill = BackfillQueue(hass, config_entry, self._async_backfill_location, self.backfill_plan)
+        # How far back the first import goes at each resolution - see plan_backfill
+        self.hourly_history_days = config_entry.data.get(CONF_HOURLY_HISTORY_DAYS, DEFAULT_HOURLY_HISTORY_DAYS)
+        self.daily_history_days = config_entry.data.get(CONF_DAILY_HISTORY_DAYS, HISTORICAL_IMPORT_DAYS)
+        self.monthly_history_days = config_entry.data.get(CONF_MONTHLY_HISTORY_DAYS, DEFAULT_MONTHLY_HISTORY_DAYS)
+        # Statistics rows per recorder import job
+        self.statistics_batch_size = config_entry.data.get(CONF_STATISTICS_BATCH_SIZE, DEFAULT_STATISTICS_BATCH_SIZE)
+        # Imports of requested date ranges, from the import_history service
+        self.history = HistoryImporter(hass, config_entry, self)
+        # Compare local DAILY/MONTHLY rollups with the server's values
+        self.verify_rollups = config_entry.data.get(CONF_VERIFY_ROLLUPS, False)
+        # This entry's limit on the locations fetched at the same time - the host's cap is the largest of its entries
+        self.location_concurrency = config_entry.data.get(CONF_LOCATION_CONCURRENCY, DEFAULT_LOCATION_CONCURRENCY)
+
+    @property
+    def locations(self) -> list[SmartHubLocation]:
+        """Return the current service locations."""
+        return self.location_store.locations or []
+
+    @property
+    def locations_hash(self) -> Optional[str]:
+        """Return the content hash of the current service locations."""
+        return self.location_store.hash
+
+    async def async_restore_snapshot(self) -> bool:
+        """Set the data to the stored snapshot, returning False if there is none."""
+        data = await self.snapshot_store.async_load()
+        if data is None:
+            return False
+        _LOGGER.debug("Restored SmartHub data of %d locations from the last snapshot", len(data))
+        self.data = data
+        return True
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """Fetch data from the SmartHub API."""
         try:
             _LOGGER.debug("Fetching data from SmartHub API")
 
-            # force a logout of the session
-            self.api.token = None
-
-            locations = await self.api.get_service_locations()
-
-            entity_response = {}
-
-            for location in locations:
-              _LOGGER.debug("Attempting to fetch from SmartHub API for location %s", location)
-              if location.service == ELECTRIC_SERVICE:
-                  # Because SmartHub provides historical usage/cost with delay of a
-                  # number of hours we need to insert data into statistics.
-                  await asyncio.gather(
-                    asyncio.create_task(self._insert_statistics(location, Aggregation.HOURLY)),
-                    asyncio.create_task(self._insert_statistics(location, Aggregation.DAILY)),
-                    asyncio.create_task(self._insert_statistics(location, Aggregation.MONTHLY)),
-                  )
-
-                  # Fetch monthly information for entity value
-                  first_day_of_current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-                  data = await self.api.get_energy_data(location=location, start_datetime=first_day_of_current_month, aggregation=Aggregation.MONTHLY)
-
-                  if len(data[location.service].get("USAGE", [])) == 0:
-                      _LOGGER.warning("No Monthly Energy data received from SmartHub API for location %s", location)
-                      # Return previous data if available, otherwise empty dict
-                      entity_response[location.id] = {
-                        ENERGY_SENSOR_KEY: 0, # no data - no energy usage for the entity.
-                        ATTR_LAST_READING_TIME: first_day_of_current_month.replace(tzinfo=ZoneInfo(self.api.timezone)), # use the TZ from the entity so it has consistent formating like 2026-02-01T00:00:00-05:00
-                        LOCATION_KEY: location,
-                        METER_NAME: data[location.service].get(METER_NAME, None)
-                      }
-                      continue
-
-                  last_reading = data[location.service].get("USAGE")[-1]
-                  _LOGGER.debug("Successfully fetched data: %s for location: %s", last_reading, location)
-
-                  entity_response[location.id] = {
-                    ENERGY_SENSOR_KEY: last_reading['consumption'],
-                    ATTR_LAST_READING_TIME: last_reading['reading_time'],
-                    LOCATION_KEY: location,
-                    METER_NAME: data[location.service].get(METER_NAME, None)
-                  }
-
-              if location.service == GAS_SERVICE:
-                await asyncio.gather(
-                    asyncio.create_task(self._insert_statistics(location, Aggregation.HOURLY)),
-                    asyncio.create_task(self._insert_statistics(location, Aggregation.DAILY)),
-                    asyncio.create_task(self._insert_statistics(location, Aggregation.MONTHLY)),
-                )
+            # Every request of the refresh - including those of the location tasks - shares one deadline and retry budget
+            with refresh_budget():
+                locations = await self.location_store.async_get_locations()
 
-              if location.service == WATER_SERVICE:
-                # Water is likely not available with hourly precision.
-                await asyncio.gather(
-                    asyncio.create_task(self._insert_statistics(location, Aggregation.DAILY)),
-                    asyncio.create_task(self._insert_statistics(location, Aggregation.MONTHLY)),
+                # Locations are fetched concurrently - bounded by the location concurrency cap.
+                results = await asyncio.gather(
+                    *(self._async_update_location(location) for location in locations),
+                    return_exceptions=True,
                 )
 
+            entity_response = {}
+            for location, result in zip(locations, results):
+              if isinstance(result, BaseException):
+                  # The location may be gone - check the location list again next time
+                  self.location_store.invalidate()
+                  raise result
+              if result is not None:
+                  entity_response[location.id] = result
+
+            _LOGGER.debug("SmartHub API metrics: %s", self.api.get_metrics())
+            await self.snapshot_store.async_save(entity_response)
+            # The entity data is in - now import any missing history, and resume an interrupted range import
+            self.backfill.async_start()
+            await self.history.async_resume()
             return entity_response
 
+        except SmartHubCircuitOpenError as e:
+            if self.data is None:
+                raise UpdateFailed(f"Error communicating with SmartHub API: {e}") from e
+            # The host is down - keep serving the last data instead of marking every entity unavailable
+            _LOGGER.warning("%s, keeping the last SmartHub data", e)
+            return self.data
         except SmartHubAuthenticationError as e:
             _LOGGER.error("Authentication error fetching SmartHub data: %s", e)
             # For auth errors, we want to raise UpdateFailed to trigger retry
@@ -196,14 +255,116 @@ class SmartHubDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.exception("Unexpected error fetching SmartHub data: %s", e)
             raise UpdateFailed(f"Unexpected error: {e}") from e
 
+    async def _async_update_location(self, location: SmartHubLocation) -> Optional[Dict[str, Any]]:
+        """Import statistics for a location, returning the entity data for electric locations."""
+        async with self.api.location_cap(self.location_concurrency):
+          _LOGGER.debug("Attempting to fetch from SmartHub API for location %s", location)
+          if location.service == ELECTRIC_SERVICE:
+              # Because SmartHub provides historical usage/cost with delay of a
+              # number of hours we need to insert data into statistics.
+              await self._insert_all_statistics(location)
+
+              # Fetch monthly information for entity value
+              first_day_of_current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+              data = await self.api.get_energy_data(location=location, start_datetime=first_day_of_current_month, aggregation=Aggregation.MONTHLY)
+
+              last_reading = data[location.service]["USAGE"].last() if data[location.service].get("USAGE") else None
+              if last_reading is None:
+                  _LOGGER.warning("No Monthly Energy data received from SmartHub API for location %s", location)
+                  # Return previous data if available, otherwise empty dict
+                  return {
+                    ENERGY_SENSOR_KEY: 0, # no data - no energy usage for the entity.
+                    ATTR_LAST_READING_TIME: first_day_of_current_month.replace(tzinfo=ZoneInfo(self.api.timezone)), # use the TZ from the entity so it has consistent formating like 2026-02-01T00:00:00-05:00
+                    LOCATION_KEY: location,
+                    METER_NAME: data[location.service].get(METER_NAME, None)
+                  }
+
+              _LOGGER.debug("Successfully fetched data: %s for location: %s", last_reading, location)
+
+              return {
+                ENERGY_SENSOR_KEY: last_reading.consumption,
+                ATTR_LAST_READING_TIME: last_reading.reading_time,
+                LOCATION_KEY: location,
+                METER_NAME: data[location.service].get(METER_NAME, None)
+              }
+
+          if location.service == GAS_SERVICE:
+            await self._insert_all_statistics(location)
+
+          if location.service == WATER_SERVICE:
+            # Water is likely not available with hourly precision.
+            await asyncio.gather(
+                asyncio.create_task(self._insert_statistics(location, Aggregation.DAILY)),
+                asyncio.create_task(self._insert_statistics(location, Aggregation.MONTHLY)),
+            )
+
+          return None
+
+    async def _insert_all_statistics(self, location: SmartHubLocation) -> None:
+        """Insert HOURLY, DAILY and MONTHLY statistics for a location.
+
+        Only HOURLY data is requested from SmartHub - DAILY and MONTHLY are
+        rolled up from it locally, unless the location has no hourly data.
+        """
+        aggregations = [Aggregation.HOURLY, Aggregation.DAILY, Aggregation.MONTHLY]
+        fetcher = RollupFetcher(self.api, location, aggregations, verify=self.verify_rollups)
+        await asyncio.gather(
+            *(asyncio.create_task(self._insert_statistics(location, aggregation, fetcher)) for aggregation in aggregations)
+        )
+
+    def backfill_plan(self, location: SmartHubLocation, aggregations: list[Aggregation]) -> BackfillPlan:
+        """Return the requests importing the history of aggregations of a location."""
+        return plan_backfill(
+            dt_util.now(ZoneInfo(self.api.timezone)),
+            aggregations,
+            self.hourly_history_days,
+            self.daily_history_days,
+            self.monthly_history_days,
+        )
+
+    async def _async_backfill_location(self, location: SmartHubLocation, aggregations: list[Aggregation]) -> None:
+        """Import the history of aggregations of a location, at the resolutions of its BackfillPlan."""
+        plan = self.backfill_plan(location, aggregations)
+        _LOGGER.debug(
+            "Importing the history of %s with %d requests, about %d readings",
+            location, len(plan.requests), plan.estimated_readings,
+        )
+        # Not part of a refresh - the import gets its own deadline and retry budget
+        with refresh_budget():
+            fetcher = TieredFetcher(self.api, location, plan)
+            await asyncio.gather(
+                *(asyncio.create_task(self._insert_statistics(location, aggregation, fetcher, backfill=True)) for aggregation in aggregations)
+            )
+
+    async def _fetch_statistics_data(
+        self,
+        location: SmartHubLocation,
+        aggregation: Aggregation,
+        start_datetime: datetime,
+        fetcher: Optional[RollupFetcher | TieredFetcher],
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch the energy data for a statistic - through the RollupFetcher when one is in use."""
+        if fetcher is not None:
+            return await fetcher.async_get(aggregation, start_datetime)
+        return await self.api.get_energy_data(location=location, aggregation=aggregation, start_datetime=start_datetime)
+
     # https://github.com/tronikos/opower/ was used as a model for how to populate
     # hourly metrics when access to realtime information is not possible via
     # utility dashboards.
     # TODO: instead of handling the hourly/daily choices in the calling function - this could be recursive
     # so that we call monthly - then if monthly shows it has hourly/daily - we then fetch that data.
-    async def _insert_statistics(self, location, aggregation: Aggregation):
+    async def _insert_statistics(self, location, aggregation: Aggregation, fetcher: Optional[RollupFetcher | TieredFetcher] = None, backfill: bool = False):
         """Retrieve energy usage data asynchronously with retry logic. Always backfills the data overwriting the history based on the collection window."""
-
+        try:
+            await self._async_insert_statistics(location, aggregation, fetcher, backfill)
+        finally:
+            # Never leave the other aggregations waiting on a fetch this one didn't join
+            if fetcher is not None:
+                fetcher.discard(aggregation)
+
+    def statistic_metadata(self, location: SmartHubLocation, aggregation: Aggregation) -> tuple[StatisticMetaData, StatisticMetaData]:
+        """Return the consumption and return statistic metadata of an aggregation of a location."""
         match location.service:
           case service if service == GAS_SERVICE:
             serviceType = service
@@ -253,6 +414,29 @@ class SmartHubDataUpdateCoordinator(DataUpdateCoordinator):
             unit_of_measurement=consumption_unit,
         )
 
+        return consumption_metadata, return_metadata
+
+    def apply_meter_name(
+        self,
+        location: SmartHubLocation,
+        aggregation: Aggregation,
+        consumption_metadata: StatisticMetaData,
+        return_metadata: StatisticMetaData,
+        meter_name: Optional[str],
+    ) -> None:
+        """Name the statistics after the meter if the location description is blank."""
+        if location.description == "":
+          _LOGGER.warning(f"MISSING Location Description for Location id:{location.id} service:{location.service} using Meter Name - {meter_name}")
+
+          consumption_metadata["name"]=f"{location.provider} SmartHub {location.service} {aggregation.label} Usage - {self.account_id} - {meter_name}"
+          return_metadata["name"]=f"{location.provider} SmartHub {location.service} {aggregation.label} Return - {self.account_id} - {meter_name}"
+
+    async def _async_insert_statistics(self, location, aggregation: Aggregation, fetcher: Optional[RollupFetcher | TieredFetcher], backfill: bool):
+        """Insert statistics for one aggregation of a location - the first import only when backfill is set."""
+        consumption_metadata, return_metadata = self.statistic_metadata(location, aggregation)
+        consumption_statistic_id = consumption_metadata["statistic_id"]
+        return_statistic_id = return_metadata["statistic_id"]
+
         last_stat = await get_instance(self.hass).async_add_executor_job(
             get_last_statistics, self.hass, 1, consumption_statistic_id, True, set()
         )
@@ -260,6 +444,11 @@ class SmartHubDataUpdateCoordinator(DataUpdateCoordinator):
 
         smarthub_data = {}
         if not last_stat:
+            if not backfill:
+                # Importing the history is slow - leave it to the background backfill
+                self.backfill.schedule(location, aggregation)
+                return
+
             _LOGGER.debug("Updating %s statistic for the first time", aggregation.label)
             consumption_sum = 0.0
             return_sum      = 0.0
@@ -269,7 +458,7 @@ class SmartHubDataUpdateCoordinator(DataUpdateCoordinator):
             start_datetime = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=HISTORICAL_IMPORT_DAYS)
 
             # Load read data for use in populating statistics
-            smarthub_data = await self.api.get_energy_data(location=location, aggregation=aggregation, start_datetime=start_datetime)
+            smarthub_data = await self._fetch_statistics_data(location, aggregation, start_datetime, fetcher)
         else:
             _LOGGER.debug("Checking if data migration is needed for %s...", aggregation.label)
             migrated = False
@@ -308,14 +497,14 @@ class SmartHubDataUpdateCoordinator(DataUpdateCoordinator):
                 start_datetime = start_datetime - timedelta(days=2)
 
             _LOGGER.debug("Fetching %s statistics from %s", aggregation.label, start_datetime)
-            smarthub_data = await self.api.get_energy_data(location=location, start_datetime=start_datetime, aggregation=aggregation)
+            smarthub_data = await self._fetch_statistics_data(location, aggregation, start_datetime, fetcher)
 
             if not smarthub_data or not smarthub_data[location.service].get("USAGE"):
               _LOGGER.warning("No data received from SmartHub API for location %s to populate historical %s stats", location, aggregation.label)
               # No new data to record in statatistics
               return
 
-            start = smarthub_data[location.service].get("USAGE")[0].get("reading_time")
+            start = smarthub_data[location.service]["USAGE"].reading_time(0)
             _LOGGER.debug("Getting %s statistics at: %s", aggregation.label, start)
 
             # In the common case there should be a previous statistic at start time
@@ -361,37 +550,6 @@ class SmartHubDataUpdateCoordinator(DataUpdateCoordinator):
 
             _LOGGER.info(f"Updating %s statistics since %s", aggregation.label, last_stats_time)
 
-        consumption_statistics = []
-        return_statistics      = []
-
-        for cost_read in smarthub_data[location.service].get("USAGE", []):
-            start = cost_read.get("reading_time")
-            if last_stats_time is not None and start.timestamp() <= last_stats_time:
-                continue
-
-            consumption_state = max(0, cost_read.get("consumption"))
-            consumption_sum += consumption_state
-
-            consumption_statistics.append(
-                StatisticData(
-                    start=start, state=consumption_state, sum=consumption_sum
-                )
-            )
-
-        for return_read in smarthub_data[location.service].get("USAGE_RETURN", []):
-            start = return_read.get("reading_time")
-            if last_stats_time is not None and start.timestamp() <= last_stats_time:
-                continue
-
-            return_state = max(0, return_read.get("consumption"))
-            return_sum += return_state
-
-            return_statistics.append(
-                StatisticData(
-                    start=start, state=return_state, sum=return_sum
-                )
-            )
-
         # If the returned statistics don't include Hourly or Daily - the don't add the stats.
         if aggregation == Aggregation.DAILY and not smarthub_data[location.service].get("hasDaily"):
           _LOGGER.warning(f"Returned data doesnot include {aggregation} {location.service} information - don't add an {aggregation} statistic.")
@@ -400,31 +558,23 @@ class SmartHubDataUpdateCoordinator(DataUpdateCoordinator):
           _LOGGER.warning(f"Returned data doesnot include {aggregation} {location.service} information - don't add an {aggregation} statistic.")
           return
 
-        # If the location description is blank, use the meter name instead.
-        if location.description == "":
-          _LOGGER.warning(f"MISSING Location Description for Location id:{location.id} service:{location.service} using Meter Name - {smarthub_data[location.service].get(METER_NAME)}")
+        self.apply_meter_name(location, aggregation, consumption_metadata, return_metadata, smarthub_data[location.service].get(METER_NAME))
 
-          consumption_metadata["name"]=f"{location.provider} SmartHub {location.service} {aggregation.label} Usage - {self.account_id} - {smarthub_data[location.service].get(METER_NAME)}"
-          return_metadata["name"]=f"{location.provider} SmartHub {location.service} {aggregation.label} Return - {self.account_id} - {smarthub_data[location.service].get(METER_NAME)}"
+        # Statistics are generated and added a batch at a time, never as one list
+        consumption_statistics: Iterable[StatisticData] = ()
+        if smarthub_data[location.service].get("USAGE"):
+            consumption_statistics = smarthub_data[location.service]["USAGE"].iter_statistics(consumption_sum, last_stats_time)
 
-        _LOGGER.info(
-            "Adding %s statistics for %s",
-            len(consumption_statistics),
-            consumption_statistic_id,
-        )
-        async_add_external_statistics(
-            self.hass, consumption_metadata, consumption_statistics
-        )
+        added, _ = await async_import_statistics(self.hass, consumption_metadata, consumption_statistics, self.statistics_batch_size)
+        _LOGGER.info("Added %s statistics for %s", added, consumption_statistic_id)
 
         if "USAGE_RETURN" in smarthub_data[location.service]:
-          _LOGGER.info(
-            "Adding %s return statistics for %s",
-            len(return_statistics),
-            return_statistic_id,
-          )
-          async_add_external_statistics(
-            self.hass, return_metadata, return_statistics
-          )
+          return_statistics: Iterable[StatisticData] = ()
+          if smarthub_data[location.service].get("USAGE_RETURN"):
+            return_statistics = smarthub_data[location.service]["USAGE_RETURN"].iter_statistics(return_sum, last_stats_time)
+
+          added, _ = await async_import_statistics(self.hass, return_metadata, return_statistics, self.statistics_batch_size)
+          _LOGGER.info("Added %s return statistics for %s", added, return_statistic_id)
 
 
 class SmartHubEnergySensor(CoordinatorEntity, SensorEntity):
@@ -512,3 +662,32 @@ class SmartHubEnergySensor(CoordinatorEntity, SensorEntity):
             "model": "Energy Monitor",
             "configuration_url": f"https://{host}",
         }
+
+
+class SmartHubProgressSensor(SensorEntity):
+    """Progress of a background statistics import - the BackfillQueue or the HistoryImporter."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_icon = "mdi:database-import"
+    _attr_should_poll = False
+
+    def __init__(self, source: BackfillQueue | HistoryImporter, config_entry: ConfigEntry, key: str, name: str) -> None:
+        """Initialize the sensor."""
+        self.source = source
+        self._attr_unique_id = f"{config_entry.unique_id}_{key}"
+        self._attr_name = name
+
+    async def async_added_to_hass(self) -> None:
+        """Update the state as the import progresses."""
+        self.async_on_remove(self.source.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> float:
+        """Return the percentage of the import that is done."""
+        return self.source.progress
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the import counts."""
+        return self.source.stats()
@@ -0,0 +1,74 @@
+"""Services of the SmartHub integration."""
+from __future__ import annotations
+
+from datetime import datetime, time
+from zoneinfo import ZoneInfo
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .api import Aggregation
+from .const import DOMAIN, WATER_SERVICE
+
+SERVICE_IMPORT_HISTORY = "import_history"
+
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_LOCATION_ID = "location_id"
+ATTR_AGGREGATIONS = "aggregations"
+
+SERVICE_IMPORT_HISTORY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Required(ATTR_START): cv.date,
+    vol.Optional(ATTR_END): cv.date,
+    vol.Optional(ATTR_LOCATION_ID): cv.string,
+    vol.Optional(ATTR_AGGREGATIONS, default=[aggregation.value for aggregation in Aggregation]): vol.All(
+        cv.ensure_list, [vol.All(vol.Upper, vol.Coerce(Aggregation))]
+    ),
+})
+
+
+async def _async_import_history(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Start importing the statistics of a date range in the background."""
+    entry = hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY_ID])
+    if entry is None or entry.domain != DOMAIN or entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(f"No loaded SmartHub config entry {call.data[ATTR_CONFIG_ENTRY_ID]}")
+    coordinator = entry.runtime_data
+
+    # Dates are days of the utility's calendar - the range ends at the start of the end date
+    timezone = ZoneInfo(coordinator.api.timezone)
+    start = datetime.combine(call.data[ATTR_START], time(), timezone)
+    end = datetime.combine(call.data[ATTR_END], time(), timezone) if ATTR_END in call.data else None
+    if end is not None and end <= start:
+        raise ServiceValidationError("The end date must be after the start date")
+
+    locations = [
+        location for location in coordinator.locations
+        if call.data.get(ATTR_LOCATION_ID) in (None, location.id)
+    ]
+    if not locations:
+        raise ServiceValidationError(f"No SmartHub location {call.data.get(ATTR_LOCATION_ID)}")
+
+    for location in locations:
+        # Water is likely not available with hourly precision
+        aggregations = [
+            aggregation for aggregation in call.data[ATTR_AGGREGATIONS]
+            if not (location.service == WATER_SERVICE and aggregation == Aggregation.HOURLY)
+        ]
+        await coordinator.history.async_import(start, end, [location], aggregations)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the SmartHub services."""
+
+    async def async_import_history(call: ServiceCall) -> None:
+        await _async_import_history(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_IMPORT_HISTORY, async_import_history, schema=SERVICE_IMPORT_HISTORY_SCHEMA
+    )
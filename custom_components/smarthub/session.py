@@ -0,0 +1,125 @@
+"""Shared HTTP sessions for the SmartHub integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import aiohttp
+from aiohttp import ClientTimeout
+
+from .breaker import CircuitBreaker
+from .limiter import AdaptiveLimiter, LocationCap
+from .const import (
+    DEFAULT_TIMEOUT,
+    POOL_CONNECTION_LIMIT,
+    POOL_KEEPALIVE_TIMEOUT,
+    POOL_DNS_CACHE_TTL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SharedSession:
+    """Long-lived aiohttp session shared by every SmartHubAPI that talks to one host.
+
+    Connections are kept alive and DNS lookups cached, so requests made by
+    different config entries (or successive polls) reuse open TLS connections
+    instead of paying for a new handshake each time. The host's
+    CircuitBreaker, AdaptiveLimiter and location cap live here too, so every
+    client of the host shares them.
+    """
+
+    def __init__(self, host: str) -> None:
+        """Initialize the SharedSession."""
+        self.host = host
+        self.references = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.breaker = CircuitBreaker(host)
+        self.limiter = AdaptiveLimiter()
+        self.location_cap = LocationCap()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def async_get_session(self) -> aiohttp.ClientSession:
+        """Return the aiohttp session, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and self._loop is not loop:
+                await self._async_close_stale()
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(self._on_connection_create_end)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+            self._session = aiohttp.ClientSession(
+                timeout=ClientTimeout(total=DEFAULT_TIMEOUT),
+                connector=aiohttp.TCPConnector(
+                    ssl=True, # aiohttp's shared default SSL context
+                    limit=POOL_CONNECTION_LIMIT,
+                    keepalive_timeout=POOL_KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=POOL_DNS_CACHE_TTL,
+                ),
+                trace_configs=[trace_config],
+            )
+            self._loop = loop
+            _LOGGER.debug("Created new shared aiohttp session for %s", self.host)
+        return self._session
+
+    async def _async_close_stale(self) -> None:
+        """Close a session made on another event loop."""
+        session, stale_loop = self._session, self._loop
+        self._session = self._loop = None
+        if session.closed:
+            return
+        if stale_loop is None or stale_loop.is_closed():
+            # Its connections went with the loop - nothing is left to wait for
+            await session.close()
+        else:
+            asyncio.run_coroutine_threadsafe(session.close(), stale_loop)
+        _LOGGER.debug("Closed the aiohttp session of a previous event loop for %s", self.host)
+
+    async def _on_connection_create_end(self, session, trace_config_ctx, params) -> None:
+        self.connections_opened += 1
+
+    async def _on_connection_reuseconn(self, session, trace_config_ctx, params) -> None:
+        self.connections_reused += 1
+
+    async def close(self) -> None:
+        """Close the aiohttp session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connection statistics."""
+        return {
+            "references": self.references,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+        }
+
+
+# Shared sessions keyed by host
+_SESSIONS: Dict[str, SharedSession] = {}
+
+
+def acquire_session(host: str) -> SharedSession:
+    """Return the SharedSession for a host, adding a reference to it."""
+    shared = _SESSIONS.get(host)
+    if shared is None:
+        shared = _SESSIONS[host] = SharedSession(host)
+    shared.references += 1
+    return shared
+
+
+async def async_release_session(shared: SharedSession) -> None:
+    """Drop a reference to a SharedSession - the last reference closes it."""
+    shared.references -= 1
+    if shared.references > 0:
+        return
+
+    if _SESSIONS.get(shared.host) is shared:
+        del _SESSIONS[shared.host]
+    await shared.close()
+    _LOGGER.debug("Closed shared aiohttp session for %s", shared.host)
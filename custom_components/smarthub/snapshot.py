@@ -0,0 +1,82 @@
+"""Persisted snapshot of the SmartHub coordinator data."""
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import SmartHubLocation
+from .const import (
+    ATTR_LAST_READING_TIME,
+    DOMAIN,
+    ENERGY_SENSOR_KEY,
+    LOCATION_KEY,
+    METER_NAME,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+def _storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.snapshot.{entry_id}"
+
+
+def _encode(entity_data: Dict[str, Any]) -> Dict[str, Any]:
+    last_reading_time = entity_data.get(ATTR_LAST_READING_TIME)
+    return {
+        ENERGY_SENSOR_KEY: entity_data.get(ENERGY_SENSOR_KEY),
+        ATTR_LAST_READING_TIME: last_reading_time.isoformat() if last_reading_time else None,
+        METER_NAME: entity_data.get(METER_NAME),
+        LOCATION_KEY: asdict(entity_data[LOCATION_KEY]),
+    }
+
+
+def _decode(entity_data: Dict[str, Any]) -> Dict[str, Any]:
+    last_reading_time = entity_data.get(ATTR_LAST_READING_TIME)
+    return {
+        ENERGY_SENSOR_KEY: entity_data.get(ENERGY_SENSOR_KEY),
+        ATTR_LAST_READING_TIME: dt_util.parse_datetime(last_reading_time) if last_reading_time else None,
+        METER_NAME: entity_data.get(METER_NAME),
+        LOCATION_KEY: SmartHubLocation(**entity_data[LOCATION_KEY]),
+    }
+
+
+class SnapshotStore:
+    """The last entity data of a config entry, kept in Home Assistant storage.
+
+    It is saved after every successful refresh, so the entities can be
+    restored on startup without waiting for SmartHub.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the SnapshotStore."""
+        self._store: Store[Dict[str, Any]] = Store(hass, STORAGE_VERSION, _storage_key(entry_id))
+
+    async def async_load(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Return the stored entity data, or None if there is none."""
+        data = await self._store.async_load()
+        if not data:
+            return None
+        try:
+            return {location_id: _decode(entity_data) for location_id, entity_data in data["entities"].items()}
+        except (KeyError, TypeError, ValueError) as e:
+            _LOGGER.warning("Ignoring invalid stored SmartHub snapshot: %s", e)
+            return None
+
+    async def async_save(self, entities: Dict[str, Dict[str, Any]]) -> None:
+        """Store the entity data."""
+        await self._store.async_save({
+            "saved_at": dt_util.utcnow().isoformat(),
+            "entities": {location_id: _encode(entity_data) for location_id, entity_data in entities.items()},
+        })
+
+
+async def async_remove_snapshot(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the stored snapshot of a config entry."""
+    await Store(hass, STORAGE_VERSION, _storage_key(entry_id)).async_remove()
@@ -0,0 +1,80 @@
+"""Batched import of SmartHub statistics into the recorder."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from itertools import batched
+from typing import Dict, Iterable, Optional, Tuple
+
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import HomeAssistant
+
+from .const import DEFAULT_STATISTICS_BATCH_SIZE, RECORDER_MAX_BACKLOG
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# Waits for a recorder to catch up, shared by the imports that find its queue too long at the same time
+_recorder_waits: Dict[Recorder, asyncio.Future] = {}
+
+
+async def async_wait_for_recorder(hass: HomeAssistant, max_backlog: int = RECORDER_MAX_BACKLOG) -> bool:
+    """
+    Wait until the recorder has caught up, if more than max_backlog items are queued.
+
+    Concurrent imports - of many locations, or a backfill next to a history
+    import - join one wait instead of each queueing a commit of its own.
+
+    Returns:
+        True if it had to wait.
+    """
+    recorder = get_instance(hass)
+    backlog = recorder.backlog
+    if backlog <= max_backlog:
+        return False
+    wait = _recorder_waits.get(recorder)
+    if wait is None:
+        _LOGGER.debug("Recorder backlog is %d - waiting for it before adding more statistics", backlog)
+        wait = _recorder_waits[recorder] = asyncio.ensure_future(recorder.async_block_till_done())
+        wait.add_done_callback(lambda _: _recorder_waits.pop(recorder, None))
+    # Shielded so one import giving up doesn't cancel the wait for the others
+    await asyncio.shield(wait)
+    return True
+
+
+async def async_import_statistics(
+    hass: HomeAssistant,
+    metadata: StatisticMetaData,
+    statistics: Iterable[StatisticData],
+    batch_size: int = DEFAULT_STATISTICS_BATCH_SIZE,
+    max_backlog: int = RECORDER_MAX_BACKLOG,
+) -> Tuple[int, Optional[float]]:
+    """
+    Add statistics to the recorder in import jobs of at most batch_size rows.
+
+    Rows are taken from the iterable one batch at a time, so with
+    UsageSeries.iter_statistics only one batch of StatisticData exists at
+    once, however long the series. Before each batch - the first one too,
+    as many imports may start at once - the import waits for the recorder
+    when its queue is longer than max_backlog, so large imports go at the
+    pace the recorder writes them instead of piling up in its queue. The
+    metadata is added even when there are no statistics.
+
+    Returns:
+        The number of statistics added, and the sum of the last one (None if
+        there were none) - where the next import of the statistic continues.
+    """
+    added = 0
+    last_sum = None
+    for batch in batched(statistics, batch_size):
+        if not await async_wait_for_recorder(hass, max_backlog) and added:
+            await asyncio.sleep(0)
+        async_add_external_statistics(hass, metadata, list(batch))
+        added += len(batch)
+        last_sum = batch[-1]["sum"]
+    if not added:
+        async_add_external_statistics(hass, metadata, [])
+    _LOGGER.debug("Added %d statistics for %s", added, metadata["statistic_id"])
+    return added, last_sum
@@ -0,0 +1,239 @@
+"""Compact usage series for the SmartHub integration."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .utils import local_time_converter
+
+
+class UsageReading:
+    """A single reading of a UsageSeries.
+
+    Readings also support mapping-style access (`reading["consumption"]`,
+    `reading.get("reading_time")`) like the dict readings used previously.
+    """
+
+    __slots__ = ("reading_time", "consumption", "raw_timestamp")
+
+    def __init__(self, reading_time: datetime, consumption: float, raw_timestamp: int) -> None:
+        """Initialize the UsageReading."""
+        self.reading_time = reading_time
+        self.consumption = consumption
+        self.raw_timestamp = raw_timestamp
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field of the reading, or default if there is no such field."""
+        return getattr(self, key, default)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, UsageReading):
+            return NotImplemented
+        return (self.reading_time, self.consumption, self.raw_timestamp) == (other.reading_time, other.consumption, other.raw_timestamp)
+
+    def __repr__(self) -> str:
+        return f"UsageReading({self.reading_time.isoformat()}, {self.consumption}, {self.raw_timestamp})"
+
+
+class UsageSeries:
+    """Usage readings stored as parallel typed arrays.
+
+    `raw_timestamps` holds SmartHub epochs in milliseconds - local wall-clock
+    times read as if they were UTC - and `values` holds the consumption of each
+    reading. Reading times are only built when a reading is accessed, which
+    keeps a reading at 16 bytes instead of a dict with a datetime.
+
+    Reading times come from `utc_timestamps`, converted from the raw
+    timestamps in one batch - readings in the repeated hour of a DST change
+    get distinct times (see LocalTimeConverter).
+    """
+
+    __slots__ = ("timezone", "raw_timestamps", "values", "_utc")
+
+    def __init__(
+        self,
+        timezone: ZoneInfo,
+        raw_timestamps: Optional[Iterable[int]] = None,
+        values: Optional[Iterable[float]] = None,
+    ) -> None:
+        """Initialize the UsageSeries."""
+        self.timezone = timezone
+        self.raw_timestamps = array("q", raw_timestamps or ())
+        self.values = array("d", values or ())
+        self._utc: Optional[array] = None
+
+    @classmethod
+    def from_readings(cls, timezone: ZoneInfo, readings: Iterable[Tuple[datetime, float]]) -> UsageSeries:
+        """Build a series from (reading_time, consumption) pairs - reading times are wall-clock times in the timezone."""
+        series = cls(timezone)
+        for reading_time, consumption in readings:
+            series.append(wall_clock_epoch(reading_time), consumption)
+        return series
+
+    def append(self, raw_timestamp: int, consumption: float) -> None:
+        """Append a reading."""
+        self.raw_timestamps.append(raw_timestamp)
+        self.values.append(consumption)
+        self._utc = None
+
+    @property
+    def utc_timestamps(self) -> array:
+        """The UTC epochs (milliseconds) of the readings."""
+        if self._utc is None or len(self._utc) != len(self.raw_timestamps):
+            self._utc = local_time_converter(self.timezone).to_utc(self.raw_timestamps)
+        return self._utc
+
+    def _local(self, utc_timestamp: int) -> datetime:
+        return datetime.fromtimestamp(utc_timestamp / 1000, self.timezone)
+
+    def reading_time(self, index: int) -> datetime:
+        """Return the reading time of the reading at index, in the series timezone."""
+        return self._local(self.utc_timestamps[index])
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[UsageReading]:
+        for utc_timestamp, raw_timestamp, value in zip(self.utc_timestamps, self.raw_timestamps, self.values):
+            yield UsageReading(self._local(utc_timestamp), value, raw_timestamp)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[UsageReading, UsageSeries]:
+        if isinstance(index, slice):
+            # Slice the converted times too - a slice can't tell which pass of a repeated hour it starts in
+            series = UsageSeries(self.timezone)
+            series._utc = self.utc_timestamps[index]
+            series.raw_timestamps = self.raw_timestamps[index]
+            series.values = self.values[index]
+            return series
+        return UsageReading(self.reading_time(index), self.values[index], self.raw_timestamps[index])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, UsageSeries):
+            return NotImplemented
+        return self.raw_timestamps == other.raw_timestamps and self.values == other.values and self.timezone == other.timezone
+
+    def __repr__(self) -> str:
+        return f"UsageSeries({self.timezone}, {len(self)} readings)"
+
+    def last(self) -> Optional[UsageReading]:
+        """Return the last reading, or None if the series is empty."""
+        return self[-1] if len(self) else None
+
+    def since(self, start: datetime) -> UsageSeries:
+        """Return the readings at or after start."""
+        return self[bisect_left(self.utc_timestamps, start.timestamp() * 1000):]
+
+    def until(self, end: datetime) -> UsageSeries:
+        """Return the readings before end."""
+        return self[:bisect_left(self.utc_timestamps, end.timestamp() * 1000)]
+
+    def iter_statistics(self, total: float = 0.0, after: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the series as recorder StatisticData dicts with a running sum.
+
+        Readings sharing a start - an hour skipped by a DST change is moved to
+        the next one - are added up into a single statistic, which is only
+        yielded once a later reading starts.
+
+        Args:
+            total: The sum of the statistic before the first reading.
+            after: Skip readings starting at or before this UTC timestamp.
+        """
+        after_ms = None if after is None else after * 1000
+        statistic: Optional[Dict[str, Any]] = None
+        last_start = None
+        for utc_timestamp, consumption in zip(self.utc_timestamps, self.values):
+            if after_ms is not None and utc_timestamp <= after_ms:
+                continue
+            state = max(0, consumption)
+            total += state
+            if utc_timestamp == last_start:
+                statistic["state"] += state
+                statistic["sum"] = total
+                continue
+            if statistic is not None:
+                yield statistic
+            statistic = {"start": self._local(utc_timestamp), "state": state, "sum": total}
+            last_start = utc_timestamp
+        if statistic is not None:
+            yield statistic
+
+    def to_statistics(self, total: float = 0.0, after: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Convert the series to a list of recorder StatisticData dicts - see iter_statistics."""
+        return list(self.iter_statistics(total, after))
+
+
+class _Deferred:
+    """A value that is computed the first time it is read."""
+
+    __slots__ = ("compute",)
+
+    def __init__(self, compute: Callable[[], Any]) -> None:
+        self.compute = compute
+
+
+class ServiceUsage(Mapping):
+    """Parsed usage data of one service.
+
+    Metadata (hasHourly, hasDaily, the meter name) is stored as is, while usage
+    series can be deferred - they are only parsed the first time they are read,
+    so series nobody looks at never cost a parse.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, **values: Any) -> None:
+        """Initialize the ServiceUsage."""
+        self._values: Dict[str, Any] = dict(values)
+
+    def defer(self, key: str, compute: Callable[[], Any]) -> None:
+        """Set key to the result of compute, computed the first time key is read."""
+        self._values[key] = _Deferred(compute)
+
+    def resolve(self) -> None:
+        """Compute every deferred value now."""
+        for key in self._values:
+            self[key]
+
+    def since(self, start: datetime) -> ServiceUsage:
+        """Return a copy without the usage readings before start."""
+        trimmed = ServiceUsage(**self._values)
+        for key in self._values:
+            value = self[key]
+            if isinstance(value, UsageSeries):
+                trimmed[key] = value.since(start)
+        return trimmed
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._values[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._values[key]
+        if isinstance(value, _Deferred):
+            value = self._values[key] = value.compute()
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        values = {key: "<deferred>" if isinstance(value, _Deferred) else value for key, value in self._values.items()}
+        return f"ServiceUsage({values})"
+
+
+def wall_clock_epoch(reading_time: datetime) -> int:
+    """Return the SmartHub epoch (milliseconds) of a wall-clock time - the time read as if it was UTC."""
+    return int(reading_time.replace(tzinfo=timezone.utc).timestamp() * 1000)
@@ -1,6 +1,18 @@
 """Utility functions for SmartHub integration."""
+import base64
+import functools
+import json
+from array import array
+from bisect import bisect_right
 from zoneinfo import ZoneInfo
 from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    # orjson ships with Home Assistant and decodes several times faster
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 def sanitize_host(host: str) -> str:
     """Sanitize host: remove protocol and trailing slashes."""
@@ -8,9 +20,133 @@ def sanitize_host(host: str) -> str:
         return ""
     return host.split("://")[-1].rstrip("/")
 
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document with the fastest available decoder."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def parse_epoch_set_timezone(epoch: float, target_tz: ZoneInfo) -> datetime:
     """Return a Datetime object based on a provided epoch as if that epoch was set in a specific timezone."""
     utc_datetime = datetime.fromtimestamp(epoch, tz=timezone.utc) # Set UTC to get a tz aware object
     zone_datetime = utc_datetime.replace(tzinfo=target_tz) # replace the TZ, to not adjust based on Timezones
     return zone_datetime
 
+
+DAY_MS = 86400 * 1000
+
+# (UTC epoch ms of the transition, UTC offset ms before it, UTC offset ms after it)
+Transition = Tuple[int, int, int]
+
+
+def _utc_offset_ms(tz: ZoneInfo, epoch: int) -> int:
+    return int(datetime.fromtimestamp(epoch, tz).utcoffset().total_seconds() * 1000)
+
+
+class LocalTimeConverter:
+    """Convert SmartHub epochs of a timezone to UTC with a table of its offset transitions.
+
+    SmartHub epochs are local wall-clock times read as if they were UTC. The
+    UTC offset transitions of the timezone are looked up once per year, and
+    each epoch is then converted with a binary search over that table.
+
+    Wall-clock times skipped by a transition (the spring-forward gap) are moved
+    to the transition itself, so they land in the first hour that exists. Times
+    repeated by a transition (the fall-back fold) are taken as the first
+    occurrence until the epochs go back in time, from then on as the second.
+    """
+
+    def __init__(self, tz: ZoneInfo) -> None:
+        """Initialize the LocalTimeConverter."""
+        self.timezone = tz
+        self._years: Dict[int, List[Transition]] = {}
+
+    def _year_transitions(self, year: int) -> List[Transition]:
+        transitions = self._years.get(year)
+        if transitions is None:
+            transitions = []
+            start = int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+            end = int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp())
+            previous = start
+            offset = _utc_offset_ms(self.timezone, start)
+            # Find the days with an offset change, then the second it changes at
+            for day in range(start + 86400, end + 1, 86400):
+                day_offset = _utc_offset_ms(self.timezone, day)
+                if day_offset != offset:
+                    low, high = previous, day
+                    while high - low > 1:
+                        middle = (low + high) // 2
+                        if _utc_offset_ms(self.timezone, middle) == offset:
+                            low = middle
+                        else:
+                            high = middle
+                    transitions.append((high * 1000, offset, day_offset))
+                    offset = day_offset
+                previous = day
+            self._years[year] = transitions
+        return transitions
+
+    def transitions(self, start: int, end: int) -> List[Transition]:
+        """Return the offset transitions between two UTC epochs (milliseconds)."""
+        first = datetime.fromtimestamp(start // 1000, timezone.utc).year
+        last = datetime.fromtimestamp(end // 1000, timezone.utc).year
+        return [
+            transition
+            for year in range(first, last + 1)
+            for transition in self._year_transitions(year)
+            if start <= transition[0] <= end
+        ]
+
+    def to_utc(self, raw_timestamps: Sequence[int]) -> array:
+        """Convert SmartHub epochs (milliseconds) to UTC epochs (milliseconds)."""
+        utc = array("q", [0]) * len(raw_timestamps)
+        if not raw_timestamps:
+            return utc
+
+        # Wall-clock and UTC times are at most a day apart
+        start = min(raw_timestamps) - DAY_MS
+        table = self.transitions(start, max(raw_timestamps) + DAY_MS)
+        if not table:
+            offset = _utc_offset_ms(self.timezone, start // 1000)
+            for index, raw_timestamp in enumerate(raw_timestamps):
+                utc[index] = raw_timestamp - offset
+            return utc
+
+        # Each transition affects the wall-clock times between its two offsets
+        region_starts = [instant + min(before, after) for instant, before, after in table]
+        region_ends = [instant + max(before, after) for instant, before, after in table]
+        first_offset = table[0][1]
+        repeated = set()
+        previous = None
+        for index, raw_timestamp in enumerate(raw_timestamps):
+            i = bisect_right(region_starts, raw_timestamp) - 1
+            if i < 0:
+                utc[index] = raw_timestamp - first_offset
+            else:
+                instant, before, after = table[i]
+                if raw_timestamp >= region_ends[i]:
+                    utc[index] = raw_timestamp - after
+                elif after > before: # gap - the wall-clock time doesn't exist
+                    utc[index] = instant
+                else: # fold - the wall-clock time happens twice
+                    if previous is not None and raw_timestamp <= previous:
+                        repeated.add(i)
+                    utc[index] = raw_timestamp - (after if i in repeated else before)
+            previous = raw_timestamp
+        return utc
+
+
+@functools.lru_cache(maxsize=None)
+def local_time_converter(tz: ZoneInfo) -> LocalTimeConverter:
+    """Return the shared LocalTimeConverter of a timezone."""
+    return LocalTimeConverter(tz)
+
+
+def parse_token_expiry(token: str) -> Optional[float]:
+    """Return the `exp` claim (epoch seconds) of a JWT token, or None if the token doesn't carry one."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
@@ -1,8 +1,13 @@
 """Fixtures for SmartHub tests."""
+import asyncio
+import json
 from unittest.mock import patch, AsyncMock
 from collections.abc import Generator
 
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from pytest_homeassistant_custom_component.common import MockConfigEntry
+from custom_components.smarthub import session
 from custom_components.smarthub.const import DOMAIN
 
 import pytest
@@ -10,3 +15,161 @@ import pytest
 @pytest.fixture(autouse=True)
 def base_recorder_fixture(recorder_mock, enable_custom_integrations):
     pass
+
+
+@pytest.fixture(autouse=True)
+async def reset_shared_sessions():
+    """Don't let shared sessions - and the circuit breakers on them - leak between tests."""
+    yield
+    for shared in list(session._SESSIONS.values()):
+        await shared.close()
+    session._SESSIONS.clear()
+
+
+class FakeSmartHub:
+    """Local stand-in for a SmartHub host.
+
+    Counts logins and requests, and can inject latency, PENDING responses,
+    error responses and token revocation.
+    """
+
+    def __init__(self) -> None:
+        self.logins = 0
+        self.requests = 0
+        self.latency = 0.0
+        self.pending_polls = 0
+        # (status, headers) responses returned by the next requests, before any other handling
+        self.failures: list[tuple[int, dict]] = []
+        # While down, every request - including probes - gets a 503
+        self.down = False
+        self.probes = 0
+        self.valid_tokens: set[str] = set()
+        self.locations = []
+        self.usage = {
+            "data": {
+                "hasHourly": True,
+                "hasDaily": True,
+                "ELECTRIC": [
+                    {
+                        "type": "USAGE",
+                        "meters": [{"seriesId": "METER1", "flowDirection": "FORWARD"}],
+                        "series": [
+                            {
+                                "name": "METER1",
+                                "data": [
+                                    {"x": 1762214400000, "y": 1.5},
+                                    {"x": 1762218000000, "y": 2.5},
+                                ],
+                            }
+                        ],
+                    }
+                ],
+            }
+        }
+        self.server: TestServer | None = None
+        # When set, usage readings this many minutes apart cover each requested window
+        self.window_step_minutes: int | None = None
+        self._usage_body: bytes | None = None
+        self._polls: dict[str, int] = {}
+
+    @property
+    def url(self) -> str:
+        return str(self.server.make_url("")).rstrip("/")
+
+    def add_locations(self, count: int, service: str = "ELEC") -> None:
+        """Add an active account with `count` service locations to the user-data response."""
+        self.locations.append({
+            "inactive": False,
+            "services": [service],
+            "serviceToProviders": {service: ["PROVIDER"]},
+            "providerToDescription": {"PROVIDER": "Test Provider"},
+            "serviceLocationToUserDataServiceLocationSummaries": {
+                f"LOC{i}": [{"services": [service], "description": f"Location {i}"}]
+                for i in range(count)
+            },
+        })
+
+    def set_usage_points(self, points: int, step_minutes: int = 15) -> None:
+        """Replace the ELECTRIC usage series with `points` readings `step_minutes` apart."""
+        start = 1762214400000
+        self.usage["data"]["ELECTRIC"][0]["series"][0]["data"] = [
+            {"x": start + i * step_minutes * 60000, "y": round(0.25 + (i % 7) * 0.1, 2)}
+            for i in range(points)
+        ]
+        # Encode large payloads once so the server doesn't stall the shared event loop
+        self._usage_body = json.dumps({"status": "COMPLETE", **self.usage}).encode()
+
+    def _window_usage_body(self, poll: dict) -> bytes:
+        step = self.window_step_minutes * 60000
+        start, end = int(poll["startDateTime"]), int(poll["endDateTime"])
+        series = {"name": "METER1", "data": [{"x": x, "y": 0.25} for x in range(start, end, step)]}
+        entry = {**self.usage["data"]["ELECTRIC"][0], "series": [series]}
+        return json.dumps({"status": "COMPLETE", "data": {**self.usage["data"], "ELECTRIC": [entry]}}).encode()
+
+    def revoke_tokens(self) -> None:
+        self.valid_tokens.clear()
+
+    def _failure(self) -> web.Response | None:
+        if self.down:
+            return web.Response(status=503)
+        if not self.failures:
+            return None
+        status, headers = self.failures.pop(0)
+        return web.Response(status=status, headers=headers)
+
+    def _authorized(self, request: web.Request) -> bool:
+        return request.headers.get("Authorization", "").removeprefix("Bearer ") in self.valid_tokens
+
+    async def probe(self, request: web.Request) -> web.Response:
+        self.probes += 1
+        return web.Response(status=503 if self.down else 200)
+
+    async def auth(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+        if (failure := self._failure()) is not None:
+            return failure
+        self.logins += 1
+        token = f"token-{self.logins}"
+        self.valid_tokens.add(token)
+        return web.json_response({"authorizationToken": token, "primaryUsername": "test@example.com"})
+
+    async def user_data(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if (failure := self._failure()) is not None:
+            return failure
+        if not self._authorized(request):
+            return web.Response(status=401)
+        return web.json_response(self.locations)
+
+    async def poll(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if (failure := self._failure()) is not None:
+            return failure
+        if not self._authorized(request):
+            return web.Response(status=401)
+        body = await request.text()
+        polls = self._polls[body] = self._polls.get(body, 0) + 1
+        if polls <= self.pending_polls:
+            return web.json_response({"status": "PENDING"})
+        if self.window_step_minutes is not None:
+            return web.Response(body=self._window_usage_body(json.loads(body)), content_type="application/json")
+        if self._usage_body is not None:
+            return web.Response(body=self._usage_body, content_type="application/json")
+        return web.json_response({"status": "COMPLETE", **self.usage})
+
+
+@pytest.fixture
+async def fake_smarthub(socket_enabled) -> Generator[FakeSmartHub]:
+    """Run a FakeSmartHub server on localhost."""
+    fake = FakeSmartHub()
+    app = web.Application()
+    app.router.add_route("HEAD", "/", fake.probe)
+    app.router.add_post("/services/oauth/auth/v2", fake.auth)
+    app.router.add_get("/services/secured/user-data", fake.user_data)
+    app.router.add_post("/services/secured/utility-usage/poll", fake.poll)
+    fake.server = TestServer(app)
+    await fake.server.start_server()
+    yield fake
+    await fake.server.close()
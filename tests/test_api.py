@@ -1,6 +1,16 @@
+import asyncio
+import base64
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
-from custom_components.smarthub.api import SmartHubAPI
+from custom_components.smarthub.api import SmartHubAPI, SmartHubLocation, Aggregation, TokenCache
+from custom_components.smarthub.const import ELECTRIC_SERVICE, MAX_RETRIES
+from custom_components.smarthub.exceptions import SmartHubConnectionError, SmartHubTimeoutError
+from custom_components.smarthub.poll import PollScheduler
+from custom_components.smarthub.retry import refresh_budget
 
 @pytest.mark.parametrize("password", [
     "simplepassword",
@@ -30,6 +40,7 @@ async def test_get_token_encoding(password):
     mock_response.status = 200
     mock_response.text = AsyncMock(return_value='{"authorizationToken": "fake_token"}')
     mock_response.json = AsyncMock(return_value={"authorizationToken": "fake_token"})
+    mock_response.read = AsyncMock(return_value=b'{"authorizationToken": "fake_token"}')
 
     mock_session = MagicMock()
     mock_session.post = MagicMock(return_value=mock_response)
@@ -52,3 +63,336 @@ async def test_get_token_encoding(password):
         sent_payload = kwargs.get("data")
         assert sent_payload["password"] == password
         assert sent_payload["userId"] == email
+
+        # The body is read once and decoded by the integration
+        mock_response.read.assert_awaited_once()
+        mock_response.text.assert_not_awaited()
+        mock_response.json.assert_not_awaited()
+
+
+def _mock_response(status, json_data):
+    """Build a mock aiohttp response usable as an async context manager."""
+    response = AsyncMock()
+    response.status = status
+    response.text = AsyncMock(return_value=str(json_data))
+    response.json = AsyncMock(return_value=json_data)
+    response.read = AsyncMock(return_value=json.dumps(json_data).encode())
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=None)
+    return context
+
+
+@pytest.fixture
+def api_instance():
+    """Create an API instance for testing."""
+    return SmartHubAPI(
+        email="test@example.com",
+        password="testpass",
+        account_id="123456",
+        timezone="UTC",
+        mfa_totp="",
+        host="test.smarthub.coop"
+    )
+
+
+@pytest.mark.asyncio
+async def test_token_cache_reused_across_requests(api_instance):
+    """A valid cached token is reused instead of logging in on every request."""
+    mock_session = MagicMock()
+    mock_session.post = MagicMock(side_effect=lambda *a, **k: _mock_response(200, {"authorizationToken": "fake_token"}))
+    mock_session.get = MagicMock(side_effect=lambda *a, **k: _mock_response(200, []))
+
+    with patch.object(SmartHubAPI, "_get_session", return_value=mock_session):
+        for _ in range(3):
+            api_instance.response_cache.clear()
+            await api_instance.get_service_locations()
+
+    assert mock_session.post.call_count == 1
+    assert api_instance.token_cache.misses == 1
+    assert api_instance.token_cache.hits == 2
+    assert api_instance.get_metrics()["token_cache"]["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_token_cache_refreshes_expired_token(api_instance):
+    """An expired token triggers a new login."""
+    mock_session = MagicMock()
+    mock_session.post = MagicMock(side_effect=lambda *a, **k: _mock_response(200, {"authorizationToken": "fake_token"}))
+    mock_session.get = MagicMock(side_effect=lambda *a, **k: _mock_response(200, []))
+
+    with patch.object(SmartHubAPI, "_get_session", return_value=mock_session):
+        await api_instance.get_service_locations()
+        api_instance.token_cache.expires_at = time.time() + api_instance.token_cache.margin - 1
+        api_instance.response_cache.clear()
+        await api_instance.get_service_locations()
+
+    assert mock_session.post.call_count == 2
+    assert api_instance.token_cache.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_token_cache_refreshes_on_401(api_instance):
+    """A cached token rejected by the server is refreshed once and the request retried."""
+    api_instance.token = "revoked_token"
+    api_instance.primary_username = "test@example.com"
+
+    responses = iter([_mock_response(401, {}), _mock_response(200, [])])
+    mock_session = MagicMock()
+    mock_session.post = MagicMock(side_effect=lambda *a, **k: _mock_response(200, {"authorizationToken": "fresh_token"}))
+    mock_session.get = MagicMock(side_effect=lambda *a, **k: next(responses))
+
+    with patch.object(SmartHubAPI, "_get_session", return_value=mock_session):
+        assert await api_instance.get_service_locations() == []
+
+    assert mock_session.post.call_count == 1
+    assert mock_session.get.call_count == 2
+    assert api_instance.token == "fresh_token"
+    assert api_instance.token_cache.hits == 1
+
+
+def test_token_cache_uses_jwt_expiry():
+    """Token expiry is read from the JWT exp claim when present."""
+    cache = TokenCache()
+    expiry = int(time.time()) + 7200
+    claims = base64.urlsafe_b64encode(json.dumps({"exp": expiry}).encode()).decode().rstrip("=")
+    cache.set(f"header.{claims}.signature")
+    assert cache.expires_at == expiry
+    assert cache.valid
+
+    cache.set(f"header.{base64.urlsafe_b64encode(json.dumps({'exp': 1}).encode()).decode()}.signature")
+    assert not cache.valid
+    assert cache.get() is None
+
+    cache.set("opaque-token")
+    assert cache.valid
+
+
+def _location(id=1):
+    return SmartHubLocation(id=str(id), service=ELECTRIC_SERVICE, description="", provider="")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_single_login(api_instance, fake_smarthub):
+    """Concurrent energy requests without a token trigger exactly one login."""
+    fake_smarthub.latency = 0.05
+    api_instance.base_url = fake_smarthub.url
+    try:
+        results = await asyncio.gather(*(
+            api_instance.get_energy_data(location=_location(i), aggregation=Aggregation.HOURLY)
+            for i in range(20)
+        ))
+    finally:
+        await api_instance.close()
+
+    assert fake_smarthub.logins == 1
+    assert fake_smarthub.requests == 20
+    assert all(result is not None for result in results)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_401_single_relogin(api_instance, fake_smarthub):
+    """A token rejected by many in-flight requests at once is refreshed exactly once."""
+    fake_smarthub.latency = 0.05
+    api_instance.base_url = fake_smarthub.url
+    api_instance.limiter.limit = 20 # all of them in flight
+    try:
+        await api_instance.get_token()
+        fake_smarthub.revoke_tokens()
+        results = await asyncio.gather(*(
+            api_instance.get_energy_data(location=_location(i), aggregation=Aggregation.DAILY)
+            for i in range(20)
+        ))
+    finally:
+        await api_instance.close()
+
+    assert fake_smarthub.logins == 2
+    assert fake_smarthub.requests == 40 # every request rejected once, then retried
+    assert all(result is not None for result in results)
+
+
+@pytest.mark.asyncio
+async def test_small_payloads_decoded_inline(api_instance, fake_smarthub):
+    """Small responses are decoded and parsed on the event loop."""
+    api_instance.base_url = fake_smarthub.url
+    location = SmartHubLocation(id="1", service=ELECTRIC_SERVICE, description="", provider="")
+
+    try:
+        result = await api_instance.get_energy_data(location=location, aggregation=Aggregation.HOURLY)
+    finally:
+        await api_instance.close()
+
+    stats = api_instance.get_metrics()["payloads"]
+    assert stats["inline"] == 2 # decode + parse, the series is not parsed yet
+    assert stats["offloaded"] == 0
+    assert "<deferred>" in repr(result[ELECTRIC_SERVICE])
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_offloaded(api_instance, fake_smarthub):
+    """Large responses are decoded and fully parsed in the executor."""
+    fake_smarthub.set_usage_points(2000)
+    api_instance.base_url = fake_smarthub.url
+    api_instance.offload_payload_size = 1024
+    api_instance.offload_parse_points = 1000
+    location = SmartHubLocation(id="1", service=ELECTRIC_SERVICE, description="", provider="")
+
+    try:
+        result = await api_instance.get_energy_data(location=location, aggregation=Aggregation.HOURLY)
+    finally:
+        await api_instance.close()
+
+    stats = api_instance.get_metrics()["payloads"]
+    assert stats["inline"] == 0
+    assert stats["offloaded"] == 2
+    assert "<deferred>" not in repr(result[ELECTRIC_SERVICE])
+    assert len(result[ELECTRIC_SERVICE]["USAGE"]) == 500 # 15 minute points in hourly readings
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_coalesced(api_instance, fake_smarthub):
+    """Concurrent identical energy requests share one upstream poll, including its PENDING re-polls."""
+    fake_smarthub.latency = 0.05
+    fake_smarthub.pending_polls = 2
+    api_instance.base_url = fake_smarthub.url
+    api_instance.poll_scheduler = PollScheduler(delay=0.01)
+
+    try:
+        results = await asyncio.gather(
+            *(api_instance.get_energy_data(location=_location(1), aggregation=Aggregation.HOURLY) for _ in range(5)),
+            api_instance.get_energy_data(location=_location(2), aggregation=Aggregation.HOURLY),
+        )
+    finally:
+        await api_instance.close()
+
+    assert fake_smarthub.requests == 6 # 3 polls for each distinct location
+    assert all(result is results[0] for result in results[:5])
+    assert results[5] is not results[0]
+    assert api_instance.get_metrics()["inflight"] == {"active": 0, "coalesced": 4}
+
+
+@pytest.mark.asyncio
+async def test_coalesced_caller_cancellation(api_instance, fake_smarthub):
+    """A caller giving up doesn't cancel the request shared with other callers."""
+    fake_smarthub.latency = 0.1
+    api_instance.base_url = fake_smarthub.url
+
+    try:
+        first = asyncio.ensure_future(api_instance.get_energy_data(location=_location(), aggregation=Aggregation.HOURLY))
+        second = asyncio.ensure_future(api_instance.get_energy_data(location=_location(), aggregation=Aggregation.HOURLY))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await second
+    finally:
+        await api_instance.close()
+
+    assert first.cancelled()
+    assert result is not None
+    assert fake_smarthub.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesced_callers_keep_their_own_budget(api_instance, fake_smarthub):
+    """A shared request isn't bound by the refresh deadline of the caller that started it."""
+    fake_smarthub.pending_polls = 2
+    api_instance.base_url = fake_smarthub.url
+    api_instance.poll_scheduler = PollScheduler(delay=0.05)
+
+    async def get(deadline):
+        with refresh_budget(deadline=deadline):
+            return await api_instance.get_energy_data(location=_location(), aggregation=Aggregation.HOURLY)
+
+    try:
+        first, second = await asyncio.gather(get(0.02), get(30), return_exceptions=True)
+    finally:
+        await api_instance.close()
+
+    assert isinstance(first, SmartHubTimeoutError)
+    assert second is not None and not isinstance(second, Exception)
+    assert fake_smarthub.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_response_cache_reuses_usage(api_instance, fake_smarthub):
+    """Repeated and covered energy requests are served from the response cache."""
+    api_instance.base_url = fake_smarthub.url
+    start = datetime(2025, 11, 1, tzinfo=timezone.utc)
+
+    try:
+        first = await api_instance.get_energy_data(location=_location(), aggregation=Aggregation.HOURLY, start_datetime=start)
+        # the same window, with a start inside the same hour bucket
+        again = await api_instance.get_energy_data(location=_location(), aggregation=Aggregation.HOURLY, start_datetime=start + timedelta(minutes=20))
+        # a later start is covered by the cached window, and trimmed
+        later = await api_instance.get_energy_data(location=_location(), aggregation=Aggregation.HOURLY, start_datetime=datetime(2025, 11, 4, 1, tzinfo=timezone.utc))
+        # an earlier start isn't
+        await api_instance.get_energy_data(location=_location(), aggregation=Aggregation.HOURLY, start_datetime=start - timedelta(days=1))
+    finally:
+        await api_instance.close()
+
+    assert fake_smarthub.requests == 2
+    assert again is first
+    assert len(first[ELECTRIC_SERVICE]["USAGE"]) == 2
+    assert len(later[ELECTRIC_SERVICE]["USAGE"]) == 1
+    assert api_instance.get_metrics()["response_cache"]["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_response_cache_reuses_locations(api_instance, fake_smarthub):
+    """Service locations are fetched once per cache TTL."""
+    fake_smarthub.add_locations(2)
+    api_instance.base_url = fake_smarthub.url
+
+    try:
+        first = await api_instance.get_service_locations()
+        second = await api_instance.get_service_locations()
+        assert fake_smarthub.requests == 1
+        assert first == second
+        assert first is not second
+
+        fake_smarthub.add_locations(3)
+        refreshed = await api_instance.get_service_locations(refresh=True)
+        assert fake_smarthub.requests == 2
+        assert await api_instance.get_service_locations() == refreshed != first
+    finally:
+        await api_instance.close()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_requests_retried(api_instance, fake_smarthub):
+    """429 and 503 responses are retried on every endpoint, after their Retry-After delay."""
+    api_instance.base_url = fake_smarthub.url
+    api_instance.retry_policy.base_delay = 0.01
+    fake_smarthub.add_locations(1)
+    fake_smarthub.failures = [
+        (429, {"Retry-After": "0"}), # authentication
+        (503, {}), # user-data
+        (503, {"Retry-After": "0"}), # poll
+    ]
+
+    try:
+        locations = await api_instance.get_service_locations()
+        result = await api_instance.get_energy_data(location=locations[0], aggregation=Aggregation.HOURLY)
+    finally:
+        await api_instance.close()
+
+    assert result[ELECTRIC_SERVICE]["USAGE"]
+    assert fake_smarthub.logins == 1
+    assert not fake_smarthub.failures
+    assert api_instance.get_metrics()["retries"]["retries"] == 3
+
+
+@pytest.mark.asyncio
+async def test_persistent_server_errors_fail(api_instance, fake_smarthub):
+    """A poll still failing after every attempt raises SmartHubConnectionError."""
+    api_instance.base_url = fake_smarthub.url
+    api_instance.retry_policy.base_delay = 0
+
+    try:
+        await api_instance.get_token()
+        fake_smarthub.failures = [(503, {})] * 10
+        with pytest.raises(SmartHubConnectionError, match="HTTP status: 503"):
+            await api_instance.get_energy_data(location=_location(1), aggregation=Aggregation.HOURLY)
+    finally:
+        await api_instance.close()
+
+    assert len(fake_smarthub.failures) == 10 - MAX_RETRIES
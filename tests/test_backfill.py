@@ -0,0 +1,149 @@
+"""Test file for the SmartHub background history import."""
+import asyncio
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from unittest.mock import AsyncMock
+
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smarthub.api import Aggregation, SmartHubAPI, SmartHubLocation
+from custom_components.smarthub.backfill import BackfillQueue
+from custom_components.smarthub.const import DOMAIN, ELECTRIC_SERVICE
+from custom_components.smarthub.exceptions import SmartHubConnectionError
+from custom_components.smarthub.sensor import SmartHubDataUpdateCoordinator
+
+UTC = ZoneInfo("UTC")
+LOCATION = SmartHubLocation(id="11111", service=ELECTRIC_SERVICE, description="test location", provider="test provider")
+
+HOURLY_DATA = {
+    "data": {
+        "hasDaily": True,
+        "hasHourly": True,
+        "ELECTRIC": [
+            {
+                "type": "USAGE",
+                "meters": [
+                    {'meterNumber': '1ND91111111', 'seriesId': '1ND91111111', 'flowDirection': 'FORWARD', 'isNetMeter': False},
+                ],
+                "series": [
+                    {
+                        "meterNumber": "1ND91111111", "name": "1ND91111111",
+                        "data": [
+                            {"x": 1762215300000, "y": 1},
+                            {"x": 1762216200000, "y": 10},
+                            {"x": 1762217100000, "y": 100},
+                            {"x": 1762218900000, "y": 1},
+                        ]
+                    },
+                ]
+            }
+        ]
+    }
+}
+
+
+def _config_entry() -> MockConfigEntry:
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "email": "test@example.com",
+            "password": "testpass",
+            "account_id": "123456",
+            "host": "test.smarthub.coop",
+            "poll_interval": 60,
+            "timezone": "UTC",
+            "mfa_totp": "",
+        },
+        unique_id="test@example.com_test.smarthub.coop_123456",
+    )
+
+
+async def test_history_imported_after_refresh(recorder_mock: Recorder, hass: HomeAssistant, freezer) -> None:
+    """A first refresh only fetches the entity data - the history is imported in the background."""
+    freezer.move_to("2025-11-05 12:00:00+00:00")
+    parser = SmartHubAPI("test@example.com", "testpass", "123456", "UTC", "", "test.smarthub.coop")
+    api = AsyncMock(spec=SmartHubAPI)
+    api.timezone = "UTC"
+    api.get_metrics = lambda: {}
+    api.get_service_locations.return_value = [LOCATION]
+    hourly_released = asyncio.Event()
+
+    async def get_energy_data(location, start_datetime, aggregation, end_datetime=None):
+        if aggregation == Aggregation.HOURLY:
+            await hourly_released.wait()
+        return parser.parse_usage(HOURLY_DATA, aggregation)
+
+    api.get_energy_data.side_effect = get_energy_data
+    coordinator = SmartHubDataUpdateCoordinator(hass, api=api, update_interval=timedelta(minutes=60), config_entry=_config_entry())
+
+    await coordinator._async_update_data()
+    requested = [call.kwargs["aggregation"] for call in api.get_energy_data.call_args_list]
+    assert requested == [Aggregation.MONTHLY]
+
+    await hass.async_block_till_done()
+    assert coordinator.backfill.stats() == {
+        "running": True, "progress": 0.0, "scheduled": 3, "completed": 0, "failed": 0, "pending": 0, "current": "11111",
+        "estimated_requests": 3, "estimated_bytes": coordinator.backfill_plan(LOCATION, list(Aggregation)).estimated_bytes,
+    }
+
+    # Another refresh meanwhile doesn't schedule the running import again
+    await coordinator._async_update_data()
+    assert coordinator.backfill.scheduled == 3
+
+    hourly_released.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert coordinator.backfill.stats()["progress"] == 100.0
+    assert not coordinator.backfill.running
+
+    # HOURLY data only for the recent days, DAILY and MONTHLY data before that
+    tiers = [call.kwargs for call in api.get_energy_data.call_args_list if call.kwargs.get("end_datetime")]
+    assert [tier["aggregation"] for tier in tiers] == [Aggregation.MONTHLY, Aggregation.DAILY, Aggregation.HOURLY]
+    assert tiers[2]["start_datetime"] == datetime(2025, 10, 6, tzinfo=UTC)
+    assert [tier["end_datetime"] for tier in tiers[:2]] == [tiers[1]["start_datetime"], tiers[2]["start_datetime"]]
+
+    get_instance(hass)._async_commit(dt_util.utcnow())
+    await hass.async_add_executor_job(get_instance(hass).block_till_done)
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.utc_from_timestamp(0),
+        None,
+        {"smarthub:smarthub_energy_sensor_123456_11111"},
+        "hour",
+        None,
+        {"sum"},
+    )
+    assert stats["smarthub:smarthub_energy_sensor_123456_11111"][0]["sum"] == 111.0
+
+
+async def test_failed_import_is_rescheduled(hass: HomeAssistant) -> None:
+    """A failed import is counted, and can be scheduled again by the next refresh."""
+    entry = _config_entry()
+    entry.add_to_hass(hass)
+    imports = AsyncMock(side_effect=[SmartHubConnectionError("down"), None])
+    backfill = BackfillQueue(hass, entry, imports)
+    updates = []
+    backfill.async_add_listener(lambda: updates.append(backfill.progress))
+
+    backfill.schedule(LOCATION, Aggregation.MONTHLY)
+    backfill.schedule(LOCATION, Aggregation.HOURLY)
+    backfill.schedule(LOCATION, Aggregation.HOURLY)
+    backfill.async_start()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    imports.assert_awaited_once_with(LOCATION, [Aggregation.HOURLY, Aggregation.MONTHLY])
+    assert backfill.stats()["failed"] == 2
+    assert updates[-1] == 100.0
+
+    backfill.schedule(LOCATION, Aggregation.HOURLY)
+    assert backfill.progress == 66.7
+    backfill.async_start()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert backfill.stats() == {
+        "running": False, "progress": 100.0, "scheduled": 3, "completed": 1, "failed": 2, "pending": 0, "current": None,
+        "estimated_requests": 0, "estimated_bytes": 0,
+    }
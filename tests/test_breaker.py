@@ -0,0 +1,138 @@
+"""Tests for the per-host circuit breaker."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiohttp import ClientConnectionError
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smarthub.api import SmartHubAPI, SmartHubLocation, Aggregation
+from custom_components.smarthub.breaker import CircuitBreaker, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+from custom_components.smarthub.const import DOMAIN, ELECTRIC_SERVICE, ENERGY_SENSOR_KEY, LOCATION_KEY
+from custom_components.smarthub.exceptions import (
+    SmartHubAuthenticationError,
+    SmartHubCircuitOpenError,
+    SmartHubConnectionError,
+    SmartHubRetryableError,
+)
+from custom_components.smarthub.sensor import SmartHubDataUpdateCoordinator
+
+LOCATION = SmartHubLocation(id="1", service=ELECTRIC_SERVICE, description="", provider="")
+
+
+async def _fail(breaker, error):
+    with pytest.raises(type(error)):
+        await breaker.async_call(AsyncMock(side_effect=error), AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_opens_after_consecutive_failures(freezer):
+    """Host failures in a row open the circuit, which then rejects requests without sending them."""
+    breaker = CircuitBreaker("host", failure_threshold=3, reset_timeout=60)
+
+    await _fail(breaker, ClientConnectionError())
+    await _fail(breaker, asyncio.TimeoutError())
+    await breaker.async_call(AsyncMock(), AsyncMock()) # a response resets the count
+    await _fail(breaker, SmartHubRetryableError("busy", 503))
+    await _fail(breaker, SmartHubRetryableError("slow down", 429)) # rate limited - the host is up
+    await _fail(breaker, ClientConnectionError())
+    await _fail(breaker, SmartHubAuthenticationError()) # the host answered
+    await _fail(breaker, SmartHubConnectionError("gave up")) # a nested request - says nothing about the host
+    await _fail(breaker, ClientConnectionError())
+    await _fail(breaker, ClientConnectionError())
+    assert breaker.state == STATE_CLOSED
+    await _fail(breaker, ClientConnectionError())
+    assert breaker.state == STATE_OPEN
+
+    request = AsyncMock()
+    with pytest.raises(SmartHubCircuitOpenError):
+        await breaker.async_call(request, AsyncMock())
+    request.assert_not_awaited()
+    assert breaker.stats() == {"state": STATE_OPEN, "failures": 3, "opened": 1, "rejected": 1}
+
+    freezer.tick(61)
+    assert breaker.state == STATE_HALF_OPEN
+
+
+@pytest.mark.asyncio
+async def test_probe(freezer):
+    """After the reset timeout one probe runs for every waiting request - closing the circuit if it succeeds."""
+    breaker = CircuitBreaker("host", failure_threshold=1, reset_timeout=60)
+    await _fail(breaker, ClientConnectionError())
+    freezer.tick(61)
+
+    probe = AsyncMock(side_effect=ClientConnectionError())
+    with pytest.raises(SmartHubCircuitOpenError):
+        await breaker.async_call(AsyncMock(), probe)
+    assert breaker.state == STATE_OPEN # for another reset timeout
+
+    freezer.tick(61)
+    probe = AsyncMock()
+    request = AsyncMock(return_value="ok")
+    assert await asyncio.gather(*(breaker.async_call(request, probe) for _ in range(5))) == ["ok"] * 5
+    probe.assert_awaited_once()
+    assert breaker.state == STATE_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_host_outage(freezer, fake_smarthub):
+    """Requests to a host that is down stop after the circuit opens, and resume once a probe succeeds."""
+    api = SmartHubAPI(
+        email="test@example.com",
+        password="testpass",
+        account_id="123456",
+        timezone="UTC",
+        mfa_totp="",
+        host="test.smarthub.coop",
+    )
+    api.base_url = fake_smarthub.url
+    api.retry_policy.base_delay = 0
+    fake_smarthub.down = True
+
+    try:
+        with pytest.raises(SmartHubConnectionError):
+            await api.get_energy_data(location=LOCATION, aggregation=Aggregation.HOURLY)
+        assert api.breaker.state == STATE_OPEN
+        requests = fake_smarthub.requests
+
+        with pytest.raises(SmartHubCircuitOpenError):
+            await api.get_energy_data(location=LOCATION, aggregation=Aggregation.DAILY)
+        assert fake_smarthub.requests == requests
+        assert fake_smarthub.probes == 0
+
+        fake_smarthub.down = False
+        freezer.tick(api.breaker.reset_timeout + 1)
+        result = await api.get_energy_data(location=LOCATION, aggregation=Aggregation.DAILY)
+    finally:
+        await api.close()
+
+    assert result[ELECTRIC_SERVICE]["USAGE"]
+    assert fake_smarthub.probes == 1
+    assert api.get_metrics()["circuit_breaker"] is None # released with the session
+    assert api.breaker.state == STATE_CLOSED
+
+
+async def test_coordinator_keeps_last_data(hass: HomeAssistant) -> None:
+    """While the circuit is open the coordinator keeps serving its last data."""
+    entry = MockConfigEntry(domain=DOMAIN, data={"account_id": "123456"})
+    api = MagicMock()
+    coordinator = SmartHubDataUpdateCoordinator(hass, api, timedelta(minutes=60), entry)
+    coordinator.location_store.async_get_locations = AsyncMock(return_value=[LOCATION])
+    update_location = AsyncMock(return_value={ENERGY_SENSOR_KEY: 1.0, LOCATION_KEY: LOCATION})
+
+    with patch.object(coordinator, "_async_update_location", update_location):
+        update_location.side_effect = SmartHubCircuitOpenError("paused")
+        await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+
+        update_location.side_effect = None
+        await coordinator.async_refresh()
+        data = coordinator.data
+
+        update_location.side_effect = SmartHubCircuitOpenError("paused")
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data is data
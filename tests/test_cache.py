@@ -0,0 +1,39 @@
+"""Tests for the response cache."""
+from custom_components.smarthub.cache import ResponseCache
+
+
+def test_cache_ttl(freezer):
+    """Entries expire after their own TTL."""
+    cache = ResponseCache()
+    cache.set("short", 1, ttl=10)
+    cache.set("long", 2, ttl=100)
+
+    assert cache.get("short") == 1
+    freezer.tick(11)
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    assert cache.stats() == {"entries": 1, "hits": 2, "misses": 1, "hit_rate": 0.667, "evictions": 0}
+
+
+def test_cache_lru_bound():
+    """The least recently used entry is evicted once the cache is full."""
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_cache_accept():
+    """A cached value rejected by the caller counts as a miss."""
+    cache = ResponseCache()
+    cache.set("a", (5, "data"), ttl=60)
+
+    assert cache.get("a", lambda entry: entry[0] <= 4) is None
+    assert cache.get("a", lambda entry: entry[0] <= 5) == (5, "data")
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -11,6 +11,7 @@ from custom_components.smarthub.api import SmartHubAPI, SmartHubAPIError, SmartH
 from custom_components.smarthub.const import DOMAIN, ENERGY_SENSOR_KEY, ELECTRIC_SERVICE
 
 from custom_components.smarthub.sensor import SmartHubDataUpdateCoordinator
+from custom_components.smarthub.usage import UsageSeries
 from homeassistant.components.recorder import Recorder
 from homeassistant.components.recorder.models import (
     StatisticData,
@@ -22,7 +23,7 @@ from homeassistant.components.recorder.statistics import (
     get_last_statistics,
     statistics_during_period,
 )
-from datetime import timedelta
+from datetime import UTC, datetime, timedelta
 from homeassistant.util import dt as dt_util
 
 
@@ -77,8 +78,12 @@ async def test_coordinator_first_run_forward_meter(
     hass: HomeAssistant,
     mock_config_entry: MockConfigEntry,
     mock_smarthub_api: AsyncMock,
+    freezer,
 ) -> None:
     """Test the coordinator on its first run with no existing statistics."""
+    # Daily statistics are rolled up from the hourly data, and only buckets
+    # inside the requested window are imported - set "now" just after the data.
+    freezer.move_to("2025-11-05 12:00:00+00:00")
     mock_smarthub_api.get_service_locations.return_value = [
       SmartHubLocation(
         id="11111",
@@ -138,17 +143,24 @@ async def test_coordinator_first_run_forward_meter(
     )
 
     # The first hour's statistics summary is...
-    assert stats["smarthub:smarthub_energy_sensor_daily_123456_11111"][0]["sum"] == 111.0
+    assert stats["smarthub:smarthub_energy_sensor_daily_123456_11111"][0]["sum"] == 112.0 # whole day rolled up from hourly
     assert stats["smarthub:smarthub_energy_sensor_123456_11111"][0]["sum"] == 111.0
 
+    # One request per tier of the plan, plus the entity's MONTHLY value
+    requested = [call.kwargs["aggregation"] for call in mock_smarthub_api.get_energy_data.call_args_list]
+    assert sorted(requested) == [Aggregation.DAILY, Aggregation.HOURLY, Aggregation.MONTHLY, Aggregation.MONTHLY]
+
 
 async def test_coordinator_first_run_total_meter(
     recorder_mock: Recorder,
     hass: HomeAssistant,
     mock_config_entry: MockConfigEntry,
     mock_smarthub_api: AsyncMock,
+    freezer,
 ) -> None:
     """Test the coordinator on its first run with no existing statistics."""
+    # The first import only keeps readings inside the planned tiers - set "now" just after the data.
+    freezer.move_to("2025-11-05 12:00:00+00:00")
     mock_smarthub_api.get_service_locations.return_value = [
       SmartHubLocation(
         id="11111",
@@ -216,8 +228,11 @@ async def test_coordinator_first_run_net_meter(
     hass: HomeAssistant,
     mock_config_entry: MockConfigEntry,
     mock_smarthub_api: AsyncMock,
+    freezer,
 ) -> None:
     """Test the coordinator on its first run with no existing statistics."""
+    # The first import only keeps readings inside the planned tiers - set "now" just after the data.
+    freezer.move_to("2025-11-05 12:00:00+00:00")
     mock_smarthub_api.get_service_locations.return_value = [
       SmartHubLocation(
         id="11111",
@@ -302,8 +317,11 @@ async def test_coordinator_first_run_return_meter(
     hass: HomeAssistant,
     mock_config_entry: MockConfigEntry,
     mock_smarthub_api: AsyncMock,
+    freezer,
 ) -> None:
     """Test the coordinator on its first run with no existing statistics."""
+    # The first import only keeps readings inside the planned tiers - set "now" just after the data.
+    freezer.move_to("2025-11-05 12:00:00+00:00")
     mock_smarthub_api.get_service_locations.return_value = [
       SmartHubLocation(
         id="11111",
@@ -383,9 +401,68 @@ async def test_coordinator_first_run_return_meter(
 
 
 
+async def test_coordinator_updates_month_to_date(
+    recorder_mock: Recorder,
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_smarthub_api: AsyncMock,
+    freezer,
+) -> None:
+    """An existing MONTHLY statistic for the month is rewritten when newer hourly data arrives."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2025-11-20 12:00:00+00:00")
+    location = SmartHubLocation(id="11111", service=ELECTRIC_SERVICE, description="test location", provider="test provider")
+    mock_smarthub_api.get_service_locations.return_value = [location]
+    coordinator = SmartHubDataUpdateCoordinator(hass, api=mock_smarthub_api, update_interval=timedelta(minutes=720), config_entry=mock_config_entry)
+
+    # Statistics imported by a refresh on November 10th
+    def at(month, day, hour=0):
+        return datetime(2025, month, day, hour, tzinfo=UTC)
+
+    existing = {
+        Aggregation.HOURLY: [(at(11, 10), 10.0)],
+        Aggregation.DAILY: [(at(11, 10), 20.0)],
+        Aggregation.MONTHLY: [(at(10, 1), 100.0), (at(11, 1), 130.0)],
+    }
+    for aggregation, sums in existing.items():
+        metadata, _ = coordinator.statistic_metadata(location, aggregation)
+        async_add_external_statistics(hass, metadata, [StatisticData(start=start, state=0.0, sum=total) for start, total in sums])
+    await async_wait_recording_done(hass)
+
+    # October and the start of November only as DAILY data, hourly data from November 8th
+    daily = UsageSeries.from_readings(UTC, [(at(10, 15), 100.0)] + [(at(11, day), 4.0) for day in range(1, 8)])
+    hourly = UsageSeries.from_readings(UTC, [(at(11, day, 12), 2.0) for day in range(7, 20)])
+
+    async def get_energy_data(location, aggregation, start_datetime=None, end_datetime=None):
+        if aggregation == Aggregation.HOURLY:
+            return {ELECTRIC_SERVICE: {"hasHourly": True, "hasDaily": False, "USAGE": hourly}}
+        usage = daily.since(start_datetime)
+        return {ELECTRIC_SERVICE: {"hasHourly": False, "hasDaily": True, "USAGE": usage.until(end_datetime) if end_datetime else usage}}
+
+    mock_smarthub_api.get_energy_data.side_effect = get_energy_data
+
+    await coordinator._async_update_data()
+    await async_wait_recording_done(hass)
+
+    monthly_statistic_id = coordinator.statistic_metadata(location, Aggregation.MONTHLY)[0]["statistic_id"]
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.utc_from_timestamp(0),
+        None,
+        {monthly_statistic_id},
+        "hour",
+        None,
+        {"sum"},
+    )
+
+    # October anchors the import, and November is 7 days of DAILY data and 12 rolled up days since
+    assert [stat["sum"] for stat in stats[monthly_statistic_id]] == [100.0, 152.0]
+
+
 async def async_wait_recording_done(hass) -> None:
     """Async wait until recording is done."""
-    await hass.async_block_till_done()
+    await hass.async_block_till_done(wait_background_tasks=True)
     get_instance(hass)._async_commit(dt_util.utcnow())
     await hass.async_block_till_done()
     await hass.async_add_executor_job(get_instance(hass).block_till_done)
@@ -0,0 +1,37 @@
+"""Tests for SmartHub diagnostics."""
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smarthub.api import SmartHubAPI
+from custom_components.smarthub.const import DOMAIN
+from custom_components.smarthub.diagnostics import async_get_config_entry_diagnostics
+
+
+async def test_diagnostics(hass: HomeAssistant) -> None:
+    """Diagnostics redact credentials and expose the API metrics."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "email": "test@example.com",
+            "password": "testpass",
+            "account_id": "123456",
+            "host": "test.smarthub.coop",
+            "timezone": "UTC",
+            "mfa_totp": "",
+        },
+    )
+    api = SmartHubAPI("test@example.com", "testpass", "123456", "UTC", "", "test.smarthub.coop")
+    api.response_cache.set("key", "value", 60)
+    api.response_cache.get("key")
+    api.response_cache.get("other")
+    entry.runtime_data = MagicMock(api=api)
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["password"] == "**REDACTED**"
+    assert diagnostics["entry"]["email"] == "**REDACTED**"
+    assert diagnostics["entry"]["host"] == "test.smarthub.coop"
+    assert diagnostics["metrics"]["response_cache"]["hit_rate"] == 0.5
+    assert "token_cache" in diagnostics["metrics"]
@@ -149,8 +149,11 @@ async def test_coordinator_first_run_gas_electric(
     hass: HomeAssistant,
     mock_config_entry: MockConfigEntry,
     mock_smarthub_api: AsyncMock,
+    freezer,
 ) -> None:
     """Test the coordinator on its first run with no existing statistics."""
+    # The first import only keeps readings inside the planned tiers - set "now" just after the data.
+    freezer.move_to("2025-02-20 12:00:00+00:00")
     mock_smarthub_api.get_service_locations.return_value = [
       SmartHubLocation(
         id="11111",
@@ -178,8 +181,8 @@ async def test_coordinator_first_run_gas_electric(
                              {'meterNumber': '1ND81111111', 'seriesId': '1ND81111111', 'flowDirection': 'NET', 'isNetMeter': True}, # Non net meters have Forward flow as default
                             ],
                             "data": [
-                                {"x": 1640995200000, "y": 100.5},
-                                {"x": 1641081600000, "y": 150.2},
+                                {"x": 1739836800000, "y": 100.5},
+                                {"x": 1739923200000, "y": 150.2},
                             ]
                         }
                     ]
@@ -255,7 +258,7 @@ async def test_coordinator_first_run_gas_electric(
 
 async def async_wait_recording_done(hass) -> None:
     """Async wait until recording is done."""
-    await hass.async_block_till_done()
+    await hass.async_block_till_done(wait_background_tasks=True)
     get_instance(hass)._async_commit(dt_util.utcnow())
     await hass.async_block_till_done()
     await hass.async_add_executor_job(get_instance(hass).block_till_done)
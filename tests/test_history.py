@@ -0,0 +1,227 @@
+"""Test file for the SmartHub history import service."""
+import asyncio
+import tracemalloc
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smarthub.api import Aggregation, SmartHubAPI, SmartHubLocation
+from custom_components.smarthub.const import DOMAIN, ELECTRIC_SERVICE
+from custom_components.smarthub.exceptions import SmartHubConnectionError
+from custom_components.smarthub.history import split_windows
+from custom_components.smarthub.sensor import SmartHubDataUpdateCoordinator
+from custom_components.smarthub.usage import ServiceUsage, UsageSeries, wall_clock_epoch
+
+UTC = ZoneInfo("UTC")
+LOCATION = SmartHubLocation(id="11111", service=ELECTRIC_SERVICE, description="test location", provider="test provider")
+STATISTIC_ID = "smarthub:smarthub_energy_sensor_123456_11111"
+
+
+def test_split_windows() -> None:
+    """Windows cover the range back to back, with boundaries on bucket starts."""
+    tz = ZoneInfo("America/New_York")
+    start = datetime(2024, 1, 1, 7, 30, tzinfo=tz)
+    end = datetime(2024, 3, 15, tzinfo=tz)
+
+    windows = list(split_windows(start, end, Aggregation.HOURLY))
+    assert [len(windows), windows[0][0], windows[-1][1]] == [3, datetime(2024, 1, 1, 7, tzinfo=tz), end]
+    assert all(a[1] == b[0] for a, b in zip(windows, windows[1:]))
+    # Boundaries stay on local midnight across the DST change
+    assert [window[0].hour for window in windows[1:]] == [7, 7]
+
+    windows = list(split_windows(datetime(2015, 6, 20, tzinfo=tz), end, Aggregation.MONTHLY))
+    assert windows[0][0] == datetime(2015, 6, 1, tzinfo=tz)
+    assert all(window[1].day == 1 for window in windows[:-1])
+    assert windows[-1][1] == end
+
+
+def _hourly_api():
+    """An API returning 1 kWh for every hour of the requested window, tracking the requests in flight."""
+    api = AsyncMock(spec=SmartHubAPI)
+    api.timezone = "UTC"
+    api.in_flight = api.max_in_flight = 0
+
+    async def get_energy_data(location, aggregation, start_datetime, end_datetime, cache=True):
+        api.in_flight += 1
+        api.max_in_flight = max(api.max_in_flight, api.in_flight)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        api.in_flight -= 1
+        hours = int((end_datetime - start_datetime).total_seconds() // 3600)
+        usage = UsageSeries(UTC, (wall_clock_epoch(start_datetime + timedelta(hours=hour)) for hour in range(hours)), [1.0] * hours)
+        return {location.service: ServiceUsage(hasHourly=True, hasDaily=True, USAGE=usage)}
+
+    api.get_energy_data.side_effect = get_energy_data
+    return api
+
+
+def _coordinator(hass: HomeAssistant, api) -> SmartHubDataUpdateCoordinator:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"email": "test@example.com", "password": "testpass", "account_id": "123456", "host": "test.smarthub.coop", "timezone": "UTC"},
+    )
+    entry.add_to_hass(hass)
+    return SmartHubDataUpdateCoordinator(hass, api=api, update_interval=timedelta(minutes=60), config_entry=entry)
+
+
+async def _hourly_sums(hass: HomeAssistant) -> list[float]:
+    get_instance(hass)._async_commit(dt_util.utcnow())
+    await hass.async_add_executor_job(get_instance(hass).block_till_done)
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period, hass, dt_util.utc_from_timestamp(0), None, {STATISTIC_ID}, "hour", None, {"sum"},
+    )
+    return [row["sum"] for row in stats[STATISTIC_ID]]
+
+
+async def test_import_range_in_windows(recorder_mock: Recorder, hass: HomeAssistant, hass_storage, freezer) -> None:
+    """A long range is fetched in bounded concurrent windows and imported with a continuous sum."""
+    freezer.move_to("2025-06-01 12:00:00+00:00")
+    api = _hourly_api()
+    coordinator = _coordinator(hass, api)
+    history = coordinator.history
+    progress = []
+    history.async_add_listener(lambda: progress.append(history.progress))
+
+    start, end = datetime(2025, 1, 1, tzinfo=UTC), datetime(2025, 4, 1, tzinfo=UTC)
+    await history.async_import(start, end, [LOCATION], [Aggregation.HOURLY])
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    windows = [(call.kwargs["start_datetime"], call.kwargs["end_datetime"]) for call in api.get_energy_data.call_args_list]
+    assert len(windows) == 3
+    assert all(window_end - window_start <= timedelta(days=30) for window_start, window_end in windows)
+    assert api.max_in_flight == 3
+    assert progress[-1] == 100.0 and history.stats()["windows_done"] == 3
+    assert not history.jobs
+    assert hass_storage[f"smarthub.history.{coordinator.history.config_entry.entry_id}"]["data"]["jobs"] == {}
+
+    sums = await _hourly_sums(hass)
+    hours = int((end - start).total_seconds() // 3600)
+    assert sums == [float(hour) for hour in range(1, hours + 1)]
+
+
+async def test_import_resumes_from_checkpoint(recorder_mock: Recorder, hass: HomeAssistant, hass_storage, freezer) -> None:
+    """An interrupted import continues from its stored checkpoint and sum."""
+    freezer.move_to("2025-06-01 12:00:00+00:00")
+    api = _hourly_api()
+    coordinator = _coordinator(hass, api)
+    hass_storage[f"smarthub.history.{coordinator.history.config_entry.entry_id}"] = {
+        "version": 1,
+        "key": f"smarthub.history.{coordinator.history.config_entry.entry_id}",
+        "data": {"jobs": {STATISTIC_ID: {
+            "location": {"id": "11111", "service": ELECTRIC_SERVICE, "description": "test location", "provider": "test provider"},
+            "aggregation": "HOURLY",
+            "end": "2025-03-03T00:00:00+00:00",
+            "next": "2025-03-01T00:00:00+00:00",
+            "sum": 1000.0,
+            "return_sum": 0.0,
+        }}},
+    }
+
+    await coordinator.history.async_resume()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert api.get_energy_data.call_count == 1
+    assert await _hourly_sums(hass) == [1000.0 + hour for hour in range(1, 49)]
+
+
+async def test_import_stops_on_failed_window(recorder_mock: Recorder, hass: HomeAssistant, hass_storage, freezer) -> None:
+    """A failed window stops the import once the windows fetched ahead of it have stopped too."""
+    freezer.move_to("2025-06-01 12:00:00+00:00")
+    api = AsyncMock(spec=SmartHubAPI)
+    api.timezone = "UTC"
+    api.in_flight = 0
+
+    async def get_energy_data(location, aggregation, start_datetime, end_datetime, cache=True):
+        api.in_flight += 1
+        try:
+            if start_datetime == datetime(2025, 1, 1, tzinfo=UTC):
+                raise SmartHubConnectionError("down")
+            await asyncio.Event().wait()
+        finally:
+            await asyncio.sleep(0)
+            api.in_flight -= 1
+
+    api.get_energy_data.side_effect = get_energy_data
+    coordinator = _coordinator(hass, api)
+    history = coordinator.history
+    in_flight = []
+    history.async_add_listener(lambda: in_flight.append(api.in_flight) if history.current is None else None)
+
+    await history.async_import(datetime(2025, 1, 1, tzinfo=UTC), datetime(2025, 4, 1, tzinfo=UTC), [LOCATION], [Aggregation.HOURLY])
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert api.get_energy_data.call_count == 3
+    assert history.last_error == "down"
+    assert in_flight[-1] == 0
+    assert STATISTIC_ID in history.jobs # resumed by the next call
+
+
+async def _peak_import_memory(hass: HomeAssistant, fake_smarthub, days: int) -> tuple[int, float]:
+    """Import days of 15 minute readings from the fake server, returning the peak memory and the last sum."""
+    api = SmartHubAPI("test@example.com", "testpass", "123456", "UTC", "", "test.smarthub.coop")
+    api.base_url = fake_smarthub.url
+    coordinator = _coordinator(hass, api)
+    last_sum = 0.0
+
+    # A plain function - the statistics are dropped, as the recorder would once written
+    def add(hass, metadata, statistics):
+        nonlocal last_sum
+        if statistics:
+            last_sum = statistics[-1]["sum"]
+
+    start = datetime(2023, 1, 1, tzinfo=UTC)
+    try:
+        with patch("custom_components.smarthub.statistics.async_add_external_statistics", add):
+            tracemalloc.start()
+            try:
+                await coordinator.history.async_import(start, start + timedelta(days=days), [LOCATION], [Aggregation.HOURLY])
+                await hass.async_block_till_done(wait_background_tasks=True)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+    finally:
+        await api.close()
+    return peak, last_sum
+
+
+async def test_import_memory_is_flat(recorder_mock: Recorder, hass: HomeAssistant, hass_storage, fake_smarthub) -> None:
+    """From the response to the recorder, an import holds a few windows at a time however long its range."""
+    fake_smarthub.window_step_minutes = 15
+
+    quarter, quarter_sum = await _peak_import_memory(hass, fake_smarthub, 90)
+    years, years_sum = await _peak_import_memory(hass, fake_smarthub, 730)
+
+    assert (quarter_sum, years_sum) == (90 * 24, 730 * 24)
+    assert years < 1.1 * quarter
+
+
+async def test_import_history_service(hass: HomeAssistant) -> None:
+    """The service starts an import on a loaded entry, and rejects invalid calls."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(DOMAIN, "import_history", {"config_entry_id": "missing", "start": "2024-01-01"}, blocking=True)
+
+    coordinator = _coordinator(hass, AsyncMock(spec=SmartHubAPI, timezone="UTC"))
+    coordinator.location_store.locations = [LOCATION]
+    coordinator.history.async_import = AsyncMock()
+    entry = coordinator.history.config_entry
+    entry.mock_state(hass, entry.state.LOADED)
+    entry.runtime_data = coordinator
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(DOMAIN, "import_history", {"config_entry_id": entry.entry_id, "start": "2024-02-01", "end": "2024-01-01"}, blocking=True)
+    await hass.services.async_call(
+        DOMAIN, "import_history", {"config_entry_id": entry.entry_id, "start": "2024-01-01", "aggregations": ["hourly"]}, blocking=True,
+    )
+    coordinator.history.async_import.assert_awaited_once_with(
+        datetime(2024, 1, 1, tzinfo=UTC), None, [LOCATION], [Aggregation.HOURLY],
+    )
@@ -279,6 +279,7 @@ async def test_async_setup_entry_success(mock_hass, mock_config_entry):
 
         with patch("custom_components.smarthub.SmartHubDataUpdateCoordinator") as mock_coordinator_cls:
              mock_coordinator = mock_coordinator_cls.return_value
+             mock_coordinator.async_restore_snapshot = AsyncMock(return_value=False)
              mock_coordinator.async_config_entry_first_refresh = AsyncMock()
 
              # Configure mock_hass to support await
@@ -301,8 +302,29 @@ async def test_async_setup_entry_connection_failure(mock_hass, mock_config_entry
         mock_api_class.return_value = mock_api
 
         from homeassistant.exceptions import ConfigEntryError
-        with pytest.raises(ConfigEntryError):
-            await async_setup_entry(mock_hass, mock_config_entry)
+        with patch("custom_components.smarthub.SmartHubDataUpdateCoordinator") as mock_coordinator_cls:
+            mock_coordinator_cls.return_value.async_restore_snapshot = AsyncMock(return_value=False)
+            with pytest.raises(ConfigEntryError):
+                await async_setup_entry(mock_hass, mock_config_entry)
+
+
+@pytest.mark.asyncio
+async def test_async_setup_entry_first_refresh_failure(mock_hass, mock_config_entry):
+    """Test setup retry releases the API's shared session when the first refresh fails."""
+    with patch("custom_components.smarthub.SmartHubAPI") as mock_api_class:
+        mock_api = Mock()
+        mock_api.get_token = AsyncMock(return_value="test_token")
+        mock_api.close = AsyncMock()
+        mock_api_class.return_value = mock_api
+
+        from homeassistant.exceptions import ConfigEntryNotReady
+        with patch("custom_components.smarthub.SmartHubDataUpdateCoordinator") as mock_coordinator_cls:
+            mock_coordinator_cls.return_value.async_restore_snapshot = AsyncMock(return_value=False)
+            mock_coordinator_cls.return_value.async_config_entry_first_refresh = AsyncMock(side_effect=ConfigEntryNotReady("down"))
+            with pytest.raises(ConfigEntryNotReady):
+                await async_setup_entry(mock_hass, mock_config_entry)
+
+        mock_api.close.assert_awaited_once()
 
 
 def test_smarthub_api_basic_functionality():
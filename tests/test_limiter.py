@@ -0,0 +1,169 @@
+"""Tests for the adaptive per-host concurrency limiter."""
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from custom_components.smarthub.api import SmartHubAPI, SmartHubLocation, Aggregation
+from custom_components.smarthub.const import ELECTRIC_SERVICE
+from custom_components.smarthub.exceptions import SmartHubAuthenticationError, SmartHubRetryableError, SmartHubTimeoutError
+from custom_components.smarthub.limiter import AdaptiveLimiter
+from custom_components.smarthub.retry import refresh_budget
+
+
+def _api(account_id="123456"):
+    return SmartHubAPI(
+        email="test@example.com",
+        password="testpass",
+        account_id=account_id,
+        timezone="UTC",
+        mfa_totp="",
+        host="test.smarthub.coop",
+    )
+
+
+@pytest.mark.asyncio
+async def test_limits_requests_in_flight():
+    """No more than `limit` requests run at the same time."""
+    limiter = AdaptiveLimiter(initial=3, maximum=3)
+    running = peak = 0
+
+    async def request():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(limiter.async_call(request) for _ in range(12)))
+
+    assert peak == 3
+    assert limiter.stats() == {"limit": 3, "in_flight": 0, "waiting": 0, "increases": 0, "decreases": 0}
+
+
+@pytest.mark.asyncio
+async def test_additive_increase():
+    """Healthy responses grow the limit by about one per round of requests."""
+    limiter = AdaptiveLimiter(initial=2, maximum=10)
+
+    for _ in range(3): # 2 + 1/2 + 1/2.5 + 1/2.9
+        await limiter.async_call(AsyncMock(return_value="ok"))
+    assert int(limiter.limit) == 3
+
+    # PENDING and slow responses don't grow it
+    await limiter.async_call(AsyncMock(return_value=Mock(pending=True)))
+    limiter.latency_target = 0.001
+    await limiter.async_call(lambda: asyncio.sleep(0.01))
+    assert limiter.increases == 3
+
+    limiter.latency_target = 5
+    for _ in range(100):
+        await limiter.async_call(AsyncMock(return_value="ok"))
+    assert limiter.limit == 10
+
+
+@pytest.mark.asyncio
+async def test_multiplicative_decrease():
+    """Overload responses halve the limit once per round, other errors leave it."""
+    limiter = AdaptiveLimiter(initial=8, maximum=8)
+    started = asyncio.Event()
+
+    async def overloaded():
+        started.set()
+        await asyncio.sleep(0.01)
+        raise SmartHubRetryableError("slow down", 429)
+
+    results = await asyncio.gather(*(limiter.async_call(overloaded) for _ in range(8)), return_exceptions=True)
+    assert all(isinstance(result, SmartHubRetryableError) for result in results)
+    assert limiter.limit == 4 # the 8 failed requests were one round
+
+    with pytest.raises(asyncio.TimeoutError):
+        await limiter.async_call(AsyncMock(side_effect=asyncio.TimeoutError()))
+    assert limiter.limit == 2
+
+    with pytest.raises(SmartHubAuthenticationError):
+        await limiter.async_call(AsyncMock(side_effect=SmartHubAuthenticationError()))
+    assert limiter.limit == 2
+
+    for _ in range(3):
+        with pytest.raises(asyncio.TimeoutError):
+            await limiter.async_call(AsyncMock(side_effect=asyncio.TimeoutError()))
+    assert limiter.limit == limiter.minimum
+
+
+@pytest.mark.asyncio
+async def test_nested_requests_share_the_slot():
+    """A request made while holding a slot (a re-login) doesn't wait for another one."""
+    limiter = AdaptiveLimiter(initial=1, maximum=1)
+
+    async def outer():
+        return await limiter.async_call(AsyncMock(return_value="inner"))
+
+    assert await asyncio.wait_for(limiter.async_call(outer), 1) == "inner"
+
+
+@pytest.mark.asyncio
+async def test_slot_wait_bounded_by_refresh_deadline():
+    """A request waiting for a slot gives up at the refresh deadline."""
+    limiter = AdaptiveLimiter(initial=1, maximum=1)
+    release = asyncio.Event()
+
+    async def held():
+        await release.wait()
+
+    holder = asyncio.ensure_future(limiter.async_call(held))
+    await asyncio.sleep(0)
+    with refresh_budget(deadline=0.05), pytest.raises(SmartHubTimeoutError):
+        await limiter.async_call(AsyncMock())
+    assert limiter.stats()["waiting"] == 0
+
+    release.set()
+    await holder
+    assert await limiter.async_call(AsyncMock(return_value="ok")) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_relogin_while_slots_are_full(fake_smarthub):
+    """A login needed while another request holds the only slot doesn't deadlock."""
+    fake_smarthub.latency = 0.05
+    api = _api()
+    api.base_url = fake_smarthub.url
+    location = SmartHubLocation(id="1", service=ELECTRIC_SERVICE, description="", provider="")
+
+    try:
+        await api.get_token()
+        api.limiter.limit = 1
+        fake_smarthub.revoke_tokens()
+        # The poll holds the slot and will need a re-login, while the location request finds no token
+        poll = asyncio.ensure_future(api.get_energy_data(location=location, aggregation=Aggregation.HOURLY))
+        await asyncio.sleep(0.01)
+        api.token_cache.invalidate()
+        await asyncio.wait_for(asyncio.gather(poll, api.get_service_locations()), 2)
+    finally:
+        await api.close()
+
+    assert fake_smarthub.logins == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_shared_per_host(fake_smarthub):
+    """Every account on a host shares its limiter, and the limit adapts to the host's responses."""
+    api_a, api_b = _api("1"), _api("2")
+    api_a.base_url = api_b.base_url = fake_smarthub.url
+    api_a.retry_policy.base_delay = api_b.retry_policy.base_delay = 0
+    location = SmartHubLocation(id="1", service=ELECTRIC_SERVICE, description="", provider="")
+
+    try:
+        assert api_a.limiter is api_b.limiter
+        initial = api_a.limiter.limit
+        await api_a.get_energy_data(location=location, aggregation=Aggregation.HOURLY)
+        await api_b.get_energy_data(location=location, aggregation=Aggregation.HOURLY)
+        assert api_a.limiter.limit > initial
+
+        fake_smarthub.failures = [(429, {"Retry-After": "0"})]
+        await api_b.get_energy_data(location=location, aggregation=Aggregation.DAILY)
+        assert api_a.limiter.limit < initial
+        assert api_a.get_metrics()["limiter"]["decreases"] == 1
+    finally:
+        await api_a.close()
+        await api_b.close()
@@ -1,8 +1,24 @@
 """Test file for basic SmartHub Location functionality."""
 import pytest
+from unittest.mock import AsyncMock, patch
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 from custom_components.smarthub import async_setup_entry
 from custom_components.smarthub.api import SmartHubAPI, SmartHubLocation
-from custom_components.smarthub.const import ELECTRIC_SERVICE, GAS_SERVICE, WATER_SERVICE
+from custom_components.smarthub.const import (
+    DOMAIN,
+    ELECTRIC_SERVICE,
+    ENERGY_SENSOR_KEY,
+    GAS_SERVICE,
+    LOCATION_KEY,
+    LOCATION_REFRESH_INTERVAL,
+    WATER_SERVICE,
+)
+from custom_components.smarthub.exceptions import SmartHubConnectionError
+from custom_components.smarthub.locations import LocationStore, location_hash
+from custom_components.smarthub.sensor import SmartHubDataUpdateCoordinator
 
 @pytest.fixture
 def api_instance():
@@ -272,3 +288,110 @@ def compare_SmartHubLocation(a: SmartHubLocation, b: SmartHubLocation):
     assert a.service == b.service
     assert a.description == b.description
     assert a.provider == b.provider
+
+
+def _location(id, service=ELECTRIC_SERVICE):
+    return SmartHubLocation(id=id, service=service, description=f"Location {id}", provider="Test Provider")
+
+
+def _store_api(*locations):
+    api = AsyncMock(spec=SmartHubAPI)
+    api.get_service_locations.return_value = list(locations)
+    return api
+
+
+async def test_location_store_refresh_schedule(hass: HomeAssistant, freezer) -> None:
+    """Stored locations are reused until the refresh interval passes."""
+    api = _store_api(_location("1"), _location("2"))
+    store = LocationStore(hass, "entry", api)
+
+    assert await store.async_get_locations() == [_location("1"), _location("2")]
+    first_hash = store.hash
+    assert await store.async_get_locations() == [_location("1"), _location("2")]
+    assert api.get_service_locations.call_count == 1
+
+    freezer.tick(LOCATION_REFRESH_INTERVAL)
+    api.get_service_locations.return_value = [_location("2"), _location("1")]
+    await store.async_get_locations()
+    assert api.get_service_locations.call_count == 2
+    assert store.hash == first_hash # order doesn't matter
+
+    api.get_service_locations.return_value = [_location("1")]
+    store.invalidate()
+    assert await store.async_get_locations() == [_location("1")]
+    assert store.hash != first_hash
+    # Only an invalidated list skips the API's response cache
+    assert [call.kwargs["refresh"] for call in api.get_service_locations.call_args_list] == [False, False, True]
+
+
+async def test_location_store_persisted(hass: HomeAssistant, hass_storage) -> None:
+    """Locations are loaded from storage without refetching them."""
+    await LocationStore(hass, "entry", _store_api(_location("1"), _location("2", GAS_SERVICE))).async_get_locations()
+    assert hass_storage["smarthub.locations.entry"]["data"]["hash"] == location_hash([_location("1"), _location("2", GAS_SERVICE)])
+
+    api = _store_api()
+    store = LocationStore(hass, "entry", api)
+    assert await store.async_get_locations() == [_location("1"), _location("2", GAS_SERVICE)]
+    assert api.get_service_locations.call_count == 0
+
+
+async def test_location_store_error_fallback(hass: HomeAssistant) -> None:
+    """A failed refresh falls back to the stored locations, and is retried on the next call."""
+    api = _store_api(_location("1"))
+    store = LocationStore(hass, "entry", api)
+    await store.async_get_locations()
+
+    store.invalidate()
+    api.get_service_locations.side_effect = SmartHubConnectionError("down")
+    assert await store.async_get_locations() == [_location("1")]
+
+    api.get_service_locations.side_effect = None
+    api.get_service_locations.return_value = [_location("2")]
+    assert await store.async_get_locations() == [_location("2")]
+    assert api.get_service_locations.call_count == 3
+
+    with pytest.raises(SmartHubConnectionError):
+        api.get_service_locations.side_effect = SmartHubConnectionError("down")
+        await LocationStore(hass, "other", api).async_get_locations()
+
+
+async def test_entities_follow_location_changes(hass: HomeAssistant) -> None:
+    """Entities are added and removed as locations change, without reloading the entry."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "email": "test@example.com",
+            "password": "testpass",
+            "account_id": "123456",
+            "host": "test.smarthub.coop",
+            "poll_interval": 60,
+            "timezone": "UTC",
+            "mfa_totp": "",
+        },
+        unique_id="test@example.com_test.smarthub.coop_123456",
+    )
+    entry.add_to_hass(hass)
+    api = _store_api(_location("1"), _location("2"))
+
+    async def update_location(self, location):
+        return {ENERGY_SENSOR_KEY: 1.0, LOCATION_KEY: location}
+
+    with patch("custom_components.smarthub.SmartHubAPI", return_value=api), \
+         patch.object(SmartHubDataUpdateCoordinator, "_async_update_location", update_location):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        registry = er.async_get(hass)
+        def unique_ids():
+            return sorted(e.unique_id for e in er.async_entries_for_config_entry(registry, entry.entry_id) if e.unique_id.endswith("_energy"))
+        assert unique_ids() == [f"{entry.unique_id}_1_energy", f"{entry.unique_id}_2_energy"]
+
+        coordinator = entry.runtime_data
+        api.get_service_locations.return_value = [_location("2"), _location("3")]
+        coordinator.location_store.invalidate()
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+        assert unique_ids() == [f"{entry.unique_id}_2_energy", f"{entry.unique_id}_3_energy"]
+        assert entry.state is ConfigEntryState.LOADED
+        assert api.get_service_locations.call_count == 2
@@ -0,0 +1,179 @@
+"""Tests for the usage response and series parsers."""
+import logging
+import random
+from datetime import timezone
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.smarthub.api import SmartHubAPI, ParseType, Aggregation
+from custom_components.smarthub.const import ELECTRIC_SERVICE, GAS_SERVICE, WATER_SERVICE, METER_NAME
+from custom_components.smarthub.exceptions import SmartHubDataError
+from custom_components.smarthub.utils import parse_epoch_set_timezone
+
+
+def reference_parse_usage_series(tz_name, usage_data, parseType=ParseType.FORWARD):
+    """The original per-point implementation of SmartHubAPI.parse_usage_series."""
+    parsed_data = []
+    for usage in usage_data:
+        event_time = parse_epoch_set_timezone(usage.get("x") / 1000.0, ZoneInfo(tz_name))
+        if event_time.minute != 0 and len(parsed_data) == 0:
+          zero_time = event_time.replace(minute=0)
+          parsed_data.append({
+            "reading_time" : zero_time,
+            "consumption" : 0,
+            "raw_timestamp": int(zero_time.replace(tzinfo=timezone.utc).timestamp()*1000),
+          })
+
+        if len(parsed_data) > 0 and parsed_data[-1]["reading_time"].hour != event_time.hour and event_time.minute != 0:
+          zero_time = event_time.replace(minute=0)
+          parsed_data.append({
+            "reading_time" : zero_time,
+            "consumption" : 0,
+            "raw_timestamp": int(zero_time.replace(tzinfo=timezone.utc).timestamp()*1000),
+          })
+
+        usage_energy = usage.get("y")
+        if parseType == ParseType.NET:
+          if usage_energy > 0:
+            usage_energy = 0
+          else:
+            usage_energy = abs(usage_energy)
+        else:
+          usage_energy = max(0,usage_energy)
+
+        if event_time.minute != 0:
+          parsed_data[-1]['consumption'] += usage_energy
+          continue
+
+        parsed_data.append({
+          "reading_time" : event_time,
+          "consumption" : usage_energy,
+          "raw_timestamp": usage.get("x"),
+        })
+
+    return parsed_data
+
+
+def _series(seed, step_minutes, points, offset_minutes=0, gaps=False):
+    rng = random.Random(seed)
+    start = 1741392000000 + offset_minutes * 60000 # 2025-03-08T00:00 wall clock, the day before US spring-forward
+    data = []
+    timestamp = start
+    for _ in range(points):
+        data.append({"x": timestamp, "y": round(rng.uniform(-2, 5), 3)})
+        timestamp += step_minutes * 60000
+        if gaps and rng.random() < 0.05:
+            timestamp += rng.choice([15, 45, 60, 180]) * 60000
+    return data
+
+
+SERIES = {
+    "hourly": _series(1, 60, 2000),
+    "fifteen_min": _series(2, 15, 8640),
+    "fifteen_min_offset_start": _series(3, 15, 500, offset_minutes=30),
+    "fifteen_min_gaps": _series(4, 15, 2000, gaps=True),
+    "hourly_offset": _series(5, 60, 500, offset_minutes=15),
+    "daily": _series(6, 24 * 60, 400),
+    "empty": [],
+    "integers": [{"x": 1762215300000, "y": 1}, {"x": 1762216200000, "y": -10}, {"x": 1762218000000, "y": 100}],
+}
+
+
+def _exists(reading_time):
+    """Return True if a wall-clock time isn't skipped by a DST change."""
+    return reading_time.astimezone(timezone.utc).astimezone(reading_time.tzinfo) == reading_time
+
+
+@pytest.mark.parametrize("tz_name", ["UTC", "America/New_York", "Australia/Lord_Howe"])
+@pytest.mark.parametrize("name", SERIES)
+def test_parse_usage_channels_matches_reference(name, tz_name):
+    """Every channel of the batch parser matches the original implementation."""
+    api = SmartHubAPI(
+        email="test@example.com",
+        password="testpass",
+        account_id="123456",
+        timezone=tz_name,
+        mfa_totp="",
+        host="test.smarthub.coop",
+    )
+    usage_data = SERIES[name]
+
+    channels = api.parse_usage_channels(usage_data, (ParseType.FORWARD, ParseType.NET, ParseType.RETURN))
+
+    for parseType in (ParseType.FORWARD, ParseType.NET, ParseType.RETURN):
+        expected = reference_parse_usage_series(tz_name, usage_data, parseType)
+        actual = channels[parseType]
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            # Wall-clock times skipped by DST are moved to the transition - the same instant
+            assert a["reading_time"].timestamp() == e["reading_time"].timestamp()
+            if _exists(e["reading_time"]):
+                assert a["reading_time"].isoformat() == e["reading_time"].isoformat()
+            assert a["consumption"] == e["consumption"]
+            assert a["raw_timestamp"] == e["raw_timestamp"]
+        assert api.parse_usage_series(usage_data, parseType) == actual
+
+
+def _response(**services):
+    return {"status": "COMPLETE", "data": {"hasHourly": True, **services}}
+
+
+def _usage_entry(name, data, flow_direction=ParseType.FORWARD):
+    return {
+        "type": "USAGE",
+        "meters": [{"seriesId": name, "flowDirection": flow_direction}],
+        "series": [{"name": name, "data": data}],
+    }
+
+
+def test_parse_usage_only_requested_service(caplog):
+    """Only the requested service is parsed, and no payload is dumped for it."""
+    api = SmartHubAPI("test@example.com", "testpass", "123456", "UTC", "", "test.smarthub.coop")
+    data = _response(ELECTRIC=[_usage_entry("E1", SERIES["integers"])], GAS=[_usage_entry("G1", SERIES["hourly"])])
+
+    with caplog.at_level(logging.DEBUG):
+        result = api.parse_usage(data, Aggregation.HOURLY, ELECTRIC_SERVICE)
+
+    assert list(result) == [ELECTRIC_SERVICE]
+    assert result[ELECTRIC_SERVICE][METER_NAME] == "E1"
+    assert len(result[ELECTRIC_SERVICE]["USAGE"]) == 2
+    assert "No GAS data" not in caplog.text
+    assert "No WATER data" not in caplog.text
+
+
+def test_parse_usage_missing_requested_service(caplog):
+    """A missing requested service is reported without dumping the payload."""
+    api = SmartHubAPI("test@example.com", "testpass", "123456", "UTC", "", "test.smarthub.coop")
+
+    with caplog.at_level(logging.DEBUG):
+        result = api.parse_usage(_response(ELECTRIC=[_usage_entry("E1", SERIES["hourly"])]), Aggregation.HOURLY, WATER_SERVICE)
+
+    assert "USAGE" not in result[WATER_SERVICE]
+    assert "No WATER data found in response for HOURLY" in caplog.text
+    assert "E1" not in caplog.text
+
+
+def test_parse_usage_series_are_lazy():
+    """Series are parsed on first access, and a NET series is parsed once for both channels."""
+    api = SmartHubAPI("test@example.com", "testpass", "123456", "UTC", "", "test.smarthub.coop")
+    data = _response(ELECTRIC=[_usage_entry("N1", SERIES["integers"], ParseType.NET)])
+
+    with patch.object(api, "parse_usage_channels", wraps=api.parse_usage_channels) as parse_channels:
+        result = api.parse_usage(data, Aggregation.HOURLY, ELECTRIC_SERVICE)
+        assert parse_channels.call_count == 0
+        assert "USAGE_RETURN" in result[ELECTRIC_SERVICE]
+
+        assert result[ELECTRIC_SERVICE]["USAGE"][0]["consumption"] == 1
+        assert result[ELECTRIC_SERVICE]["USAGE_RETURN"][0]["consumption"] == 10
+        assert parse_channels.call_count == 1
+
+
+def test_parse_usage_lazy_errors():
+    """Errors in a deferred series are still reported as SmartHubDataError."""
+    api = SmartHubAPI("test@example.com", "testpass", "123456", "UTC", "", "test.smarthub.coop")
+    result = api.parse_usage(_response(GAS=[_usage_entry("G1", [{"x": "bad", "y": 1}])]), Aggregation.HOURLY, GAS_SERVICE)
+
+    with pytest.raises(SmartHubDataError):
+        result[GAS_SERVICE]["USAGE"]
@@ -0,0 +1,122 @@
+"""Tests for the tiered planning of first-time statistics imports."""
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.smarthub.api import SmartHubAPI, SmartHubLocation, Aggregation
+from custom_components.smarthub.const import ELECTRIC_SERVICE
+from custom_components.smarthub.planner import (
+    BYTES_PER_READING,
+    READINGS_PER_HOUR,
+    PlannedRequest,
+    TieredFetcher,
+    plan_backfill,
+)
+from custom_components.smarthub.usage import UsageSeries
+
+TZ = ZoneInfo("America/New_York")
+NOW = datetime(2026, 3, 15, 10, 30, tzinfo=TZ)
+LOCATION = SmartHubLocation(id="1", service=ELECTRIC_SERVICE, description="", provider="")
+
+
+def test_plan_tiers():
+    """Tiers run back to back from the current hour, on day and month boundaries."""
+    plan = plan_backfill(NOW, list(Aggregation), hourly_days=30, daily_days=90, monthly_days=365)
+
+    assert plan.requests == (
+        PlannedRequest(Aggregation.MONTHLY, datetime(2025, 3, 1, tzinfo=TZ), datetime(2025, 12, 1, tzinfo=TZ)),
+        PlannedRequest(Aggregation.DAILY, datetime(2025, 12, 1, tzinfo=TZ), datetime(2026, 2, 13, tzinfo=TZ)),
+        PlannedRequest(Aggregation.HOURLY, datetime(2026, 2, 13, tzinfo=TZ), datetime(2026, 3, 15, 10, tzinfo=TZ)),
+    )
+
+
+def test_plan_skips_empty_and_finer_tiers():
+    """Tiers finer than the statistics need, or with no days of their own, aren't requested."""
+    plan = plan_backfill(NOW, [Aggregation.DAILY, Aggregation.MONTHLY], hourly_days=30, daily_days=90, monthly_days=365)
+    assert [request.aggregation for request in plan.requests] == [Aggregation.MONTHLY, Aggregation.DAILY]
+    assert plan.requests[-1].end == datetime(2026, 3, 15, 10, tzinfo=TZ)
+
+    plan = plan_backfill(NOW, list(Aggregation), hourly_days=30, daily_days=0, monthly_days=0)
+    assert [request.aggregation for request in plan.requests] == [Aggregation.HOURLY]
+
+
+def test_plan_estimates():
+    """The estimate counts the readings each tier can return."""
+    plan = plan_backfill(NOW, list(Aggregation), hourly_days=30, daily_days=90, monthly_days=365)
+    monthly, daily, hourly = plan.requests
+
+    assert monthly.estimated_readings == 10
+    assert daily.estimated_readings == 74
+    assert hourly.estimated_readings == ((hourly.end - hourly.start) // timedelta(hours=1)) * READINGS_PER_HOUR
+    assert plan.estimated_bytes == (10 + 74 + hourly.estimated_readings) * BYTES_PER_READING
+    # Far less than a year of hourly readings
+    assert plan.estimated_readings < 365 * 24 * READINGS_PER_HOUR / 10
+
+
+def _series(step: timedelta, start: datetime, end: datetime, consumption: float) -> UsageSeries:
+    readings = []
+    while start < end:
+        readings.append((start, consumption))
+        start = (start + step) if step < timedelta(days=28) else Aggregation.MONTHLY.bucket_start(start + timedelta(days=31))
+    return UsageSeries.from_readings(TZ, readings)
+
+
+def _api(has_hourly: bool = True):
+    """An API returning 1 per reading of the requested resolution - also outside the requested window."""
+    api = MagicMock(spec=SmartHubAPI)
+    api.timezone = "America/New_York"
+    steps = {Aggregation.HOURLY: timedelta(hours=1), Aggregation.DAILY: timedelta(days=1), Aggregation.MONTHLY: timedelta(days=31)}
+
+    async def get_energy_data(location, aggregation, start_datetime, end_datetime):
+        if aggregation == Aggregation.HOURLY and not has_hourly:
+            return {ELECTRIC_SERVICE: {"hasHourly": False, "USAGE": UsageSeries(TZ)}}
+        usage = _series(steps[aggregation], start_datetime - timedelta(days=2), end_datetime, 1.0)
+        return {ELECTRIC_SERVICE: {"hasHourly": aggregation == Aggregation.HOURLY, "hasDaily": True, "USAGE": usage}}
+
+    api.get_energy_data = AsyncMock(side_effect=get_energy_data)
+    return api
+
+
+@pytest.mark.asyncio
+async def test_fetcher_combines_tiers():
+    """Each statistic gets its own tier, followed by the finer tiers rolled up."""
+    api = _api()
+    plan = plan_backfill(NOW, list(Aggregation), hourly_days=2, daily_days=10, monthly_days=90)
+    fetcher = TieredFetcher(api, LOCATION, plan)
+
+    hourly = (await fetcher.async_get(Aggregation.HOURLY, NOW))[ELECTRIC_SERVICE]
+    daily = (await fetcher.async_get(Aggregation.DAILY, NOW))[ELECTRIC_SERVICE]
+    monthly = (await fetcher.async_get(Aggregation.MONTHLY, NOW))[ELECTRIC_SERVICE]
+
+    assert api.get_energy_data.call_count == 3
+    assert hourly["hasHourly"] and hourly["hasDaily"]
+    # Readings outside a tier's window are dropped
+    assert hourly["USAGE"][0]["reading_time"] == datetime(2026, 3, 13, tzinfo=TZ)
+    assert sum(hourly["USAGE"].values) == 58
+    # The DAILY tier from March 1st, then two days rolled up from the hourly readings
+    assert daily["USAGE"][0]["reading_time"] == datetime(2026, 3, 1, tzinfo=TZ)
+    assert list(daily["USAGE"].values[-3:]) == [24.0, 24.0, 10.0]
+    assert sum(daily["USAGE"].values) == 12 + 58
+    # Three MONTHLY readings, then the days of March rolled up
+    assert [reading["reading_time"].month for reading in monthly["USAGE"]] == [12, 1, 2, 3]
+    assert list(monthly["USAGE"].values) == [1.0, 1.0, 1.0, 70.0]
+
+
+@pytest.mark.asyncio
+async def test_fetcher_falls_back_without_hourly():
+    """DAILY data is requested for the HOURLY window when there is no hourly data."""
+    api = _api(has_hourly=False)
+    plan = plan_backfill(NOW, list(Aggregation), hourly_days=2, daily_days=10, monthly_days=0)
+    fetcher = TieredFetcher(api, LOCATION, plan)
+
+    hourly = (await fetcher.async_get(Aggregation.HOURLY, NOW))[ELECTRIC_SERVICE]
+    daily = (await fetcher.async_get(Aggregation.DAILY, NOW))[ELECTRIC_SERVICE]
+
+    assert [call.kwargs["aggregation"] for call in api.get_energy_data.call_args_list] == [
+        Aggregation.DAILY, Aggregation.HOURLY, Aggregation.DAILY,
+    ]
+    assert not hourly["hasHourly"] and "USAGE" not in hourly
+    assert daily["USAGE"][0]["reading_time"] == datetime(2026, 3, 1, tzinfo=TZ)
+    assert sum(daily["USAGE"].values) == 15
@@ -0,0 +1,156 @@
+"""Tests for the PENDING poll scheduler."""
+import asyncio
+import time
+
+import pytest
+
+from custom_components.smarthub.api import SmartHubAPI, SmartHubLocation, Aggregation
+from custom_components.smarthub.const import ELECTRIC_SERVICE, GAS_SERVICE
+from custom_components.smarthub.poll import PollScheduler
+from custom_components.smarthub.responses import PollResponse
+from custom_components.smarthub.retry import current_budget, refresh_budget
+
+
+def _job(ready_after: int, calls: list):
+    """Return a poll callable that is PENDING until its `ready_after`-th call."""
+    count = 0
+
+    async def poll():
+        nonlocal count
+        count += 1
+        calls.append(ready_after)
+        return PollResponse(status="COMPLETE" if count >= ready_after else "PENDING", services={"job": ready_after})
+
+    return poll
+
+
+@pytest.mark.asyncio
+async def test_scheduler_resolves_in_completion_order():
+    """Every pending job is re-polled each round and resolved as soon as it completes."""
+    scheduler = PollScheduler(delay=0.01, max_delay=0.05)
+    calls = []
+    finished = []
+
+    async def wait(ready_after):
+        result = await scheduler.async_wait(_job(ready_after, calls))
+        finished.append(result.services["job"])
+
+    await asyncio.gather(wait(4), wait(2), wait(3))
+
+    assert finished == [2, 3, 4]
+    # each job is polled until it completes - no job waits for another
+    assert calls.count(2) == 2
+    assert calls.count(3) == 3
+    assert calls.count(4) == 4
+    assert scheduler.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_gives_up_after_max_attempts():
+    """A job still PENDING after max_attempts resolves to None."""
+    scheduler = PollScheduler(delay=0.01, max_attempts=3)
+    calls = []
+
+    assert await scheduler.async_wait(_job(10, calls)) is None
+    assert len(calls) == 2 # the initial poll counts as the first attempt
+
+
+@pytest.mark.asyncio
+async def test_scheduler_propagates_errors():
+    """An error while re-polling is raised to that job's caller only."""
+    scheduler = PollScheduler(delay=0.01)
+    calls = []
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    ok, failed = await asyncio.gather(
+        scheduler.async_wait(_job(2, calls)),
+        scheduler.async_wait(failing),
+        return_exceptions=True,
+    )
+    assert ok.status == "COMPLETE"
+    assert isinstance(failed, RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_adaptive_delay():
+    """The shared delay backs off while nothing completes and recovers after."""
+    scheduler = PollScheduler(delay=0.01, max_delay=0.1)
+    calls = []
+    delays = []
+    job = _job(4, calls)
+
+    async def poll():
+        delays.append(scheduler.delay)
+        return await job()
+
+    await asyncio.gather(scheduler.async_wait(_job(3, calls)), scheduler.async_wait(poll))
+    await scheduler._task # the round finishes after resolving its jobs
+
+    # two idle rounds, then halved when the first job completed
+    assert delays == pytest.approx([0.01, 0.015, 0.0225, 0.01125])
+
+
+@pytest.mark.asyncio
+async def test_scheduler_resets_delay_when_idle():
+    """A request after the queue drained doesn't wait out the backoff of earlier ones."""
+    scheduler = PollScheduler(delay=0.01, max_delay=0.1)
+    calls = []
+
+    assert await scheduler.async_wait(_job(10, calls)) is None
+    await scheduler._task
+    assert scheduler.delay == pytest.approx(0.01)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_outside_refresh_budget():
+    """Re-polls shared by several requests don't run under the budget of the first one."""
+    scheduler = PollScheduler(delay=0.01)
+    budgets = []
+    job = _job(1, [])
+
+    async def poll():
+        budgets.append(current_budget())
+        return await job()
+
+    with refresh_budget():
+        await scheduler.async_wait(poll)
+    assert budgets == [None]
+
+
+@pytest.mark.asyncio
+async def test_pending_polls_share_rounds(fake_smarthub):
+    """A batch of PENDING polls is bounded by one job's wait, not the sum of all."""
+    fake_smarthub.pending_polls = 2
+    api = SmartHubAPI(
+        email="test@example.com",
+        password="testpass",
+        account_id="123456",
+        timezone="UTC",
+        mfa_totp="",
+        host="test.smarthub.coop",
+    )
+    api.base_url = fake_smarthub.url
+    api.poll_scheduler = PollScheduler(delay=0.05, max_delay=0.05)
+
+    requests = [
+        (SmartHubLocation(id=str(i), service=service, description="", provider=""), aggregation)
+        for i in range(4)
+        for service in (ELECTRIC_SERVICE, GAS_SERVICE)
+        for aggregation in (Aggregation.HOURLY, Aggregation.DAILY)
+    ]
+
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(api.get_energy_data(location=location, aggregation=aggregation) for location, aggregation in requests)
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        await api.close()
+
+    assert all(result is not None for result in results)
+    assert fake_smarthub.requests == 3 * len(requests)
+    # 16 jobs, each PENDING twice - two shared rounds rather than 32 individual waits
+    assert elapsed < 0.5
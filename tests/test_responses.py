@@ -0,0 +1,56 @@
+"""Tests for the typed poll response structures."""
+import pytest
+
+from custom_components.smarthub.const import ELECTRIC_SERVICE, GAS_SERVICE
+from custom_components.smarthub.responses import Meter, PollResponse
+
+RESPONSE = {
+    "status": "COMPLETE",
+    "data": {
+        "hasHourly": True,
+        "ELECTRIC": [
+            {
+                "type": "USAGE",
+                "hasDaily": True,
+                "meters": [{"seriesId": "E1"}, {"seriesId": "E2", "flowDirection": "RETURN"}],
+                "series": [
+                    {"name": "E1", "data": [{"x": 0, "y": 1}, {"x": 3600000, "y": 2}]},
+                    {"name": "E2", "data": [{"x": 0, "y": 3}]},
+                ],
+            }
+        ],
+        "GAS": [{"type": "USAGE", "series": [{"name": "G1", "data": [{"x": 0, "y": 1}]}]}],
+    },
+}
+
+
+def test_poll_response_from_json():
+    """Only the requested services are converted into typed entries."""
+    response = PollResponse.from_json(RESPONSE, [ELECTRIC_SERVICE])
+
+    assert response.status == "COMPLETE"
+    assert not response.pending
+    assert response.has_hourly and not response.has_daily
+    assert list(response.services) == [ELECTRIC_SERVICE]
+
+    entry = response.services[ELECTRIC_SERVICE][0]
+    assert entry.type == "USAGE"
+    assert entry.has_daily
+    assert entry.meters == [Meter("E1", "FORWARD"), Meter("E2", "RETURN")]
+    assert [series.name for series in entry.series] == ["E1", "E2"]
+    assert response.usage_points(ELECTRIC_SERVICE) == 3
+    assert response.usage_points(GAS_SERVICE) == 0
+
+
+def test_poll_response_pending():
+    """A PENDING response carries no data."""
+    response = PollResponse.from_json({"status": "PENDING"}, [ELECTRIC_SERVICE])
+
+    assert response.pending
+    assert response.services == {}
+
+
+def test_meter_requires_series_id():
+    """Meters without a series id are rejected."""
+    with pytest.raises(KeyError):
+        Meter.from_json({"flowDirection": "NET"})
@@ -0,0 +1,135 @@
+"""Tests for the retry policy."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiohttp import ClientConnectionError
+
+from custom_components.smarthub.exceptions import (
+    SmartHubAuthenticationError,
+    SmartHubConnectionError,
+    SmartHubRetryableError,
+    SmartHubTimeoutError,
+)
+from custom_components.smarthub.retry import RetryPolicy, parse_retry_after, refresh_budget
+
+
+def _failing(*errors, result="ok"):
+    """A request raising each of errors in turn, then returning result."""
+    return AsyncMock(side_effect=[*errors, result])
+
+
+def test_parse_retry_after():
+    """Retry-After is read as seconds or as an HTTP date."""
+    assert parse_retry_after("12") == 12
+    assert parse_retry_after("-3") == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 28 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+def test_backoff_is_capped_and_jittered():
+    """The backoff doubles up to max_delay, randomizing its upper half."""
+    policy = RetryPolicy(base_delay=1, max_delay=10)
+
+    for attempt, delay in ((1, 1), (2, 2), (3, 4), (4, 8), (5, 10), (9, 10)):
+        delays = {policy.backoff(attempt) for _ in range(20)}
+        assert all(delay / 2 <= d <= delay for d in delays)
+        assert len(delays) > 1
+
+
+@pytest.mark.asyncio
+async def test_retries_connection_errors():
+    """Connection errors and timeouts are retried until the request succeeds."""
+    policy = RetryPolicy(base_delay=1)
+    request = _failing(ClientConnectionError("reset"), asyncio.TimeoutError())
+
+    with patch("asyncio.sleep") as sleep:
+        assert await policy.async_call(request, "test request") == "ok"
+
+    assert request.await_count == 3
+    assert sleep.await_count == 2
+    assert policy.stats()["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts():
+    """The last error is raised once every attempt failed - timeouts as SmartHubTimeoutError."""
+    policy = RetryPolicy(base_delay=0, max_attempts=3)
+    request = AsyncMock(side_effect=asyncio.TimeoutError())
+
+    with pytest.raises(SmartHubTimeoutError):
+        await policy.async_call(request, "test request")
+
+    assert request.await_count == 3
+    assert policy.stats()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_other_errors_not_retried():
+    """Authentication and other errors fail the request straight away."""
+    policy = RetryPolicy(base_delay=0)
+    request = AsyncMock(side_effect=SmartHubAuthenticationError("Invalid credentials"))
+
+    with pytest.raises(SmartHubAuthenticationError):
+        await policy.async_call(request, "test request")
+
+    assert request.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honoured():
+    """A Retry-After delay replaces the backoff, unless it is longer than max_delay."""
+    policy = RetryPolicy(base_delay=1, max_delay=60)
+    request = _failing(SmartHubRetryableError("busy", 503, retry_after=7))
+
+    with patch("asyncio.sleep") as sleep:
+        assert await policy.async_call(request, "test request") == "ok"
+    sleep.assert_awaited_once_with(7)
+
+    request = _failing(SmartHubRetryableError("slow down", 429, retry_after=3600))
+    with pytest.raises(SmartHubConnectionError) as error:
+        await policy.async_call(request, "test request")
+    assert not isinstance(error.value, SmartHubRetryableError) # not retried again by an enclosing request
+    assert request.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_budget_limits_retries():
+    """Requests of a refresh share its retries, across tasks."""
+    policy = RetryPolicy(base_delay=0, max_attempts=10)
+
+    async def _call():
+        return await policy.async_call(AsyncMock(side_effect=ClientConnectionError("reset")), "test request")
+
+    with refresh_budget(retries=4) as budget:
+        results = await asyncio.gather(_call(), _call(), return_exceptions=True)
+
+    assert all(isinstance(result, SmartHubConnectionError) for result in results)
+    assert budget.retries == 0
+    assert policy.stats()["retries"] == 4
+
+
+@pytest.mark.asyncio
+async def test_refresh_deadline(freezer):
+    """Request timeouts are capped by the refresh deadline, and no retry waits past it."""
+    policy = RetryPolicy(base_delay=10)
+
+    with refresh_budget(deadline=30):
+        assert policy.timeout(60) == 30
+
+        request = _failing(ClientConnectionError("reset"), ClientConnectionError("reset"))
+        with patch("asyncio.sleep") as sleep:
+            freezer.tick(25)
+            with pytest.raises(SmartHubConnectionError):
+                await policy.async_call(request, "test request")
+        sleep.assert_not_awaited()
+
+        freezer.tick(10)
+        with pytest.raises(SmartHubTimeoutError):
+            policy.timeout(60)
+
+    assert policy.timeout(60) == 60
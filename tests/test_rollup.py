@@ -0,0 +1,196 @@
+"""Tests for local DAILY/MONTHLY rollups of HOURLY usage."""
+import asyncio
+import logging
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.smarthub.api import SmartHubAPI, SmartHubLocation, Aggregation
+from custom_components.smarthub.const import ELECTRIC_SERVICE
+from custom_components.smarthub.rollup import (
+    RollupFetcher,
+    compare_usage,
+    rollup_energy_data,
+    rollup_usage,
+)
+from custom_components.smarthub.usage import UsageSeries
+
+TZ = ZoneInfo("America/New_York")
+
+
+def _reading(year, month, day, hour, consumption):
+    return (datetime(year, month, day, hour, tzinfo=TZ), consumption)
+
+
+def _series(*readings):
+    return UsageSeries.from_readings(TZ, readings)
+
+
+@pytest.fixture
+def hourly_usage():
+    """Three days spanning a month boundary, two readings a day."""
+    return _series(
+        _reading(2026, 1, 31, 0, 1.0),
+        _reading(2026, 1, 31, 23, 2.0),
+        _reading(2026, 2, 1, 0, 3.0),
+        _reading(2026, 2, 1, 12, 4.0),
+        _reading(2026, 2, 2, 5, 5.0),
+    )
+
+
+def test_rollup_daily(hourly_usage):
+    """Hourly readings are summed per provider-timezone day."""
+    daily = rollup_usage(hourly_usage, Aggregation.DAILY)
+
+    assert [r["reading_time"] for r in daily] == [
+        datetime(2026, 1, 31, tzinfo=TZ),
+        datetime(2026, 2, 1, tzinfo=TZ),
+        datetime(2026, 2, 2, tzinfo=TZ),
+    ]
+    assert [r["consumption"] for r in daily] == [3.0, 7.0, 5.0]
+    assert daily[1]["raw_timestamp"] == 1769904000000 # 2026-02-01T00:00 as wall-clock epoch
+
+
+def test_rollup_monthly(hourly_usage):
+    """Hourly readings are summed per provider-timezone month."""
+    monthly = rollup_usage(hourly_usage, Aggregation.MONTHLY)
+
+    assert [r["reading_time"] for r in monthly] == [
+        datetime(2026, 1, 1, tzinfo=TZ),
+        datetime(2026, 2, 1, tzinfo=TZ),
+    ]
+    assert [r["consumption"] for r in monthly] == [3.0, 12.0]
+
+
+def test_rollup_energy_data(hourly_usage):
+    """Both usage and return series are rolled up, and daily data is flagged."""
+    data = {ELECTRIC_SERVICE: {"hasHourly": True, "hasDaily": False, "USAGE": hourly_usage, "USAGE_RETURN": hourly_usage[:2]}}
+
+    rolled = rollup_energy_data(data, ELECTRIC_SERVICE, Aggregation.DAILY)
+
+    assert rolled[ELECTRIC_SERVICE]["hasDaily"]
+    assert len(rolled[ELECTRIC_SERVICE]["USAGE"]) == 3
+    assert rolled[ELECTRIC_SERVICE]["USAGE_RETURN"][0]["consumption"] == 3.0
+    assert len(data[ELECTRIC_SERVICE]["USAGE"]) == 5 # source data is untouched
+
+
+def test_compare_usage(hourly_usage):
+    """Only buckets present in both series and outside the tolerance are reported."""
+    local = rollup_usage(hourly_usage, Aggregation.DAILY)
+    remote = _series(
+        _reading(2026, 1, 31, 0, 3.001),
+        _reading(2026, 2, 1, 0, 9.0),
+    )
+
+    assert compare_usage(local, remote) == [(datetime(2026, 2, 1, tzinfo=TZ), 7.0, 9.0)]
+
+
+def _api(hourly):
+    api = MagicMock(spec=SmartHubAPI)
+    api.timezone = "America/New_York"
+    remote = _series(_reading(2026, 1, 10, 0, 2.0), _reading(2026, 2, 1, 0, 9.0))
+
+    async def get_energy_data(location, aggregation, start_datetime=None, end_datetime=None):
+        if aggregation == Aggregation.HOURLY:
+            return hourly
+        usage = remote.since(start_datetime)
+        return {ELECTRIC_SERVICE: {"hasDaily": True, "USAGE": usage.until(end_datetime) if end_datetime else usage}}
+
+    api.get_energy_data = AsyncMock(side_effect=get_energy_data)
+    return api
+
+
+LOCATION = SmartHubLocation(id="1", service=ELECTRIC_SERVICE, description="", provider="")
+START = datetime(2026, 1, 31, tzinfo=TZ)
+
+
+@pytest.mark.asyncio
+async def test_fetcher_single_hourly_request(hourly_usage):
+    """One HOURLY request serves all three aggregations when hourly data exists."""
+    api = _api({ELECTRIC_SERVICE: {"hasHourly": True, "USAGE": hourly_usage}})
+    fetcher = RollupFetcher(api, LOCATION, [Aggregation.HOURLY, Aggregation.DAILY, Aggregation.MONTHLY])
+    start = datetime(2026, 2, 1, tzinfo=TZ)
+
+    _, daily, monthly = await asyncio.gather(
+        fetcher.async_get(Aggregation.HOURLY, start),
+        fetcher.async_get(Aggregation.DAILY, start),
+        fetcher.async_get(Aggregation.MONTHLY, start),
+    )
+
+    api.get_energy_data.assert_called_once()
+    assert [r["consumption"] for r in daily[ELECTRIC_SERVICE]["USAGE"]] == [7.0, 5.0]
+    assert [r["consumption"] for r in monthly[ELECTRIC_SERVICE]["USAGE"]] == [12.0]
+
+
+@pytest.mark.asyncio
+async def test_fetcher_month_to_date_from_daily(hourly_usage):
+    """The HOURLY request doesn't reach back to the month start - the earlier days come from DAILY data."""
+    api = _api({ELECTRIC_SERVICE: {"hasHourly": True, "USAGE": hourly_usage}})
+    fetcher = RollupFetcher(api, LOCATION, [Aggregation.HOURLY, Aggregation.DAILY, Aggregation.MONTHLY])
+
+    hourly, daily, monthly = await asyncio.gather(
+        fetcher.async_get(Aggregation.HOURLY, START),
+        fetcher.async_get(Aggregation.DAILY, START),
+        fetcher.async_get(Aggregation.MONTHLY, START),
+    )
+
+    requests = [call.kwargs for call in api.get_energy_data.call_args_list]
+    assert [(r["aggregation"], r["start_datetime"]) for r in requests] == [
+        (Aggregation.HOURLY, datetime(2026, 1, 30, tzinfo=TZ)),
+        (Aggregation.DAILY, datetime(2026, 1, 1, tzinfo=TZ)),
+    ]
+    assert requests[1]["end_datetime"] == START
+    assert len(hourly[ELECTRIC_SERVICE]["USAGE"]) == 5
+    assert [r["consumption"] for r in daily[ELECTRIC_SERVICE]["USAGE"]] == [3.0, 7.0, 5.0]
+    # January is the DAILY reading of the 10th and the rolled up 31st
+    assert [r["consumption"] for r in monthly[ELECTRIC_SERVICE]["USAGE"]] == [5.0, 12.0]
+
+
+@pytest.mark.asyncio
+async def test_fetcher_falls_back_without_hourly():
+    """DAILY and MONTHLY are fetched from the server when there is no hourly data."""
+    api = _api({ELECTRIC_SERVICE: {"hasHourly": False, "USAGE": _series()}})
+    fetcher = RollupFetcher(api, LOCATION, [Aggregation.HOURLY, Aggregation.DAILY, Aggregation.MONTHLY])
+
+    _, daily, monthly = await asyncio.gather(
+        fetcher.async_get(Aggregation.HOURLY, START),
+        fetcher.async_get(Aggregation.DAILY, START),
+        fetcher.async_get(Aggregation.MONTHLY, START),
+    )
+
+    assert api.get_energy_data.call_count == 3
+    assert daily[ELECTRIC_SERVICE]["USAGE"][0]["consumption"] == 9.0
+    assert monthly[ELECTRIC_SERVICE]["USAGE"][0]["consumption"] == 9.0
+
+
+@pytest.mark.asyncio
+async def test_fetcher_discard_releases_waiters(hourly_usage):
+    """An aggregation that fails before registering doesn't block the others."""
+    api = _api({ELECTRIC_SERVICE: {"hasHourly": True, "USAGE": hourly_usage}})
+    fetcher = RollupFetcher(api, LOCATION, [Aggregation.HOURLY, Aggregation.DAILY, Aggregation.MONTHLY])
+    fetcher.discard(Aggregation.MONTHLY)
+
+    hourly, daily = await asyncio.gather(
+        fetcher.async_get(Aggregation.HOURLY, START),
+        fetcher.async_get(Aggregation.DAILY, START),
+    )
+
+    assert api.get_energy_data.call_count == 1
+    assert len(daily[ELECTRIC_SERVICE]["USAGE"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_fetcher_verify_mode(hourly_usage, caplog):
+    """Verification mode compares rollups with the server and logs mismatches."""
+    api = _api({ELECTRIC_SERVICE: {"hasHourly": True, "USAGE": hourly_usage}})
+    fetcher = RollupFetcher(api, LOCATION, [Aggregation.DAILY], verify=True)
+
+    with caplog.at_level(logging.WARNING):
+        daily = await fetcher.async_get(Aggregation.DAILY, START)
+
+    assert api.get_energy_data.call_count == 2
+    assert daily[ELECTRIC_SERVICE]["USAGE"][1]["consumption"] == 7.0 # local rollup is still used
+    assert "Rollup verification" in caplog.text
+    assert "1 mismatches" in caplog.text
@@ -0,0 +1,130 @@
+"""Tests for the shared SmartHub HTTP sessions."""
+import asyncio
+
+import pytest
+
+from custom_components.smarthub import session as smarthub_session
+from custom_components.smarthub.api import SmartHubAPI, SmartHubLocation, Aggregation
+from custom_components.smarthub.const import ELECTRIC_SERVICE
+
+
+def _api(host="test.smarthub.coop", account_id="123456"):
+    return SmartHubAPI(
+        email="test@example.com",
+        password="testpass",
+        account_id=account_id,
+        timezone="UTC",
+        mfa_totp="",
+        host=host,
+    )
+
+
+@pytest.mark.asyncio
+async def test_session_shared_per_host():
+    """Clients of the same host share one session, other hosts get their own."""
+    api_a = _api(account_id="1")
+    api_b = _api(account_id="2")
+    api_c = _api(host="other.smarthub.coop")
+
+    session_a = await api_a._get_session()
+    session_b = await api_b._get_session()
+    session_c = await api_c._get_session()
+
+    assert session_a is session_b
+    assert session_a is not session_c
+    assert api_a.get_metrics()["session"]["references"] == 2
+
+    await api_a.close()
+    assert not session_b.closed
+    await api_b.close()
+    assert session_b.closed
+    assert "test.smarthub.coop" not in smarthub_session._SESSIONS
+
+    await api_c.close()
+    assert session_c.closed
+
+
+def test_session_replaced_on_new_loop():
+    """A session made on a previous event loop is closed, not leaked, when a new loop needs one."""
+    shared = smarthub_session.SharedSession("test.smarthub.coop")
+    first = asyncio.run(shared.async_get_session())
+    second = asyncio.run(shared.async_get_session())
+
+    assert second is not first
+    assert first.closed
+    asyncio.run(shared.close())
+    assert second.closed
+
+
+@pytest.mark.asyncio
+async def test_session_reuses_connections(fake_smarthub):
+    """Successive requests from different clients reuse pooled connections."""
+    api_a = _api(account_id="1")
+    api_b = _api(account_id="2")
+    api_a.base_url = api_b.base_url = fake_smarthub.url
+    try:
+        for i, api in enumerate((api_a, api_b, api_a, api_b)):
+            # distinct locations, so no response is served from the response cache
+            location = SmartHubLocation(id=str(i), service=ELECTRIC_SERVICE, description="", provider="")
+            await api.get_energy_data(location=location, aggregation=Aggregation.HOURLY)
+
+        stats = api_a.get_metrics()["session"]
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] >= 5 # 2 logins + 4 polls over one connection
+    finally:
+        await api_a.close()
+        await api_b.close()
+
+
+@pytest.mark.asyncio
+async def test_location_cap_shared_per_host():
+    """Every client of a host shares one location cap, sized by the largest limit of its clients."""
+    api_a = _api(account_id="1")
+    api_b = _api(account_id="2")
+    api_c = _api(host="other.smarthub.coop")
+    try:
+        cap = api_a.location_cap(2)
+        assert api_c.location_cap(2) is not cap
+        assert api_b.location_cap(3) is cap
+        assert cap.limit == 3
+
+        # Reloading an entry with a new limit resizes the cap
+        api_b.location_cap(1)
+        assert cap.limit == 2
+
+        await api_a.close()
+        assert cap.limit == 1
+    finally:
+        await api_a.close()
+        await api_b.close()
+        await api_c.close()
+
+
+@pytest.mark.asyncio
+async def test_location_cap_wakes_waiters_when_raised():
+    """Raising the limit lets waiting fetches through at once."""
+    api = _api()
+    try:
+        cap = api.location_cap(1)
+        entered = []
+
+        async def fetch(n):
+            async with cap:
+                entered.append(n)
+                await asyncio.sleep(1)
+
+        tasks = [asyncio.create_task(fetch(n)) for n in range(3)]
+        await asyncio.sleep(0)
+        assert entered == [0]
+
+        api.location_cap(3)
+        await asyncio.sleep(0)
+        assert entered == [0, 1, 2]
+        assert cap.in_use == 3
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert cap.in_use == 0
+    finally:
+        await api.close()
@@ -0,0 +1,106 @@
+"""Test file for the SmartHub warm start snapshot."""
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smarthub.api import SmartHubAPI, SmartHubLocation
+from custom_components.smarthub.const import (
+    ATTR_LAST_READING_TIME,
+    DOMAIN,
+    ELECTRIC_SERVICE,
+    ENERGY_SENSOR_KEY,
+    LOCATION_KEY,
+    METER_NAME,
+)
+from custom_components.smarthub.sensor import SmartHubDataUpdateCoordinator
+from custom_components.smarthub.snapshot import SnapshotStore
+
+LOCATION = SmartHubLocation(id="1", service=ELECTRIC_SERVICE, description="Location 1", provider="Test Provider")
+
+
+def _entry():
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "email": "test@example.com",
+            "password": "testpass",
+            "account_id": "123456",
+            "host": "test.smarthub.coop",
+            "poll_interval": 60,
+            "timezone": "UTC",
+            "mfa_totp": "",
+        },
+        unique_id="test@example.com_test.smarthub.coop_123456",
+    )
+
+
+def _api():
+    api = AsyncMock(spec=SmartHubAPI)
+    api.get_service_locations.return_value = [LOCATION]
+    return api
+
+
+async def test_snapshot_round_trip(hass: HomeAssistant, hass_storage) -> None:
+    """Entity data is stored as JSON and restored with its types."""
+    entities = {
+        "1": {
+            ENERGY_SENSOR_KEY: 12.5,
+            ATTR_LAST_READING_TIME: datetime(2025, 3, 1, 6, tzinfo=timezone.utc),
+            METER_NAME: "Meter 1",
+            LOCATION_KEY: LOCATION,
+        },
+    }
+    await SnapshotStore(hass, "entry").async_save(entities)
+    assert hass_storage["smarthub.snapshot.entry"]["data"]["entities"]["1"][ATTR_LAST_READING_TIME] == "2025-03-01T06:00:00+00:00"
+
+    assert await SnapshotStore(hass, "entry").async_load() == entities
+    assert await SnapshotStore(hass, "other").async_load() is None
+
+    hass_storage["smarthub.snapshot.entry"]["data"]["entities"]["1"][LOCATION_KEY] = {"id": "1"}
+    assert await SnapshotStore(hass, "entry").async_load() is None
+
+
+async def test_warm_start_from_snapshot(hass: HomeAssistant, hass_storage) -> None:
+    """With a snapshot, entities are set up from it and SmartHub is only reached in the background."""
+    entry = _entry()
+    entry.add_to_hass(hass)
+    values = asyncio.Queue()
+
+    async def update_location(self, location):
+        return {ENERGY_SENSOR_KEY: await values.get(), LOCATION_KEY: location}
+
+    with patch.object(SmartHubDataUpdateCoordinator, "_async_update_location", update_location):
+        # Cold start - setup waits for the first refresh, which saves the snapshot
+        values.put_nowait(1.0)
+        with patch("custom_components.smarthub.SmartHubAPI", return_value=_api()):
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+        assert hass_storage[f"smarthub.snapshot.{entry.entry_id}"]["data"]["entities"]["1"][ENERGY_SENSOR_KEY] == 1.0
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+        # Warm start - the refresh hasn't returned yet, but the entity has its last value
+        api = _api()
+        with patch("custom_components.smarthub.SmartHubAPI", return_value=api):
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+        assert entry.state is ConfigEntryState.LOADED
+        api.get_token.assert_not_called()
+
+        registry = er.async_get(hass)
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{entry.unique_id}_1_energy")
+        assert hass.states.get(entity_id).state == "1.0"
+
+        values.put_nowait(2.0)
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert hass.states.get(entity_id).state == "2.0"
+        assert hass_storage[f"smarthub.snapshot.{entry.entry_id}"]["data"]["entities"]["1"][ENERGY_SENSOR_KEY] == 2.0
+
+        assert await hass.config_entries.async_remove(entry.entry_id)
+        await hass.async_block_till_done()
+    assert f"smarthub.snapshot.{entry.entry_id}" not in hass_storage
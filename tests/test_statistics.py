@@ -0,0 +1,101 @@
+"""Tests for the batched import of statistics into the recorder."""
+import asyncio
+import tracemalloc
+from unittest.mock import AsyncMock, MagicMock, patch
+from zoneinfo import ZoneInfo
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.smarthub.statistics import async_import_statistics
+from custom_components.smarthub.usage import UsageSeries
+
+TZ = ZoneInfo("UTC")
+METADATA = {"statistic_id": "smarthub:smarthub_energy_sensor_123456_11111"}
+
+
+def _hourly(hours: int) -> UsageSeries:
+    return UsageSeries(TZ, range(0, hours * 3600000, 3600000), [1.0] * hours)
+
+
+async def test_import_in_batches(hass: HomeAssistant) -> None:
+    """Statistics are added in bounded batches continuing one running sum."""
+    batches = []
+    with patch("custom_components.smarthub.statistics.async_add_external_statistics") as add:
+        add.side_effect = lambda hass, metadata, statistics: batches.append(statistics)
+        assert await async_import_statistics(hass, METADATA, _hourly(25).iter_statistics(100.0), batch_size=10) == (25, 125.0)
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+        assert batches[1][0]["sum"] == 111.0
+
+        # The metadata is added even without statistics
+        assert await async_import_statistics(hass, METADATA, iter(())) == (0, None)
+        assert batches[-1] == []
+
+
+async def test_import_waits_for_recorder(hass: HomeAssistant) -> None:
+    """Before each batch, the import waits for a recorder with a long queue."""
+    recorder = MagicMock(async_block_till_done=AsyncMock())
+    backlogs = iter([3, 3, 20, 5])
+    type(recorder).backlog = property(lambda _: next(backlogs))
+
+    with (
+        patch("custom_components.smarthub.statistics.get_instance", return_value=recorder),
+        patch("custom_components.smarthub.statistics.async_add_external_statistics") as add,
+    ):
+        await async_import_statistics(hass, METADATA, _hourly(40).iter_statistics(), batch_size=10, max_backlog=10)
+
+    assert add.call_count == 4
+    recorder.async_block_till_done.assert_awaited_once()
+
+
+async def test_concurrent_imports_share_recorder_wait(hass: HomeAssistant) -> None:
+    """Imports finding the recorder behind at the same time wait for it once, from their first batch."""
+    caught_up = False
+
+    async def block_till_done():
+        nonlocal caught_up
+        await asyncio.sleep(0)
+        caught_up = True
+
+    recorder = MagicMock(async_block_till_done=AsyncMock(side_effect=block_till_done))
+    type(recorder).backlog = property(lambda _: 0 if caught_up else 20)
+
+    with (
+        patch("custom_components.smarthub.statistics.get_instance", return_value=recorder),
+        patch("custom_components.smarthub.statistics.async_add_external_statistics") as add,
+    ):
+        await asyncio.gather(*(async_import_statistics(hass, METADATA, _hourly(20).iter_statistics(), batch_size=10) for _ in range(3)))
+
+    assert add.call_count == 6
+    recorder.async_block_till_done.assert_awaited_once()
+
+
+async def _peak_import_memory(hass: HomeAssistant, hours: int) -> int:
+    """Return the peak memory, in bytes, of generating and adding the statistics of an hourly series."""
+    series = _hourly(hours)
+    series.utc_timestamps # converted with the series, not by the import
+    rows = 0
+
+    def add(hass, metadata, statistics):
+        nonlocal rows
+        rows += len(statistics)
+
+    # A plain function - a mock would keep every batch in its call list
+    with patch("custom_components.smarthub.statistics.async_add_external_statistics", add):
+        tracemalloc.start()
+        try:
+            await async_import_statistics(hass, METADATA, series.iter_statistics())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    assert rows == hours
+    return peak
+
+
+async def test_import_memory_is_flat(hass: HomeAssistant) -> None:
+    """The memory of an import is bounded by the batch size, not the length of the series."""
+    month = await _peak_import_memory(hass, 24 * 31)
+    decade = await _peak_import_memory(hass, 24 * 3650)
+
+    # A list of 10 years of StatisticData would take about 30MB
+    assert decade < 1024 * 1024
+    assert decade < 2 * month
@@ -0,0 +1,92 @@
+"""Tests for the array-backed UsageSeries."""
+from datetime import datetime
+import sys
+from zoneinfo import ZoneInfo
+
+from custom_components.smarthub.api import SmartHubLocation
+from custom_components.smarthub.const import ELECTRIC_SERVICE
+from custom_components.smarthub.usage import UsageSeries, wall_clock_epoch
+
+TZ = ZoneInfo("America/New_York")
+
+
+def _series():
+    return UsageSeries.from_readings(TZ, [
+        (datetime(2026, 3, 1, 0, tzinfo=TZ), 1.0),
+        (datetime(2026, 3, 1, 1, tzinfo=TZ), -2.0),
+        (datetime(2026, 3, 1, 2, tzinfo=TZ), 3.0),
+    ])
+
+
+def test_readings():
+    """Readings are built on access and keep mapping-style access."""
+    series = _series()
+
+    assert len(series) == 3
+    assert series[0].reading_time == datetime(2026, 3, 1, 0, tzinfo=TZ)
+    assert series[2]["consumption"] == 3.0
+    assert series[1].get("raw_timestamp") == wall_clock_epoch(datetime(2026, 3, 1, 1))
+    assert series.last().reading_time == datetime(2026, 3, 1, 2, tzinfo=TZ)
+    assert UsageSeries(TZ).last() is None
+    assert [reading.consumption for reading in series] == [1.0, -2.0, 3.0]
+
+
+def test_slicing_and_since():
+    """Slices and since() return series without the earlier readings."""
+    series = _series()
+
+    assert series[1:] == series.since(datetime(2026, 3, 1, 1, tzinfo=TZ))
+    assert len(series.since(datetime(2026, 3, 1, 6, 30, tzinfo=ZoneInfo("UTC")))) == 1 # 01:30 local
+    assert len(series.since(datetime(2026, 3, 2, tzinfo=TZ))) == 0
+
+
+def test_to_statistics():
+    """Statistics clamp negative values, keep a running sum and skip old readings."""
+    series = _series()
+
+    statistics = series.to_statistics(10.0)
+    assert [s["state"] for s in statistics] == [1.0, 0, 3.0]
+    assert [s["sum"] for s in statistics] == [11.0, 11.0, 14.0]
+    assert statistics[0]["start"] == datetime(2026, 3, 1, 0, tzinfo=TZ)
+
+    after = datetime(2026, 3, 1, 1, tzinfo=TZ).timestamp()
+    assert [s["sum"] for s in series.to_statistics(10.0, after)] == [13.0]
+
+
+def test_compact_storage():
+    """A reading is stored in two 8 byte array slots rather than a dict."""
+    series = UsageSeries(TZ, range(0, 10000 * 3600000, 3600000), [1.0] * 10000)
+
+    assert series.raw_timestamps.itemsize + series.values.itemsize == 16
+    assert sys.getsizeof(series.raw_timestamps) + sys.getsizeof(series.values) < 10000 * 20
+
+
+def test_location_is_hashable_value():
+    """Locations compare and hash by value."""
+    location = SmartHubLocation(id="1", service=ELECTRIC_SERVICE, description="Home", provider="Test")
+    same = SmartHubLocation(id="1", service=ELECTRIC_SERVICE, description="Home", provider="Test")
+
+    assert location == same
+    assert len({location, same}) == 1
+    assert not hasattr(location, "__dict__")
+
+
+def test_statistics_across_dst_changes():
+    """Statistics get a distinct start in the repeated hour, and skipped hours are merged."""
+    fall_back = UsageSeries(TZ, [wall_clock_epoch(datetime(2026, 11, 1, hour)) for hour in (0, 1, 1, 2)], [1.0, 2.0, 3.0, 4.0])
+
+    statistics = fall_back.to_statistics()
+    assert [s["start"].timestamp() for s in statistics] == [
+        datetime(2026, 11, 1, hour, tzinfo=ZoneInfo("UTC")).timestamp() for hour in (4, 5, 6, 7)
+    ]
+    assert [s["start"].utcoffset().total_seconds() / 3600 for s in statistics] == [-4, -4, -5, -5]
+    assert fall_back.reading_time(2) == statistics[2]["start"]
+    assert len(fall_back.since(statistics[2]["start"])) == 2
+    assert fall_back[2:].reading_time(0) == statistics[2]["start"]
+
+    spring_forward = UsageSeries(TZ, [wall_clock_epoch(datetime(2026, 3, 8, hour)) for hour in (1, 2, 3)], [1.0, 2.0, 3.0])
+
+    statistics = spring_forward.to_statistics()
+    assert [s["start"] for s in statistics] == [datetime(2026, 3, 8, 1, tzinfo=TZ), datetime(2026, 3, 8, 3, tzinfo=TZ)]
+    assert [s["state"] for s in statistics] == [1.0, 5.0]
+    assert [s["sum"] for s in statistics] == [1.0, 6.0]
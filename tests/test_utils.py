@@ -1,6 +1,9 @@
 """Tests for utility functions."""
+from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
-from custom_components.smarthub.utils import sanitize_host, parse_epoch_set_timezone
+import pytest
+from custom_components.smarthub import utils
+from custom_components.smarthub.utils import sanitize_host, parse_epoch_set_timezone, parse_token_expiry, json_loads, LocalTimeConverter
 
 def test_sanitize_host():
     """Test that the host is correctly sanitized."""
@@ -27,3 +30,83 @@ def test_parse_epoch_set_timezone():
 
     for input_epoch, input_tz, expected_iso in test_cases:
         assert parse_epoch_set_timezone(input_epoch, input_tz).isoformat() == expected_iso
+
+def test_parse_token_expiry():
+    """Test that the JWT exp claim is extracted from tokens"""
+    # {"sub": "user", "exp": 1770285600}
+    assert parse_token_expiry("eyJhbGciOiJIUzI1NiJ9.eyJzdWIiOiAidXNlciIsICJleHAiOiAxNzcwMjg1NjAwfQ.sig") == 1770285600
+    assert parse_token_expiry("not-a-jwt") is None
+    assert parse_token_expiry("a.bm90IGpzb24.c") is None
+    assert parse_token_expiry("") is None
+
+@pytest.mark.parametrize("decoder", ["orjson", "json"])
+def test_json_loads(decoder, monkeypatch):
+    """Test JSON decoding with orjson and the stdlib fallback"""
+    if decoder == "json":
+        monkeypatch.setattr(utils, "orjson", None)
+    assert json_loads(b'{"a": [1, 2.5, "x"]}') == {"a": [1, 2.5, "x"]}
+    assert json_loads('{"a": null}') == {"a": None}
+    with pytest.raises(ValueError):
+        json_loads(b"not json")
+
+def _utc(*args):
+    """The UTC epoch (milliseconds) of a time - for a wall-clock time, its SmartHub epoch."""
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
+
+_wall_clock = _utc
+
+def test_local_time_converter_transitions():
+    """The transition table has the DST changes of the window."""
+    converter = LocalTimeConverter(ZoneInfo("America/New_York"))
+
+    assert converter.transitions(_utc(2026, 1, 1), _utc(2027, 1, 1)) == [
+        (_utc(2026, 3, 8, 7), -5 * 3600000, -4 * 3600000),
+        (_utc(2026, 11, 1, 6), -4 * 3600000, -5 * 3600000),
+    ]
+    assert converter.transitions(_utc(2026, 4, 1), _utc(2026, 10, 1)) == []
+    assert LocalTimeConverter(ZoneInfo("UTC")).transitions(_utc(2026, 1, 1), _utc(2027, 1, 1)) == []
+
+def test_local_time_converter_spring_forward():
+    """Hours skipped by spring-forward are moved to the transition."""
+    converter = LocalTimeConverter(ZoneInfo("America/New_York"))
+    hours = [_wall_clock(2026, 3, 8, hour) for hour in range(5)]
+
+    assert list(converter.to_utc(hours)) == [
+        _utc(2026, 3, 8, 5), # 00:00 EST
+        _utc(2026, 3, 8, 6), # 01:00 EST
+        _utc(2026, 3, 8, 7), # 02:00 doesn't exist - 03:00 EDT
+        _utc(2026, 3, 8, 7), # 03:00 EDT
+        _utc(2026, 3, 8, 8), # 04:00 EDT
+    ]
+
+def test_local_time_converter_fall_back():
+    """The repeated hour of fall-back is the first occurrence until the epochs go back."""
+    converter = LocalTimeConverter(ZoneInfo("America/New_York"))
+    quarters = [_wall_clock(2026, 11, 1, 1, minute) for minute in (0, 15, 30, 45)]
+    epochs = [_wall_clock(2026, 11, 1, 0)] + quarters + quarters + [_wall_clock(2026, 11, 1, 2)]
+
+    utc = list(converter.to_utc(epochs))
+
+    assert utc == sorted(utc)
+    assert len(set(utc)) == len(utc)
+    assert utc[1] == _utc(2026, 11, 1, 5) # 01:00 EDT
+    assert utc[5] == _utc(2026, 11, 1, 6) # 01:00 EST
+    assert utc[-1] == _utc(2026, 11, 1, 7) # 02:00 EST
+
+    # A single pass over the repeated hour is its first occurrence
+    assert list(converter.to_utc([_wall_clock(2026, 11, 1, 1), _wall_clock(2026, 11, 1, 2)])) == [
+        _utc(2026, 11, 1, 5), _utc(2026, 11, 1, 7),
+    ]
+
+def test_local_time_converter_matches_zoneinfo():
+    """Outside of DST changes the converter matches zoneinfo, including the southern hemisphere."""
+    for tz_name in ("America/Los_Angeles", "Australia/Sydney", "Australia/Lord_Howe", "UTC"):
+        tz = ZoneInfo(tz_name)
+        epochs = [_wall_clock(2026, 1, 1) + hour * 3600000 for hour in range(0, 366 * 24, 7)]
+
+        utc = LocalTimeConverter(tz).to_utc(epochs)
+
+        for epoch, converted in zip(epochs, utc):
+            local = parse_epoch_set_timezone(epoch / 1000, tz)
+            if local.utcoffset() == local.replace(fold=1).utcoffset(): # neither skipped nor repeated
+                assert converted == local.timestamp() * 1000
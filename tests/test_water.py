@@ -130,8 +130,11 @@ async def test_coordinator_first_run_water_electric(
     hass: HomeAssistant,
     mock_config_entry: MockConfigEntry,
     mock_smarthub_api: AsyncMock,
+    freezer,
 ) -> None:
     """Test the coordinator on its first run with no existing statistics."""
+    # The first import only keeps readings inside the planned tiers - set "now" just after the data.
+    freezer.move_to("2025-02-20 12:00:00+00:00")
     mock_smarthub_api.get_service_locations.return_value = [
       SmartHubLocation(
         id="11111",
@@ -159,8 +162,8 @@ async def test_coordinator_first_run_water_electric(
                              {'meterNumber': '1ND81111111', 'seriesId': '1ND81111111', 'flowDirection': 'NET', 'isNetMeter': True}, # Non net meters have Forward flow as default
                             ],
                             "data": [
-                                {"x": 1640995200000, "y": 100.5},
-                                {"x": 1641081600000, "y": 150.2},
+                                {"x": 1739836800000, "y": 100.5},
+                                {"x": 1739923200000, "y": 150.2},
                             ]
                         }
                     ]
@@ -242,7 +245,8 @@ async def test_coordinator_first_run_water_electric(
 
     # The first hour's statistics summary is...
     assert stats["smarthub:smarthub_energy_sensor_daily_123456_11111"][0]["sum"] == 100.5
-    assert water_stats["smarthub:smarthub_water_sensor_monthly_123456_11112"][0]["sum"] == 3.2 # must be lowercase
+    # Both days of the DAILY tier are rolled up into February
+    assert water_stats["smarthub:smarthub_water_sensor_monthly_123456_11112"][0]["sum"] == 5.84
 
     assert water_metadata["smarthub:smarthub_water_sensor_monthly_123456_11112"][1]["name"] == 'test provider SmartHub WATER Monthly Usage - 123456 - test location'
 
@@ -321,7 +325,7 @@ async def test_coordinator_water_metadata(
 
 async def async_wait_recording_done(hass) -> None:
     """Async wait until recording is done."""
-    await hass.async_block_till_done()
+    await hass.async_block_till_done(wait_background_tasks=True)
     get_instance(hass)._async_commit(dt_util.utcnow())
     await hass.async_block_till_done()
     await hass.async_add_executor_job(get_instance(hass).block_till_done)